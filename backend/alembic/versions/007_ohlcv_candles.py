@@ -0,0 +1,36 @@
+"""ohlcv_candles tablosu: yerel mum deposu (backtest / ML eğitim veri kaynağı).
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ohlcv_candles",
+        sa.Column("exchange", sa.String(50), nullable=False),
+        sa.Column("symbol", sa.String(50), nullable=False),
+        sa.Column("timeframe", sa.String(20), nullable=False),
+        sa.Column("ts", sa.BigInteger(), nullable=False),
+        sa.Column("open", sa.Double(), nullable=False),
+        sa.Column("high", sa.Double(), nullable=False),
+        sa.Column("low", sa.Double(), nullable=False),
+        sa.Column("close", sa.Double(), nullable=False),
+        sa.Column("volume", sa.Double(), nullable=False),
+        sa.PrimaryKeyConstraint("exchange", "symbol", "timeframe", "ts"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ohlcv_candles")
@@ -0,0 +1,32 @@
+"""Strategy tablosuna timeframe ve last_candle_ts ekle (mum kapanışına hizalı zamanlayıcı).
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "strategies",
+        sa.Column("timeframe", sa.String(length=10), nullable=False, server_default="1h"),
+    )
+    op.add_column(
+        "strategies",
+        sa.Column("last_candle_ts", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("strategies", "last_candle_ts")
+    op.drop_column("strategies", "timeframe")
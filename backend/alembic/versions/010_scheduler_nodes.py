@@ -0,0 +1,32 @@
+"""scheduler_nodes tablosu: zamanlayıcı düğümleri ve heartbeat (strateji paylaştırma).
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_nodes",
+        sa.Column("node_id", sa.String(100), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("node_id"),
+    )
+    op.create_index("ix_scheduler_nodes_heartbeat_at", "scheduler_nodes", ["heartbeat_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduler_nodes_heartbeat_at", table_name="scheduler_nodes")
+    op.drop_table("scheduler_nodes")
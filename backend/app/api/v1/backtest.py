@@ -1,9 +1,10 @@
-"""Backtest: run & list (auth required)."""
+"""Backtest: run & list (auth required). Arka plan / tarama için: /jobs."""
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 
-from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
 
 from app.core.database import DbSession
 from app.core.deps import CurrentUser
@@ -12,6 +13,22 @@ from app.services.backtest import service as backtest_service
 router = APIRouter()
 
 
+class ExecutionSettings(BaseModel):
+    """Simülasyon ayarları (backtest.simulator.SimConfig); yüzdeler 0.1 = %0.1."""
+
+    order_type: Literal["market", "limit", "stop_market", "stop_limit"] = "market"
+    position_fraction: float = Field(0.1, gt=0, le=1)
+    maker_fee_pct: float = Field(0.0, ge=0)
+    taker_fee_pct: float = Field(0.0, ge=0)
+    slippage_model: Literal["fixed", "range"] = "fixed"
+    slippage: float = Field(0.0, ge=0)  # fixed: %, range: mum aralığının oranı
+    limit_offset_pct: float = Field(0.0, ge=0)
+    stop_offset_pct: float = Field(0.0, ge=0)
+    order_ttl_bars: int = Field(0, ge=0)
+    stop_loss_pct: float | None = Field(None, gt=0, lt=100)
+    take_profit_pct: float | None = Field(None, gt=0)
+
+
 class BacktestRequest(BaseModel):
     strategy_id: int
     symbol: str = "BTC/USDT"
@@ -20,6 +37,30 @@ class BacktestRequest(BaseModel):
     start_ts: datetime
     end_ts: datetime
     initial_balance: Decimal = Decimal("10000")
+    execution: ExecutionSettings = ExecutionSettings()
+
+
+class PortfolioLeg(BaseModel):
+    strategy_id: int
+    symbol: str | None = None  # boşsa stratejinin sembolü
+    exchange: str = "binance"
+
+
+class RiskOverrides(BaseModel):
+    """Verilirse tüm bacaklara uygulanır (kayıtlı RiskLimit yerine)."""
+
+    max_position_size: float | None = Field(None, gt=0)  # sembol başına miktar
+    daily_loss_limit: float | None = Field(None, gt=0)  # UTC günü gerçekleşen zarar
+
+
+class PortfolioBacktestRequest(BaseModel):
+    legs: list[PortfolioLeg] = Field(min_length=1)
+    timeframe: str = "1h"
+    start_ts: datetime
+    end_ts: datetime
+    initial_balance: Decimal = Decimal("10000")
+    execution: ExecutionSettings = ExecutionSettings()  # yalnızca market; stop-loss / take-profit yok
+    risk_limits: RiskOverrides | None = None
 
 
 @router.post("/run", summary="Backtest çalıştır")
@@ -38,6 +79,26 @@ async def run_backtest(
         start_ts=body.start_ts,
         end_ts=body.end_ts,
         initial_balance=body.initial_balance,
+        execution=body.execution.model_dump(),
+    )
+
+
+@router.post("/portfolio", summary="Portföy backtesti (çok sembol, ortak bakiye ve risk limitleri)")
+async def run_portfolio(
+    body: PortfolioBacktestRequest,
+    db: DbSession,
+    current_user: CurrentUser,
+) -> dict:
+    return await backtest_service.run_portfolio_backtest(
+        db=db,
+        user_id=current_user.id,
+        legs=[leg.model_dump() for leg in body.legs],
+        timeframe=body.timeframe,
+        start_ts=body.start_ts,
+        end_ts=body.end_ts,
+        initial_balance=body.initial_balance,
+        execution=body.execution.model_dump(),
+        risk_limits=body.risk_limits.model_dump() if body.risk_limits else None,
     )
 
 
@@ -56,3 +117,11 @@ async def list_runs(
         limit=limit,
         offset=offset,
     )
+
+
+@router.get("/runs/{run_id}", summary="Backtest detayı (metrikler ve işlem kaydı)")
+async def get_run(run_id: int, db: DbSession, current_user: CurrentUser) -> dict:
+    run = await backtest_service.get_backtest_run(db, run_id, current_user.id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backtest bulunamadı")
+    return {"run": run}
@@ -1,6 +1,15 @@
 """Health check - for load balancers and Docker."""
+from typing import Any
+
 from fastapi import APIRouter
 
+from app import scheduler
+from app.config import get_settings
+from app.core.database import DbSession
+from app.services.market_data import streams
+from app.services.realtime import hub
+from app.services.strategy_engine import cluster
+
 router = APIRouter()
 
 
@@ -12,3 +21,18 @@ async def health() -> dict[str, str]:
 @router.get("/live")
 async def liveness() -> dict[str, str]:
     return {"durum": "canlı"}
+
+
+@router.get("/scheduler")
+async def scheduler_health(db: DbSession) -> dict[str, Any]:
+    """Canlı zamanlayıcı düğümleri; API içinde çalışıyorsa bu sürecin son tick metrikleri."""
+    out: dict[str, Any] = {"nodes": await cluster.alive_nodes(db)}
+    if get_settings().scheduler_in_api:
+        out["local"] = scheduler.metrics
+    return out
+
+
+@router.get("/realtime")
+async def realtime_health() -> dict[str, Any]:
+    """WebSocket yayın merkezi sayaçları ve açık piyasa akışları (bu süreç)."""
+    return {"hub": hub.get_stats(), "streams": streams.active_topics()}
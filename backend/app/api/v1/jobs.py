@@ -0,0 +1,77 @@
+"""Jobs: arka plan backtest / tarama / walk-forward / portföy / ML eğitim işleri - gönder, durum, iptal (auth required)."""
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import Field
+
+from app.api.v1.backtest import BacktestRequest, PortfolioBacktestRequest
+from app.api.v1.ml import TrainRequest
+from app.core.database import DbSession
+from app.core.deps import CurrentUser
+from app.services.jobs import service as jobs_service
+
+router = APIRouter()
+
+
+class SweepRequest(BacktestRequest):
+    # {"short_period": [5, 10, 15]} veya {"long_period": {"start": 20, "stop": 60, "step": 10}}
+    param_ranges: dict[str, Any]
+    # total_return_pct | final_balance | win_rate_pct | total_trades | sharpe | max_drawdown_pct (negatif)
+    sort_by: str = "total_return_pct"
+    top: int = 50
+
+
+class WalkForwardRequest(BacktestRequest):
+    train_bars: int = Field(ge=1)  # eğitim penceresi (mum)
+    test_bars: int = Field(ge=1)  # test penceresi (mum); pencereler bu kadar kayar
+    anchored: bool = False  # True: eğitim penceresi baştan büyür
+    param_ranges: dict[str, Any] | None = None  # verilirse her eğitim penceresinde tarama
+    sort_by: str = "total_return_pct"
+
+
+@router.post("/backtest", summary="Backtest işini kuyruğa ekle")
+async def submit_backtest(body: BacktestRequest, db: DbSession, current_user: CurrentUser) -> dict:
+    return await jobs_service.submit_job(db, current_user.id, "backtest", body.model_dump(mode="json"))
+
+
+@router.post("/sweep", summary="Parametre taraması işini kuyruğa ekle")
+async def submit_sweep(body: SweepRequest, db: DbSession, current_user: CurrentUser) -> dict:
+    return await jobs_service.submit_job(db, current_user.id, "sweep", body.model_dump(mode="json"))
+
+
+@router.post("/walkforward", summary="Walk-forward (örneklem dışı) değerlendirme işini kuyruğa ekle")
+async def submit_walkforward(body: WalkForwardRequest, db: DbSession, current_user: CurrentUser) -> dict:
+    return await jobs_service.submit_job(db, current_user.id, "walkforward", body.model_dump(mode="json"))
+
+
+@router.post("/portfolio", summary="Portföy backtesti işini kuyruğa ekle")
+async def submit_portfolio(body: PortfolioBacktestRequest, db: DbSession, current_user: CurrentUser) -> dict:
+    return await jobs_service.submit_job(db, current_user.id, "portfolio", body.model_dump(mode="json"))
+
+
+@router.post("/train", summary="ML eğitim işini kuyruğa ekle")
+async def submit_train(body: TrainRequest, db: DbSession, current_user: CurrentUser) -> dict:
+    return await jobs_service.submit_job(db, current_user.id, "train", body.model_dump(mode="json"))
+
+
+@router.get("", summary="İşleri listele")
+async def list_jobs(
+    db: DbSession,
+    current_user: CurrentUser,
+    limit: int = Query(20, le=100),
+    offset: int = Query(0, ge=0),
+) -> dict:
+    return await jobs_service.list_jobs(db, current_user.id, limit=limit, offset=offset)
+
+
+@router.get("/{job_id}", summary="İş durumu ve sonucu")
+async def get_job(job_id: int, db: DbSession, current_user: CurrentUser) -> dict:
+    job = await jobs_service.get_job(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="İş bulunamadı")
+    return {"job": jobs_service.job_to_dict(job)}
+
+
+@router.post("/{job_id}/cancel", summary="Kuyruktaki işi iptal et")
+async def cancel_job(job_id: int, db: DbSession, current_user: CurrentUser) -> dict:
+    return await jobs_service.cancel_job(db, job_id, current_user.id)
@@ -1,7 +1,12 @@
 """Markets: symbols, OHLCV, indicators, patterns, ticker, orderbook, trades."""
+import asyncio
+
 from fastapi import APIRouter, Query
 
-from app.services.indicators.calculator import compute_all
+from app.config import get_settings
+from app.services.indicators import batch as batch_indicators
+from app.services.indicators import incremental, registry
+from app.services.market_data import cache as market_cache
 from app.services.market_data import service as market_service
 from app.services.patterns.candle_detector import detect_patterns
 
@@ -31,21 +36,69 @@ async def get_indicators(
     symbol: str = Query("BTC/USDT"),
     timeframe: str = Query("1h"),
     limit: int = Query(100, le=500),
+    indicators: str | None = Query(
+        None,
+        description="İstenen indikatörler (ör. rsi,ema:50,bbands:20:2); boşsa RSI, MACD, SMA, EMA",
+    ),
 ) -> dict:
+    specs = None
+    if indicators:
+        try:
+            specs = registry.parse_specs(indicators)
+        except ValueError as e:
+            return {"hata": str(e)}
     data = await market_service.get_ohlcv(exchange, symbol, timeframe, limit)
     candles = data.get("candles") or []
-    indicators = compute_all(candles)
+    if specs is None:
+        values = await incremental.compute_cached(exchange, symbol, timeframe, candles)
+    else:
+        values = registry.compute(candles, specs)
     patterns = detect_patterns(candles)
     return {
         "exchange": data.get("exchange"),
         "symbol": data.get("symbol"),
         "timeframe": data.get("timeframe"),
         "candles": candles,
-        "indicators": indicators,
+        "indicators": values,
         "patterns": patterns,
     }
 
 
+@router.get("/indicators/catalog", summary="Hesaplanabilir indikatörler ve varsayılan parametreleri")
+async def get_indicator_catalog() -> dict:
+    return {"indicators": registry.catalog()}
+
+
+@router.get("/indicators/batch", summary="Çoklu sembol için son indikatör değerleri (tarayıcı)")
+async def get_indicators_batch(
+    symbols: str = Query(..., description="Virgülle ayrılmış semboller: BTC/USDT,ETH/USDT"),
+    exchange: str = Query("binance"),
+    timeframe: str = Query("1h"),
+    limit: int = Query(200, ge=30, le=1000),
+) -> dict:
+    settings = get_settings()
+    names = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if len(names) > settings.indicators_batch_max_symbols:
+        return {"hata": f"En fazla {settings.indicators_batch_max_symbols} sembol (gelen: {len(names)})"}
+    sem = asyncio.Semaphore(settings.indicators_batch_concurrency)
+
+    async def load(symbol: str) -> dict:
+        async with sem:
+            try:
+                return await market_service.get_ohlcv(exchange, symbol, timeframe, limit)
+            except Exception as e:
+                return {"hata": str(e)}
+
+    responses = await asyncio.gather(*(load(s) for s in names))
+    loaded = [(s, r.get("candles") or []) for s, r in zip(names, responses) if "hata" not in r]
+    summary = batch_indicators.summarize([s for s, _ in loaded], [c for _, c in loaded])
+    results = {
+        symbol: {"hata": res["hata"]} if "hata" in res else summary[symbol]
+        for symbol, res in zip(names, responses)
+    }
+    return {"exchange": exchange, "timeframe": timeframe, "results": results}
+
+
 @router.get("/ticker")
 async def get_ticker(
     exchange: str = Query("binance"),
@@ -70,3 +123,8 @@ async def get_trades(
     limit: int = Query(50, ge=1, le=100),
 ) -> dict:
     return await market_service.get_trades(exchange, symbol, limit)
+
+
+@router.get("/cache/stats", summary="Piyasa verisi önbellek sayaçları")
+async def get_cache_stats() -> dict:
+    return market_cache.get_stats()
@@ -1,4 +1,6 @@
 """ML: list models, register, set active, predict (auth required)."""
+from datetime import datetime
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
@@ -31,6 +33,8 @@ class TrainRequest(BaseModel):
     timeframe: str = "1h"
     name: str
     version: str = "v1"
+    start_ts: datetime | None = None  # boşsa son 500 mum
+    end_ts: datetime | None = None
 
 
 @router.post("/train", summary="OHLCV ile model eğit")
@@ -47,6 +51,8 @@ async def train_model(
         timeframe=body.timeframe,
         name=body.name,
         version=body.version,
+        start_ts=body.start_ts,
+        end_ts=body.end_ts,
     )
 
 
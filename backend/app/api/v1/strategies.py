@@ -16,6 +16,7 @@ class StrategyCreate(BaseModel):
     params: dict = {}
     symbol: str = "BTC/USDT"
     exchange: str = "binance"
+    timeframe: str = "1h"  # zamanlayıcı bu periyodun mum kapanışlarında değerlendirir
     mode: str = "paper"  # paper | live
     ml_model_id: int | None = None  # doluysa sinyal ML modelden alınır
 
@@ -54,6 +55,7 @@ async def create_strategy(
         exchange=body.exchange,
         mode=body.mode,
         ml_model_id=body.ml_model_id,
+        timeframe=body.timeframe,
     )
 
 
@@ -74,6 +76,7 @@ async def stop_strategy(
 class StrategyUpdate(BaseModel):
     ml_model_id: int | None = None
     params: dict | None = None  # short_period, long_period, rsi_period vb.
+    timeframe: str | None = None
 
 
 @router.patch("/{strategy_id}", summary="Strateji güncelle (ML model bağla, parametreler)")
@@ -85,7 +88,7 @@ async def update_strategy(
 ) -> dict:
     return await strategy_service.update_strategy(
         db=db, strategy_id=strategy_id, user_id=current_user.id,
-        ml_model_id=body.ml_model_id, params=body.params
+        ml_model_id=body.ml_model_id, params=body.params, timeframe=body.timeframe
     )
 
 
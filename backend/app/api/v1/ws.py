@@ -1,40 +1,135 @@
-"""WebSocket: canlı ticker ve OHLCV akışı (Türkçe)."""
+"""WebSocket: canlı ticker, OHLCV, çoklu abonelikli /stream (borsa akışlarından) ve arka plan iş durumu."""
 import asyncio
 import json
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
-from app.services.market_data import service as market_service
+from app.config import get_settings
+from app.core.database import async_session_factory
+from app.core.security import decode_access_token
+from app.services.execution import service as execution_service
+from app.services.jobs import service as jobs_service
+from app.services.market_data import streams
+from app.services.realtime import feeds, hub, user_events
 
 router = APIRouter()
 
 
+async def _serve(websocket: WebSocket, send_loop, on_message=None) -> None:
+    """send_loop'u istemci ayrılana kadar çalıştırır; gelen JSON mesajları on_message'a verilir."""
+
+    async def receive_loop() -> None:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if on_message is None or not message.get("text"):
+                continue
+            try:
+                data = json.loads(message["text"])
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                await on_message(data)
+
+    tasks = {asyncio.create_task(send_loop()), asyncio.create_task(receive_loop())}
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _pump(websocket: WebSocket, key: str, producer, interval_sec: float) -> None:
+    """Hub kanalındaki hazır çerçeveleri en fazla interval_sec'te bir gönderir.
+
+    Yavaş istemcide ara çerçeveler atlanır (en son durum gönderilir); istemci ayrılınca abonelik biter.
+    """
+
+    async def send_loop() -> None:
+        async with hub.subscribe(key, producer) as sub:
+            while True:
+                await websocket.send_text(await sub.get())
+                await asyncio.sleep(interval_sec)
+
+    await _serve(websocket, send_loop)
+
+
 @router.websocket("/ticker")
 async def ws_ticker(
     websocket: WebSocket,
     symbol: str = Query("BTC/USDT"),
     exchange: str = Query("binance"),
-    interval_sec: float = Query(2.0, ge=1.0, le=60.0),
+    interval_sec: float = Query(2.0, ge=0.1, le=60.0),
 ) -> None:
-    """Tek sembol için canlı ticker; her interval_sec saniyede güncel fiyat gönderir."""
+    """Tek sembol için canlı ticker; fiyat değiştikçe (en fazla interval_sec'te bir) gönderir."""
     await websocket.accept()
+    topic = streams.make_topic(exchange, symbol, "ticker")
+    try:
+        await _pump(websocket, feeds.market_key(topic), feeds.market_producer(topic), interval_sec)
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # Bağlantı kapatıldı, send artık çalışmaz
+
+
+_RESYNC = "\x00resync"  # istemci resync istediğinde gönderim kuyruğuna konan işaret
+
+
+async def _next_frame(sub: hub.Subscriber, producer: asyncio.Task | None) -> str | None:
+    """Sıradaki çerçeve; üretici bitmiş ve kuyrukta çerçeve kalmamışsa None."""
+    if producer is None:
+        return await sub.get()
+    getter = asyncio.ensure_future(sub.get())
     try:
+        await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not getter.done():
+            getter.cancel()
+    return getter.result() if getter.done() and not getter.cancelled() else sub.get_nowait()
+
+
+async def _run_ohlcv(topic: streams.Topic, limit: int, send, on_subscribe=None) -> None:
+    """Snapshot + delta OHLCV aboneliği; on_subscribe hub abonesini alır (resync için).
+
+    İlk mum seti gelene kadar hata çerçeveleri iletilir; üretici biterse abonelik sonlanır.
+    """
+    key = feeds.ohlcv_key(topic)
+    async with hub.subscribe(key, feeds.ohlcv_producer(topic), conflate=False, bridged=False) as sub:
+        if on_subscribe is not None:
+            on_subscribe(sub)
+        producer = hub.producer_task(key)
+        feed, seq = feeds.ready_feed(topic), 0
+        if feed is not None:
+            await send(feed.snapshot(limit))
+            seq = feed.seq
         while True:
-            try:
-                data = await market_service.get_ticker(exchange, symbol)
-                await websocket.send_text(json.dumps(data))
-            except RuntimeError:
-                break  # Bağlantı kapatıldı, send artık çalışmaz
-            except Exception as e:
-                try:
-                    await websocket.send_text(
-                        json.dumps({"hata": str(e), "sembol": symbol})
-                    )
-                except RuntimeError:
-                    break
-            await asyncio.sleep(interval_sec)
-    except WebSocketDisconnect:
-        pass
+            frame = await _next_frame(sub, producer)
+            if frame is None:
+                return
+            if feed is None:
+                feed = feeds.ready_feed(topic)
+                if feed is None:
+                    if frame != _RESYNC and frame != feeds.READY and feeds.frame_seq(frame) is None:
+                        await send(frame)  # hata çerçevesi
+                    continue
+                sub.lagged = False
+                await send(feed.snapshot(limit))
+                seq = feed.seq
+            if frame == feeds.READY:
+                continue
+            if frame == _RESYNC or sub.lagged:
+                # İstemci istedi ya da kuyruk taştı (çerçeve kaçırıldı): yeniden snapshot
+                sub.lagged = False
+                await send(feed.snapshot(limit))
+                seq = feed.seq
+                continue
+            frame_seq = feeds.frame_seq(frame)
+            if frame_seq is not None:
+                if frame_seq <= seq:
+                    continue  # snapshot zaten içeriyor
+                seq = frame_seq
+            await send(frame)
 
 
 @router.websocket("/ohlcv")
@@ -44,26 +139,189 @@ async def ws_ohlcv(
     exchange: str = Query("binance"),
     timeframe: str = Query("1h"),
     limit: int = Query(100, ge=10, le=500),
-    interval_sec: float = Query(30.0, ge=5.0, le=300.0),
 ) -> None:
-    """Grafik için OHLCV mum verisi; her interval_sec saniyede güncel mum listesini gönderir."""
+    """Grafik için OHLCV: önce snapshot, ardından yalnızca değişen mumlar (delta).
+
+    Çerçeveler: {"seq", "type": "snapshot", "candles": [...limit]} ve
+    {"seq", "type": "update", "candles": [oluşmakta olan mum + yeni kapananlar]}; istemci mumları
+    ts'ye göre birleştirir. seq atlarsa istemci {"op": "resync"} gönderir ve yeni snapshot alır.
+    Akış hatasında {"type": "error", "hata", "sembol"} gelir (snapshot'tan önce de).
+    """
     await websocket.accept()
+    topic = streams.make_topic(exchange, symbol, "ohlcv", timeframe)
+    subs: list[hub.Subscriber] = []
+
+    async def on_message(data: dict) -> None:
+        if data.get("op") == "resync" and subs:
+            subs[0].offer(_RESYNC)
+
     try:
+        await _serve(
+            websocket,
+            lambda: _run_ohlcv(topic, limit, websocket.send_text, subs.append),
+            on_message,
+        )
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+
+async def _run_market(topic: streams.Topic, send) -> None:
+    """Durum kanalı (ticker, orderbook, trades) aboneliği; çerçeve yeniden kodlanmadan sarılır."""
+    prefix = f'{{"topic":{json.dumps(topic.key())},"data":'
+    async with hub.subscribe(feeds.market_key(topic), feeds.market_producer(topic)) as sub:
         while True:
-            try:
-                data = await market_service.get_ohlcv(
-                    exchange, symbol, timeframe, limit
-                )
-                await websocket.send_text(json.dumps(data))
-            except RuntimeError:
-                break  # Bağlantı kapatıldı
-            except Exception as e:
-                try:
-                    await websocket.send_text(
-                        json.dumps({"hata": str(e), "sembol": symbol})
-                    )
-                except RuntimeError:
-                    break
+            await send(prefix + await sub.get() + "}")
+
+
+async def _run_user(user_id: int, channel: str, send) -> None:
+    """Kullanıcının emir/pozisyon olayları; abonelikte DB'den başlangıç durumu gönderilir."""
+    prefix = f'{{"topic":{json.dumps(channel)},"data":'
+    key = user_events.user_key(user_id, channel)
+    async with hub.subscribe(key, conflate=channel == "positions") as sub:
+        async with async_session_factory() as db:
+            if channel == "orders":
+                snapshot = await execution_service.list_orders(db, user_id)
+            else:
+                snapshot = await execution_service.list_positions(db, user_id)
+        await send(prefix + json.dumps({"type": "snapshot", **snapshot}, default=str) + "}")
+        while True:
+            await send(prefix + await sub.get() + "}")
+
+
+def _user_id_from_token(token: str | None) -> int | None:
+    payload = decode_access_token(token) if token else None
+    try:
+        return int(payload["sub"]) if payload else None
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+@router.websocket("/stream")
+async def ws_stream(
+    websocket: WebSocket,
+    token: str | None = Query(None, description="JWT; orders/positions kanalları için gerekli"),
+) -> None:
+    """Tek bağlantı üzerinden çoklu abonelik.
+
+    İstemci: {"op": "subscribe" | "unsubscribe", "channel": "ticker" | "ohlcv" | "orderbook" | "trades",
+    "exchange", "symbol", "timeframe"?, "limit"?}; kullanıcı kanalları için {"op": ..., "channel":
+    "orders" | "positions"}; ohlcv'de {"op": "resync", "topic"}.
+    Sunucu: {"type": "subscribed" | "unsubscribed" | "error", "topic", ...}; veri çerçeveleri
+    {"topic", "data"} (ohlcv: snapshot/update çerçeveleri "topic" alanıyla doğrudan).
+    """
+    await websocket.accept()
+    user_id = _user_id_from_token(token)
+    max_subs = get_settings().ws_stream_max_subscriptions
+    send_lock = asyncio.Lock()
+    tasks: dict[str, asyncio.Task] = {}
+    ohlcv_subs: dict[str, hub.Subscriber] = {}
+
+    async def send(text: str) -> None:
+        async with send_lock:
+            await websocket.send_text(text)
+
+    async def reply(type_: str, topic: str | None, **extra) -> None:
+        await send(json.dumps({"type": type_, "topic": topic, **extra}))
+
+    def _resolve(data: dict) -> tuple[str, object]:
+        """Mesaj → (topic anahtarı, abonelik coroutine fabrikası); geçersizse ValueError."""
+        channel = data.get("channel")
+        if channel in user_events.USER_CHANNELS:
+            if user_id is None:
+                raise ValueError("Bu kanal için giriş gerekli (token)")
+            return channel, lambda: _run_user(user_id, channel, send)
+        exchange, symbol = data.get("exchange", "binance"), data.get("symbol")
+        if not symbol:
+            raise ValueError("symbol gerekli")
+        topic = streams.make_topic(exchange, symbol, channel or "", data.get("timeframe"))
+        key = topic.key()
+        if topic.channel == "ohlcv":
+            limit = min(max(int(data.get("limit", 100)), 10), 500)
+            return key, lambda: _run_ohlcv(
+                topic, limit, send, lambda sub: ohlcv_subs.__setitem__(key, sub)
+            )
+        return key, lambda: _run_market(topic, send)
+
+    def _finished(key: str, task: asyncio.Task) -> None:
+        if tasks.get(key) is task:
+            del tasks[key]
+            ohlcv_subs.pop(key, None)
+
+    async def on_message(data: dict) -> None:
+        op = data.get("op")
+        if op == "resync":
+            sub = ohlcv_subs.get(data.get("topic", ""))
+            if sub is not None:
+                sub.offer(_RESYNC)
+            return
+        if op not in ("subscribe", "unsubscribe"):
+            await reply("error", None, hata=f"Bilinmeyen op: {op}")
+            return
+        try:
+            key, run = _resolve(data)
+        except (ValueError, TypeError) as e:
+            await reply("error", data.get("channel"), hata=str(e))
+            return
+        if op == "unsubscribe":
+            task = tasks.pop(key, None)
+            ohlcv_subs.pop(key, None)
+            if task is not None:
+                task.cancel()
+            await reply("unsubscribed", key)
+            return
+        if key in tasks:
+            await reply("subscribed", key)
+            return
+        if len(tasks) >= max_subs:
+            await reply("error", key, hata=f"Abonelik limiti aşıldı (limit: {max_subs})")
+            return
+        task = asyncio.create_task(run())
+        task.add_done_callback(lambda t, key=key: _finished(key, t))
+        tasks[key] = task
+        await reply("subscribed", key)
+
+    async def idle() -> None:
+        await asyncio.Event().wait()
+
+    try:
+        await _serve(websocket, idle, on_message)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+
+@router.websocket("/jobs/{job_id}")
+async def ws_job(
+    websocket: WebSocket,
+    job_id: int,
+    token: str = Query(..., description="JWT erişim token'ı"),
+    interval_sec: float = Query(1.0, ge=0.5, le=30.0),
+) -> None:
+    """İş durumu değiştikçe gönderir; iş bitince (done/error/cancelled) son durumu gönderip kapatır."""
+    payload = decode_access_token(token)
+    try:
+        user_id = int(payload["sub"]) if payload else None
+    except (KeyError, ValueError, TypeError):
+        user_id = None
+    if user_id is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    last_sent: str | None = None
+    try:
+        while True:
+            async with async_session_factory() as db:
+                job = await jobs_service.get_job(db, job_id, user_id)
+                data = jobs_service.job_to_dict(job) if job else {"hata": "İş bulunamadı"}
+            frame = json.dumps(data, default=str)
+            if frame != last_sent:
+                await websocket.send_text(frame)
+                last_sent = frame
+            if job is None or data["durum"] in jobs_service.TERMINAL_STATUSES:
+                await websocket.close()
+                break
             await asyncio.sleep(interval_sec)
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, RuntimeError):
         pass
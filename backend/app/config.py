@@ -38,6 +38,72 @@ class Settings(BaseSettings):
     binance_api_key: Optional[str] = None
     binance_api_secret: Optional[str] = None
     twelve_data_api_key: Optional[str] = None  # Forex/altın (EUR/USD, XAU/USD vb.)
+    exchange_markets_refresh_sec: float = 3600.0  # ccxt markets listesi yenileme aralığı
+
+    # Piyasa verisi önbelleği: memory | redis (redis_url gerekir) | none
+    market_cache_backend: str = "memory"
+    market_cache_max_entries: int = 2048
+    market_cache_ttl_ticker_sec: float = 1.0
+    market_cache_ttl_ohlcv_sec: float = 2.0  # son (açık) mum değiştiği için kısa
+    market_cache_ttl_symbols_sec: float = 3600.0
+    # Artımlı indikatör durumu (borsa, sembol, zaman dilimi, pencerenin ilk mumu başına; aynı önbellek arka ucunda)
+    indicator_state_ttl_sec: float = 6 * 3600.0
+    indicator_state_max_bars: int = 1000  # daha uzun pencerelerin durumu saklanmaz
+    indicators_batch_max_symbols: int = 500  # /markets/indicators/batch
+    indicators_batch_concurrency: int = 10  # aynı anda çekilen OHLCV
+
+    # Yerel mum deposu: borsadan sayfalı backfill (sayfa başına mum)
+    candle_store_page_limit: int = 1000
+    candle_archive_dir: str = "data/candles"  # sütunlu memmap arşivi
+
+    # Backtest parametre taraması
+    backtest_sweep_workers: int = 0  # 0 = CPU sayısı
+    backtest_sweep_max_combinations: int = 5000
+    backtest_trade_log_max: int = 1000  # metrics_json'a yazılan işlem kaydı sınırı
+    walkforward_max_windows: int = 100
+    walkforward_equity_points: int = 2000  # sonuçtaki örneklem dışı eğri en fazla bu kadar nokta
+    portfolio_max_legs: int = 200  # portföy backtestinde en fazla (strateji, sembol) bacağı
+
+    # Arka plan iş kuyruğu (python -m app.worker)
+    jobs_worker_concurrency: int = 2  # işçi başına aynı anda çalışan iş
+    jobs_max_running_per_user: int = 1  # kullanıcı başına aynı anda çalışan iş (tüm işçiler)
+    jobs_max_pending_per_user: int = 10  # kullanıcı başına kuyrukta + çalışan iş
+    jobs_poll_interval_sec: float = 1.0
+    jobs_heartbeat_sec: float = 5.0
+    jobs_stale_after_sec: float = 60.0  # heartbeat gelmeyen iş kuyruğa geri alınır
+
+    # Canlı piyasa akışları (ccxt.pro WebSocket; twelvedata için REST yoklaması)
+    market_stream_source: str = "exchange"  # exchange | stub (çevrimdışı sentetik akış)
+    market_stream_idle_sec: float = 30.0  # son abone gittikten sonra akışın kapanma gecikmesi
+    market_stream_poll_sec: float = 2.0  # akış desteklemeyen sağlayıcılarda yoklama aralığı
+    market_stream_stub_interval_sec: float = 0.5
+    market_stream_ohlcv_limit: int = 500
+    market_stream_trades_limit: int = 50
+    market_stream_orderbook_depth: int = 20
+
+    # WebSocket yayın merkezi: istemci kuyruğu, çok süreçli dağıtım için Redis pub/sub köprüsü
+    ws_hub_client_queue: int = 64  # olay kanallarında istemci başına bekleyen çerçeve sınırı
+    ws_hub_redis_bridge: bool = False  # redis_url gerekir
+    ws_hub_lease_ttl_sec: float = 5.0  # kanal üreticisi kirası (süreç ölürse başkası devralır)
+    ws_stream_max_subscriptions: int = 50  # /ws/stream bağlantısı başına abonelik
+
+    # Strateji zamanlayıcı: mum kapanışına hizalı uyanma, aynı anda veri çekme / değerlendirme sayısı
+    scheduler_max_concurrency: int = 8
+    scheduler_settle_delay_sec: float = 2.0  # kapanıştan sonra borsanın mumu kesinleştirmesi için bekleme
+    scheduler_refresh_sec: float = 30.0  # yeni/güncellenen stratejiler ve geciken mumlar için yoklama
+    scheduler_use_streams: bool = True  # sahip olunan gruplar için canlı kline akışı (REST yedekli)
+    scheduler_in_api: bool = False  # True: API süreci de zamanlayıcı düğümü olarak çalışır
+    scheduler_heartbeat_sec: float = 5.0
+    scheduler_node_ttl_sec: float = 20.0  # heartbeat gelmeyen düğümün stratejileri diğerlerine geçer
+
+    # Twelve Data HTTP havuzu ve kredi bütçesi (ücretsiz plan: 8 kredi/dk)
+    twelve_data_timeout_sec: float = 15.0
+    twelve_data_http2: bool = True
+    twelve_data_max_connections: int = 20
+    twelve_data_max_keepalive_connections: int = 10
+    twelve_data_keepalive_expiry_sec: float = 30.0
+    twelve_data_credits_per_minute: int = 8
+    twelve_data_budget_max_wait_sec: float = 10.0  # bütçe dolunda en fazla bu kadar beklenir
 
     # ML: eğitilmiş model dosyaları
     ml_artifact_dir: str = "data/models"
@@ -11,6 +11,10 @@ from app.config import get_settings
 from app.api.v1.router import api_router
 from app.core.database import init_db
 from app.scheduler import scheduler_loop
+from app.services.market_data import cache as market_cache
+from app.services.market_data import exchanges, streams
+from app.services.market_data.providers import twelvedata
+from app.services.realtime import hub
 import app.models  # noqa: F401 - register all ORM models for create_all
 
 _scheduler_task: asyncio.Task | None = None
@@ -18,10 +22,14 @@ _scheduler_task: asyncio.Task | None = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Startup: init DB, start strategy scheduler. Shutdown: cancel scheduler."""
+    """Startup: init DB, start strategy scheduler if enabled. Shutdown: cancel scheduler, close exchange/HTTP clients.
+
+    Zamanlayıcı normalde ayrı süreçte çalışır (python -m app.scheduler); scheduler_in_api ile API'de de açılabilir.
+    """
     await init_db()
     global _scheduler_task
-    _scheduler_task = asyncio.create_task(scheduler_loop())
+    if get_settings().scheduler_in_api:
+        _scheduler_task = asyncio.create_task(scheduler_loop())
     yield
     if _scheduler_task:
         _scheduler_task.cancel()
@@ -29,6 +37,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             await _scheduler_task
         except asyncio.CancelledError:
             pass
+    await hub.close_all()
+    await streams.close_all()
+    await exchanges.close_all()
+    await twelvedata.close_client()
+    await market_cache.close()
 
 
 def create_app() -> FastAPI:
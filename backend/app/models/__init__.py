@@ -1,4 +1,4 @@
-"""ORM models for Zenithai: users, strategies, orders, positions, risk, backtest, ml."""
+"""ORM models for Zenithai: users, strategies, orders, positions, risk, backtest, ml, candles, jobs, scheduler nodes."""
 
 from app.models.user import User  # noqa: F401
 from app.models.strategy import Strategy  # noqa: F401
@@ -7,4 +7,7 @@ from app.models.position import Position  # noqa: F401
 from app.models.risk_limits import RiskLimit  # noqa: F401
 from app.models.backtest_run import BacktestRun  # noqa: F401
 from app.models.ml_model import MLModel  # noqa: F401
+from app.models.candle import Candle  # noqa: F401
+from app.models.job import Job  # noqa: F401
 
+from app.models.scheduler_node import SchedulerNode  # noqa: F401
@@ -0,0 +1,21 @@
+"""OHLCV candle model - yerel mum deposu (yalnızca kapanmış mumlar)."""
+from sqlalchemy import BigInteger, Double, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.base import Base
+
+
+class Candle(Base):
+    """Tek mum: (borsa, sembol, zaman dilimi, açılış zamanı ms) birincil anahtar."""
+
+    __tablename__ = "ohlcv_candles"
+
+    exchange: Mapped[str] = mapped_column(String(50), primary_key=True)
+    symbol: Mapped[str] = mapped_column(String(50), primary_key=True)
+    timeframe: Mapped[str] = mapped_column(String(20), primary_key=True)
+    ts: Mapped[int] = mapped_column(BigInteger, primary_key=True)  # ccxt: açılış zamanı (ms)
+    open: Mapped[float] = mapped_column(Double)
+    high: Mapped[float] = mapped_column(Double)
+    low: Mapped[float] = mapped_column(Double)
+    close: Mapped[float] = mapped_column(Double)
+    volume: Mapped[float] = mapped_column(Double)
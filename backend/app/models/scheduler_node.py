@@ -0,0 +1,19 @@
+"""SchedulerNode model - canlı zamanlayıcı süreçleri (stratejiler bunlar arasında paylaştırılır)."""
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.base import Base
+
+
+class SchedulerNode(Base):
+    """Zamanlayıcı düğümü: heartbeat'i scheduler_node_ttl_sec içinde olanlar canlı sayılır."""
+
+    __tablename__ = "scheduler_nodes"
+
+    node_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    heartbeat_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+    )
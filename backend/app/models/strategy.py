@@ -2,7 +2,7 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import BigInteger, DateTime, ForeignKey, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.base import Base
@@ -20,9 +20,12 @@ class Strategy(Base):
     params_json: Mapped[str] = mapped_column(Text, default="{}")  # JSON string for flexibility
     symbol: Mapped[str] = mapped_column(String(50))
     exchange: Mapped[str] = mapped_column(String(50))
+    timeframe: Mapped[str] = mapped_column(String(10), default="1h", server_default="1h")  # 1m, 15m, 1h, 1d ...
     mode: Mapped[str] = mapped_column(String(20), default="paper")  # paper | live
     is_active: Mapped[bool] = mapped_column(default=False)
     ml_model_id: Mapped[int | None] = mapped_column(
         ForeignKey("ml_models.id", ondelete="SET NULL"), index=True, nullable=True
     )
+    # Son değerlendirilen kapanmış mumun açılış zamanı (ms); aynı mum tekrar değerlendirilmez
+    last_candle_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -1,79 +1,377 @@
-"""Periyodik strateji çalıştırıcı: aktif botları tick'ler, MA cross veya ML sinyal ile paper emir."""
+"""Periyodik strateji çalıştırıcı: aktif botları tick'ler, MA cross veya ML sinyal ile paper emir.
+
+Zamanlayıcı her stratejinin zaman diliminde mum kapanışına (+ scheduler_settle_delay_sec) uyanır
+(heapq öncelik kuyruğu). Yalnızca kapanmış mumlar değerlendirilir; son değerlendirilen mum
+Strategy.last_candle_ts'te tutulur, yeni mum kapanmamış stratejiler için borsaya gidilmez.
+Mumlar mümkünse canlı kline akışından (market_data.streams) alınır, değilse REST ile çekilir.
+Her tick'te stratejiler (borsa, sembol, zaman dilimi) bazında gruplanır, her mum seti bir kez çekilir;
+sinyaller sınırlı paralellikle değerlendirilir ve her strateji kendi transaction'ında emir verir.
+
+Sinyaller strateji başına durumlu değerlendiricilerle (strategy_engine.evaluators) üretilir:
+her tick'te yalnızca yeni kapanan mumlar işlenir.
+
+Birden çok zamanlayıcı süreci çalışabilir (python -m app.scheduler): stratejiler canlı düğümler
+arasında tutarlı hash ile paylaştırılır (strategy_engine.cluster), ölen düğümün payı TTL sonunda
+diğerlerine geçer. Aynı mumun iki kez işlenmesini advisory lock + koşullu güncelleme engeller.
+"""
 import asyncio
+import heapq
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import select, text, update
 
+import app.models  # noqa: F401 - register all ORM models
+from app.config import get_settings
 from app.core.database import async_session_factory
 from app.models.strategy import Strategy
 from app.services.execution import service as execution_service
+from app.services.market_data import cache as market_cache
+from app.services.market_data import exchanges
 from app.services.market_data import service as market_service
+from app.services.market_data import streams
+from app.services.market_data.candle_store import candle_close_ms, candle_open_ms, valid_timeframe
+from app.services.market_data.providers import twelvedata
 from app.services.ml import service as ml_service
 from app.services.ml import trainer as ml_trainer
-from app.services.strategy_engine import signals
+from app.services.strategy_engine import cluster, evaluators
 
-TICK_INTERVAL_SEC = 60.0
+TICK_CANDLE_LIMIT = 50
 PAPER_ORDER_QUANTITY = Decimal("0.001")
 
+# Strateji başına advisory lock sınıfı (pg_try_advisory_xact_lock(sınıf, strategy_id))
+_STRATEGY_LOCK_CLASS = 0x7363  # "sc"
+
+# Bu düğüme düşen (borsa, sembol, zaman dilimi) grupları için açık tutulan canlı kline akışları
+_kline_streams: dict[tuple[str, str, str], streams.Stream] = {}
+
+# Strateji başına durumlu sinyal değerlendirici: (tip, parametreler, zaman dilimi) parmak iziyle
+_evaluators: dict[int, tuple[tuple[str, str, str], evaluators.SignalEvaluator]] = {}
+
+# Son tick'lerin zamanlama metrikleri (/health/scheduler)
+metrics: dict[str, Any] = {
+    "node_id": cluster.NODE_ID,
+    "nodes": [],  # canlı zamanlayıcı düğümleri
+    "ticks": 0,
+    "last_tick_at": None,
+    "last_duration_sec": None,
+    "last_lag_sec": None,  # mum kapanışı (+ bekleme) ile gerçek başlangıç farkı
+    "max_lag_sec": 0.0,
+    "last_stages_sec": {},  # load / fetch / evaluate
+    "last_strategies": 0,
+    "last_owned": 0,  # bu düğüme düşen aktif strateji sayısı
+    "last_due": 0,  # yeni kapanmış mumu olan strateji sayısı
+    "last_groups": 0,
+    "last_stream_hits": 0,  # mumları REST yerine canlı akıştan alınan grup sayısı
+    "last_orders": 0,
+    "last_not_ready": 0,  # borsa kapanmış mumu henüz yayınlamamış
+    "last_errors": 0,
+    "next_wake_at": None,
+    "timeframes": [],
+}
+
+
+def _effective_now_ms() -> int:
+    """Bekleme süresi düşülmüş 'şimdi': bu andan önce kapanan mumlar kesinleşmiş sayılır."""
+    return int((time.time() - get_settings().scheduler_settle_delay_sec) * 1000)
+
+
+def _next_close(timeframe: str, now: float) -> float:
+    """Zaman diliminin bir sonraki mum kapanışı + bekleme (epoch saniye); 1w / 1M takvime hizalı."""
+    settle = get_settings().scheduler_settle_delay_sec
+    base_ms = int((now - settle) * 1000)
+    return candle_close_ms(candle_open_ms(base_ms, timeframe), timeframe) / 1000 + settle
+
+
+def _is_due(s: Strategy, now_ms: int) -> bool:
+    """Son değerlendirilen mumdan sonra yeni bir mum kapanmış olabilir mi?"""
+    if s.last_candle_ts is None:
+        return True
+    next_open = candle_close_ms(s.last_candle_ts, s.timeframe)
+    return candle_close_ms(next_open, s.timeframe) <= now_ms
+
 
-async def run_strategy_tick() -> None:
-    """Aktif stratejileri al; ML model veya indikatör sinyali ile paper emir gönder."""
+async def _load_active_strategies() -> tuple[list[Strategy], list[str]]:
+    """Aktif paper stratejilerden bu düğüme düşenler ve canlı düğüm listesi."""
     async with async_session_factory() as db:
+        ring, nodes = await cluster.current_ring(db)
+        result = await db.execute(
+            select(Strategy).where(Strategy.is_active.is_(True), Strategy.mode == "paper")
+        )
+        strategies = list(result.scalars().all())
+        await db.commit()
+    owned = [s for s in strategies if ring.owner(str(s.id)) == cluster.NODE_ID]
+    metrics["last_strategies"] = len(strategies)
+    return owned, nodes
+
+
+async def _claim(db, strategy_id: int, candle_ts: int) -> bool:
+    """Strateji + mum için sahiplik: başka düğüm aynı anda işliyorsa ya da bu mum işlenmişse False.
+
+    Kilit ve güncelleme transaction sonuna kadar tutulur; emir ile aynı anda commit edilir.
+    """
+    locked = (
+        await db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:c, :k)"), {"c": _STRATEGY_LOCK_CLASS, "k": strategy_id}
+        )
+    ).scalar()
+    if not locked:
+        return False
+    result = await db.execute(
+        update(Strategy)
+        .where(
+            Strategy.id == strategy_id,
+            Strategy.is_active.is_(True),
+            (Strategy.last_candle_ts.is_(None)) | (Strategy.last_candle_ts < candle_ts),
+        )
+        .values(last_candle_ts=candle_ts)
+    )
+    return bool(result.rowcount)
+
+
+def _sync_kline_streams(keys: set[tuple[str, str, str]]) -> None:
+    """Sahip olunan gruplar için kline akışlarını açar, artık sahip olunmayanları bırakır."""
+    if not get_settings().scheduler_use_streams:
+        keys = set()
+    for key in list(_kline_streams):
+        if key not in keys:
+            streams.release(_kline_streams.pop(key))
+    for key in keys - _kline_streams.keys():
+        _kline_streams[key] = streams.acquire(streams.make_topic(key[0], key[1], "ohlcv", key[2]))
+
+
+def _closed_candles(candles: list[list], timeframe: str, now_ms: int) -> list[list]:
+    return [c for c in candles if candle_close_ms(c[0], timeframe) <= now_ms][-TICK_CANDLE_LIMIT:]
+
+
+async def _fetch_group(
+    key: tuple[str, str, str], now_ms: int, sem: asyncio.Semaphore
+) -> tuple[tuple[str, str, str], list[list] | None, bool]:
+    """Grubun kapanmış mumları (oluşmakta olan mum atılır) ve akıştan gelip gelmediği.
+
+    Canlı akış son kapanmış mumu içeriyorsa borsaya gidilmez; yoksa REST ile bir kez çekilir.
+    """
+    exchange, symbol, timeframe = key
+    stream = _kline_streams.get(key)
+    if stream is not None and stream.state:
+        closed = _closed_candles(stream.state["candles"], timeframe, now_ms)
+        last_closed_open = candle_open_ms(candle_open_ms(now_ms, timeframe) - 1, timeframe)
+        if closed and closed[-1][0] >= last_closed_open:
+            return key, closed, True
+    async with sem:
         try:
-            result = await db.execute(
-                select(Strategy).where(Strategy.is_active.is_(True))
-            )
-            strategies = result.scalars().all()
+            res = await market_service.get_ohlcv(exchange, symbol, timeframe, limit=TICK_CANDLE_LIMIT + 1)
         except Exception:
-            await db.rollback()
-            return
-        for s in strategies:
-            try:
-                if s.mode != "paper":
-                    continue
-                ohlcv_res = await market_service.get_ohlcv(
-                    s.exchange, s.symbol, "1h", limit=50
-                )
-                candles = ohlcv_res.get("candles") or []
+            return key, None, False
+    if "hata" in res:
+        return key, None, False
+    return key, _closed_candles(res.get("candles") or [], timeframe, now_ms), False
+
 
+def _evaluate(s: Strategy, candles: list[list]) -> str | None:
+    """Stratejinin değerlendiricisini yalnızca yeni kapanan mumlarla ilerletir, son sinyali döner.
+
+    Değerlendirici yoksa, strateji değiştiyse veya son işlenen mum eldeki aralıkta değilse
+    (kesinti) mumlarla yeniden tohumlanır.
+    """
+    fingerprint = (s.type, s.params_json or "{}", s.timeframe)
+    cached = _evaluators.get(s.id)
+    evaluator = cached[1] if cached is not None and cached[0] == fingerprint else None
+    if evaluator is None or evaluator.last_ts is None or not candles[0][0] <= evaluator.last_ts <= candles[-1][0]:
+        evaluator = evaluators.make_evaluator(s.type, s.params_json, s.id)
+        _evaluators[s.id] = (fingerprint, evaluator)
+    signal = None
+    for candle in candles:
+        if evaluator.last_ts is None or candle[0] > evaluator.last_ts:
+            signal = evaluator.update(candle)
+    return signal
+
+
+async def _run_strategy(s: Strategy, candles: list[list], sem: asyncio.Semaphore) -> str:
+    """Tek stratejiyi kendi oturum/transaction'ında çalıştırır. 'order' | 'skip' | 'error' döner.
+
+    Değerlendirilen son mumun zamanı emirle aynı transaction'da last_candle_ts'e yazılır.
+    """
+    candle_ts = int(candles[-1][0])
+    async with sem:
+        async with async_session_factory() as db:
+            try:
+                if not await _claim(db, s.id, candle_ts):
+                    await db.rollback()
+                    return "skip"
+                side: str | None = None
                 if s.ml_model_id:
                     features = ml_trainer.ohlcv_to_feature_dict(candles)
-                    pred = await ml_service.predict_signal(
-                        db, s.user_id, s.ml_model_id, features
-                    )
-                    if not pred.get("ok") or "sinyal" not in pred:
-                        continue
-                    side = "buy" if pred["sinyal"] == 1 else "sell"
+                    pred = await ml_service.predict_signal(db, s.user_id, s.ml_model_id, features)
+                    if pred.get("ok") and "sinyal" in pred:
+                        side = "buy" if pred["sinyal"] == 1 else "sell"
                 else:
-                    signal = signals.get_signal(s.type, candles, s.params_json or "{}")
-                    if not signal:
-                        continue
-                    side = "buy" if signal == "buy" else "sell"
-
-                await execution_service.submit_paper_order(
-                    db=db,
-                    user_id=s.user_id,
-                    symbol=s.symbol,
-                    side=side,
-                    quantity=PAPER_ORDER_QUANTITY,
-                    strategy_id=s.id,
-                    exchange=s.exchange,
-                )
+                    signal = _evaluate(s, candles)
+                    if signal:
+                        side = "buy" if signal == "buy" else "sell"
+
+                if side is not None:
+                    await execution_service.submit_paper_order(
+                        db=db,
+                        user_id=s.user_id,
+                        symbol=s.symbol,
+                        side=side,
+                        quantity=PAPER_ORDER_QUANTITY,
+                        strategy_id=s.id,
+                        exchange=s.exchange,
+                    )
+                await db.commit()
+                return "order" if side is not None else "skip"
             except Exception:
+                await db.rollback()
+                # Mum tekrar denenecek; değerlendirici o mumu işlemiş olabilir, yeniden tohumlansın
+                _evaluators.pop(s.id, None)
+                return "error"
+
+
+async def run_strategy_tick() -> set[str]:
+    """Bu düğüme düşen, yeni kapanmış mumu olan stratejileri değerlendirir; zaman dilimlerini döner."""
+    concurrency = max(get_settings().scheduler_max_concurrency, 1)
+    stages: dict[str, float] = {}
+    now_ms = _effective_now_ms()
+
+    t0 = time.perf_counter()
+    strategies, nodes = await _load_active_strategies()
+    # Doğrulamadan önce kaydedilmiş, borsanın desteklemediği zaman dilimleri ("7m") atlanır
+    invalid = [s for s in strategies if not valid_timeframe(s.timeframe, s.exchange)]
+    strategies = [s for s in strategies if valid_timeframe(s.timeframe, s.exchange)]
+    stages["load"] = time.perf_counter() - t0
+    owned_ids = {s.id for s in strategies}
+    for strategy_id in _evaluators.keys() - owned_ids:
+        del _evaluators[strategy_id]
+
+    t1 = time.perf_counter()
+    _sync_kline_streams({(s.exchange, s.symbol, s.timeframe) for s in strategies})
+    groups: dict[tuple[str, str, str], list[Strategy]] = defaultdict(list)
+    for s in strategies:
+        if _is_due(s, now_ms):
+            groups[(s.exchange, s.symbol, s.timeframe)].append(s)
+    fetch_sem = asyncio.Semaphore(concurrency)
+    fetched = await asyncio.gather(*(_fetch_group(k, now_ms, fetch_sem) for k in groups))
+    stages["fetch"] = time.perf_counter() - t1
+
+    t2 = time.perf_counter()
+    eval_sem = asyncio.Semaphore(concurrency)
+    jobs = []
+    not_ready = 0
+    for key, candles, _ in fetched:
+        if candles is None:
+            continue
+        for s in groups[key]:
+            # Borsa yeni kapanan mumu henüz yayınlamadıysa sonraki uyanışta tekrar denenir.
+            if not candles or (s.last_candle_ts is not None and candles[-1][0] <= s.last_candle_ts):
+                not_ready += 1
                 continue
+            jobs.append(_run_strategy(s, candles, eval_sem))
+    outcomes = await asyncio.gather(*jobs)
+    stages["evaluate"] = time.perf_counter() - t2
+
+    metrics["last_stages_sec"] = {k: round(v, 4) for k, v in stages.items()}
+    metrics["nodes"] = nodes
+    metrics["last_owned"] = len(strategies)
+    metrics["last_due"] = sum(len(v) for v in groups.values())
+    metrics["last_groups"] = len(groups)
+    metrics["last_stream_hits"] = sum(1 for _, _, from_stream in fetched if from_stream)
+    metrics["last_orders"] = outcomes.count("order")
+    metrics["last_not_ready"] = not_ready
+    metrics["last_errors"] = (
+        outcomes.count("error") + sum(1 for _, c, _ in fetched if c is None) + len(invalid)
+    )
+    return {s.timeframe for s in strategies}
+
+
+async def _membership_loop() -> None:
+    """Düğüm heartbeat'ini scheduler_heartbeat_sec aralığıyla yazar."""
+    while True:
         try:
-            await db.commit()
+            async with async_session_factory() as db:
+                await cluster.heartbeat(db)
+                await db.commit()
         except Exception:
-            await db.rollback()
+            pass
+        await asyncio.sleep(get_settings().scheduler_heartbeat_sec)
 
 
 async def scheduler_loop() -> None:
-    """Sonsuz döngü: her TICK_INTERVAL_SEC saniyede bir run_strategy_tick."""
-    while True:
+    """Zaman dilimi başına bir sonraki mum kapanışını heap'te tutar ve tam o anda uyanır.
+
+    scheduler_refresh_sec aralığıyla ayrıca uyanılır: yeni başlatılan/güncellenen stratejiler
+    ve borsanın geç yayınladığı mumlar bu sayede bir sonraki kapanışı beklemeden işlenir.
+    Düğüm heartbeat'i ayrı görevde yazılır; çıkışta düğüm kümeden silinir.
+    """
+    membership = asyncio.create_task(_membership_loop())
+    try:
+        heap: list[tuple[float, str]] = []  # (uyanma zamanı epoch sn, zaman dilimi)
+        scheduled: set[str] = set()
+        next_refresh = 0.0
+        while True:
+            now = time.time()
+            due_at: float | None = None
+            while heap and heap[0][0] <= now:
+                at, tf = heapq.heappop(heap)
+                scheduled.discard(tf)
+                due_at = at if due_at is None else min(due_at, at)
+            if due_at is not None or now >= next_refresh:
+                started = time.time()
+                lag = started - due_at if due_at is not None else 0.0
+                timeframes: set[str] | None = None
+                try:
+                    timeframes = await run_strategy_tick()
+                except asyncio.CancelledError:
+                    break
+                except Exception:
+                    pass
+                metrics["ticks"] += 1
+                metrics["last_tick_at"] = datetime.now(timezone.utc).isoformat()
+                metrics["last_duration_sec"] = round(time.time() - started, 4)
+                metrics["last_lag_sec"] = round(lag, 4)
+                metrics["max_lag_sec"] = round(max(metrics["max_lag_sec"], lag), 4)
+                if timeframes is None:
+                    # DB'ye ulaşılamadı: bilinen zaman dilimlerini korumak için tekrar kuyruğa al
+                    timeframes = set(metrics["timeframes"])
+                metrics["timeframes"] = sorted(timeframes)
+                for tf in timeframes - scheduled:
+                    heapq.heappush(heap, (_next_close(tf, time.time()), tf))
+                    scheduled.add(tf)
+                if now >= next_refresh:
+                    next_refresh = now + get_settings().scheduler_refresh_sec
+            wake = min(heap[0][0], next_refresh) if heap else next_refresh
+            metrics["next_wake_at"] = datetime.fromtimestamp(wake, timezone.utc).isoformat()
+            try:
+                await asyncio.sleep(max(wake - time.time(), 0.0))
+            except asyncio.CancelledError:
+                break
+    finally:
+        membership.cancel()
+        _sync_kline_streams(set())
         try:
-            await run_strategy_tick()
-        except asyncio.CancelledError:
-            break
+            async with async_session_factory() as db:
+                await cluster.leave(db)
+                await db.commit()
         except Exception:
             pass
-        await asyncio.sleep(TICK_INTERVAL_SEC)
+
+
+async def _main() -> None:
+    try:
+        await scheduler_loop()
+    finally:
+        await streams.close_all()
+        await exchanges.close_all()
+        await twelvedata.close_client()
+        await market_cache.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
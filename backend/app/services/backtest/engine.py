@@ -0,0 +1,137 @@
+"""Vektörel backtest sinyalleri: sinyal dizisi tek geçişte NumPy ile (emir/dolum simülasyonu: simulator).
+
+signals.get_signal'ın bar bar (candles[: i + 1]) döngüsüyle bit düzeyinde aynı işlemleri üretir:
+pencere toplamları yorumlayıcının sum() semantiğiyle (3.12+: Neumaier telafili) hesaplanır.
+"""
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+import numpy as np
+
+from app.services.strategy_engine import dsl, signals
+
+BUY = 1
+SELL = -1
+
+# Python 3.12'den itibaren sum() float'larda Neumaier telafili toplama kullanır.
+_COMPENSATED_SUM = sys.version_info >= (3, 12)
+
+
+def _window_sums(x: np.ndarray, period: int) -> np.ndarray:
+    """s[j] = sum(x[j : j + period]) — yerleşik sum() ile aynı sırada ve yuvarlamayla."""
+    m = len(x) - period + 1
+    if m <= 0:
+        return np.empty(0, dtype=np.float64)
+    total = x[:m].astype(np.float64, copy=True)
+    if not _COMPENSATED_SUM:
+        for k in range(1, period):
+            total += x[k : k + m]
+        return total
+    comp = np.zeros(m, dtype=np.float64)
+    for k in range(1, period):
+        item = x[k : k + m]
+        t = total + item
+        comp += np.where(np.abs(total) >= np.abs(item), (total - t) + item, (item - t) + total)
+        total = t
+    return np.where((comp != 0) & np.isfinite(comp), total + comp, total)
+
+
+def min_bars_for(strategy_type: str, params: dict[str, Any]) -> int:
+    """Backtest döngüsünün başladığı bar (ilk sinyal değerlendirmesi)."""
+    if strategy_type == "custom":
+        return max(dsl.get_program(params).lookback + 1, 2)
+    if strategy_type == "ma_cross":
+        return max(int(params.get("long_period", 20)), 2) + 1
+    if strategy_type == "rsi":
+        return int(params.get("rsi_period", 14)) + 2
+    return 25
+
+
+def _ma_cross_signals(close: np.ndarray, params: dict[str, Any]) -> np.ndarray | None:
+    short_period = int(params.get("short_period", 10))
+    long_period = int(params.get("long_period", 20))
+    if short_period < 1 or long_period < 1:
+        return None
+    n = len(close)
+    out = np.zeros(n, dtype=np.int8)
+    # Bu bardan itibaren hem güncel hem önceki pencereler tam dolu.
+    full = max(short_period, long_period)
+    if n > full:
+        s_sums = _window_sums(close, short_period)
+        l_sums = _window_sums(close, long_period)
+        idx = np.arange(full, n)
+        short_ma = s_sums[idx - short_period + 1] / short_period
+        long_ma = l_sums[idx - long_period + 1] / long_period
+        prev_short = s_sums[idx - short_period] / short_period
+        prev_long = l_sums[idx - long_period] / long_period
+        buy = (prev_short <= prev_long) & (short_ma > long_ma)
+        sell = ~buy & (prev_short >= prev_long) & (short_ma < long_ma)
+        out[full:][buy] = BUY
+        out[full:][sell] = SELL
+    # Kısmi pencereli ilk barlar (az sayıda) doğrudan skaler fonksiyonla.
+    closes = close[: min(full, n)].tolist()
+    for i in range(min(full, n)):
+        s = signals.ma_cross_signal([[0, 0, 0, 0, c] for c in closes[: i + 1]], params)
+        out[i] = BUY if s == "buy" else SELL if s == "sell" else 0
+    return out
+
+
+def _rsi_signals(close: np.ndarray, params: dict[str, Any]) -> np.ndarray | None:
+    period = int(params.get("rsi_period", 14))
+    if period < 1:
+        return None
+    oversold = float(params.get("oversold", 30))
+    overbought = float(params.get("overbought", 70))
+    n = len(close)
+    out = np.zeros(n, dtype=np.int8)
+    if n < period + 1:
+        return out
+    diff = close[1:] - close[:-1]
+    gain_sums = _window_sums(np.maximum(diff, 0.0), period)
+    loss_sums = _window_sums(np.maximum(-diff, 0.0), period)
+    avg_gain = gain_sums / period
+    avg_loss = loss_sums / period
+    zero_loss = avg_loss == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / np.where(zero_loss, 1.0, avg_loss)
+        rsi = np.where(zero_loss, 100.0, 100.0 - (100.0 / (1.0 + rs)))
+    # rsi[j], candles[: j + period + 1] için değer.
+    buy = rsi <= oversold
+    sell = ~buy & (rsi >= overbought)
+    tail = out[period:]
+    tail[buy] = BUY
+    tail[sell] = SELL
+    return out
+
+
+def compute_signals(
+    strategy_type: str,
+    close: np.ndarray,
+    params: dict[str, Any],
+    columns: dict[str, np.ndarray] | None = None,
+    strategy_id: int | None = None,
+) -> np.ndarray | None:
+    """out[i] = get_signal(candles[: i + 1]) (1 al, -1 sat, 0 yok).
+
+    Vektörleştirilemeyen parametrelerde (ör. periyot < 1) None döner; çağıran skaler döngüye düşer.
+    custom (kural dili) open/high/low/volume kullanıyorsa columns verilmelidir; geçersiz kuralda ValueError.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if strategy_type == "custom":
+        return dsl.get_program(params, strategy_id).signals(columns or {"close": close})
+    if strategy_type == "ma_cross":
+        return _ma_cross_signals(close, params)
+    if strategy_type == "rsi":
+        return _rsi_signals(close, params)
+    return np.zeros(len(close), dtype=np.int8)
+
+
+def scalar_signals(strategy_type: str, candles: list[list], params_json: str) -> np.ndarray:
+    """Eski O(n²) yol: her bar için get_signal(candles[: i + 1]). Yalnızca yedek olarak."""
+    out = np.zeros(len(candles), dtype=np.int8)
+    for i in range(len(candles)):
+        s = signals.get_signal(strategy_type, candles[: i + 1], params_json)
+        out[i] = BUY if s == "buy" else SELL if s == "sell" else 0
+    return out
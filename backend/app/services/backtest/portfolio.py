@@ -0,0 +1,234 @@
+"""Portföy backtesti: birden çok (strateji, sembol) bacağı tek nakit hesabı ve risk limitleriyle.
+
+Bacakların mumları ortak zaman eksenine (zaman damgalarının birleşimi) hizalanır; sinyaller her
+bacağın kendi serisinde vektörel hesaplanıp bu eksende seyrek (bar, bacak) olay listesine çevrilir.
+Döngü yalnızca bu olayları gezer; pozisyon, nakit ve özsermaye eğrileri sonradan (bacak × bar)
+matrislerinde kümülatif toplamla çıkarılır.
+
+Emirler zamanlayıcıdaki gibi market, sinyal kapanışında dolar (komisyon/kayma: SimConfig). Aynı
+barda önce çıkışlar, sonra girişler bacak sırasıyla işlenir; giriş büyüklüğü o anki nakdin
+position_fraction'ı. Her emir risk.service.check_risk kurallarından geçer: bacağın stratejisine ait
+limit; max_position_size sembol (tüm bacaklar) + yön toplamıyla, daily_loss_limit hesabın UTC günü
+gerçekleşen PnL'iyle. Reddedilen çıkışta pozisyon sonraki sat sinyaline kadar açık kalır.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from app.services.backtest import engine, simulator
+from app.services.market_data.archive import CandleArrays
+
+_DAY_MS = 86_400_000
+
+
+@dataclass
+class Leg:
+    name: str  # "strateji_id:sembol"
+    symbol: str
+    strategy_type: str
+    params: dict[str, Any]
+    candles: CandleArrays
+    strategy_id: int | None = None
+    max_position_size: float | None = None  # RiskLimit (yoksa sınırsız)
+    daily_loss_limit: float | None = None
+
+
+@dataclass
+class PortfolioResult:
+    ts: np.ndarray  # ortak zaman ekseni
+    equity: np.ndarray  # her bardaki hesap özsermayesi
+    holdings: np.ndarray = field(repr=False)  # (bacak × bar) pozisyon miktarı
+    trades: list[tuple[int, simulator.Trade]]  # (bacak, işlem); barlar eksen indeksi
+    rejected: list[dict[str, int]]  # bacak başına reddedilen emir sayıları
+
+    @property
+    def final_balance(self) -> float:
+        return float(self.equity[-1]) if len(self.equity) else 0.0
+
+
+def align(legs: list[Leg]) -> tuple[np.ndarray, list[np.ndarray], np.ndarray]:
+    """Ortak eksen, bacak başına mumların eksendeki indeksleri ve ileri doldurulmuş (bacak × bar) kapanış.
+
+    Bacağın ilk mumundan önceki hücreler NaN kalır.
+    """
+    axis = np.unique(np.concatenate([leg.candles.ts for leg in legs])) if legs else np.empty(0, np.int64)
+    positions = [np.searchsorted(axis, leg.candles.ts) for leg in legs]
+    close = np.full((len(legs), len(axis)), np.nan)
+    for i, (leg, pos) in enumerate(zip(legs, positions)):
+        close[i, pos] = leg.candles.close
+    idx = np.where(np.isnan(close), 0, np.arange(len(axis)))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return axis, positions, np.take_along_axis(close, idx, axis=1)
+
+
+def _events(legs: list[Leg], positions: list[np.ndarray]) -> tuple[list, ...]:
+    """Seyrek sinyal olayları (bar, bacak, yön, kapanış, mum aralığı); bar, önce satış, bacak sırasıyla.
+
+    Her bacağın sinyali kendi serisinde vektörel hesaplanır; ısınma barlarındaki sinyaller atılır.
+    """
+    parts = []
+    for i, (leg, pos) in enumerate(zip(legs, positions)):
+        c = leg.candles
+        columns = {"open": c.open, "high": c.high, "low": c.low, "close": c.close, "volume": c.volume}
+        sig = engine.compute_signals(leg.strategy_type, c.close, leg.params, columns, leg.strategy_id)
+        if sig is None:
+            raise ValueError(f"{leg.name}: geçersiz strateji parametreleri")
+        k = np.flatnonzero(sig)
+        k = k[k >= engine.min_bars_for(leg.strategy_type, leg.params)]
+        parts.append((pos[k], np.full(len(k), i), sig[k], c.close[k], c.high[k] - c.low[k]))
+    if not parts:
+        return [], [], [], [], []
+    bar, leg_idx, side, price, spread = (np.concatenate(col) for col in zip(*parts))
+    order = np.lexsort((leg_idx, side != engine.SELL, bar))
+    return tuple(col[order].tolist() for col in (bar, leg_idx, side, price, spread))
+
+
+def check_config(config: simulator.SimConfig) -> None:
+    """Portföy modunda emirler zamanlayıcıdaki gibi market; koruyucu emir yok."""
+    if config.order_type != "market" or config.stop_loss_pct or config.take_profit_pct:
+        raise ValueError("Portföy backtesti yalnızca market emir destekler (stop-loss / take-profit yok)")
+
+
+def simulate(
+    legs: list[Leg],
+    initial_balance: float,
+    config: simulator.SimConfig | None = None,
+) -> PortfolioResult:
+    """Bacakları ortak nakit ve risk limitleriyle simüle eder."""
+    config = config or simulator.SimConfig()
+    check_config(config)
+    axis, positions, close = align(legs)
+    n_legs, width = close.shape
+    bars, leg_ids, sides, prices, spreads = _events(legs, positions)
+
+    fee_rate = config.taker_fee_pct / 100
+    slip_range = config.slippage_model == "range"
+    slip = config.slippage if slip_range else config.slippage / 100
+    fraction = config.position_fraction
+    axis_ts = axis.tolist()
+    symbols = [leg.symbol for leg in legs]
+    max_pos = [leg.max_position_size if leg.max_position_size and leg.max_position_size > 0 else None for leg in legs]
+    loss_cap = [-abs(leg.daily_loss_limit) if leg.daily_loss_limit and leg.daily_loss_limit > 0 else None
+                for leg in legs]
+
+    cash = float(initial_balance)
+    qty = [0.0] * n_legs
+    open_trades: list[simulator.Trade | None] = [None] * n_legs
+    symbol_qty = dict.fromkeys(symbols, 0.0)  # sembol başına toplam long miktar (check_risk gibi bacaklar toplanır)
+    trades: list[tuple[int, simulator.Trade]] = []
+    rejected = [{"max_position": 0, "daily_loss": 0} for _ in legs]
+    day, daily_pnl = None, 0.0
+
+    def risk_ok(i: int, side: int, quantity: float) -> bool:
+        """check_risk: önce yön toplamıyla max pozisyon, sonra günlük gerçekleşen zarar."""
+        if max_pos[i] is not None:
+            current = symbol_qty[symbols[i]] if side == engine.BUY else 0.0  # short yok
+            if current + quantity > max_pos[i]:
+                rejected[i]["max_position"] += 1
+                return False
+        if loss_cap[i] is not None and daily_pnl < loss_cap[i]:
+            rejected[i]["daily_loss"] += 1
+            return False
+        return True
+
+    for t, i, side, price, spread in zip(bars, leg_ids, sides, prices, spreads):
+        today = axis_ts[t] // _DAY_MS
+        if today != day:
+            day, daily_pnl = today, 0.0
+        amount = slip * spread if slip_range else slip * price
+        if side == engine.SELL:
+            if qty[i] <= 0 or not risk_ok(i, side, qty[i]):
+                continue
+            trade = open_trades[i]
+            price -= amount
+            fee = qty[i] * price * fee_rate
+            cash += qty[i] * price - fee
+            trade.exit_bar, trade.exit_price, trade.exit_fee, trade.reason = t, price, fee, "signal"
+            daily_pnl += trade.pnl
+            symbol_qty[symbols[i]] -= qty[i]
+            trades.append((i, trade))
+            qty[i], open_trades[i] = 0.0, None
+        elif qty[i] <= 0 and cash > 0:
+            price += amount
+            quantity = cash * fraction / price
+            if not risk_ok(i, side, quantity):
+                continue
+            fee = quantity * price * fee_rate
+            cash -= quantity * price + fee
+            qty[i], open_trades[i] = quantity, simulator.Trade(t, price, quantity, fee)
+            symbol_qty[symbols[i]] += quantity
+
+    last = close[:, -1] if width else np.empty(0)
+    for i, trade in enumerate(open_trades):
+        if trade is not None:
+            # Açık pozisyon bacağın son kapanışıyla değerlenir (komisyonsuz)
+            trade.exit_bar, trade.exit_price, trade.reason = width, float(last[i]), "end"
+            trades.append((i, trade))
+    trades.sort(key=lambda x: (x[1].exit_bar, x[0]))
+
+    # Pozisyon ve nakit değişimlerinden eğriler: giriş barında +miktar, çıkış barında -miktar
+    delta = np.zeros((n_legs, width + 1))
+    cash_delta = np.zeros(width + 1)
+    if trades:
+        leg_idx = np.array([i for i, _ in trades])
+        entry = np.array([tr.entry_bar for _, tr in trades])
+        exit_ = np.array([tr.exit_bar for _, tr in trades])
+        q = np.array([tr.qty for _, tr in trades])
+        np.add.at(delta, (leg_idx, entry), q)
+        np.add.at(delta, (leg_idx, exit_), -q)
+        np.add.at(cash_delta, entry, [-(tr.qty * tr.entry_price + tr.entry_fee) for _, tr in trades])
+        np.add.at(cash_delta, exit_, [tr.qty * tr.exit_price - tr.exit_fee for _, tr in trades])
+    holdings = np.cumsum(delta[:, :width], axis=1)
+    holdings[np.abs(holdings) < 1e-12] = 0.0  # ekleme/çıkarma yuvarlama artığı
+    value = np.where(holdings != 0, holdings * np.nan_to_num(close), 0.0).sum(axis=0)
+    equity = float(initial_balance) + np.cumsum(cash_delta[:width]) + value
+    return PortfolioResult(axis, equity, holdings, trades, rejected)
+
+
+def leg_metrics(result: PortfolioResult, legs: list[Leg], initial_balance: float) -> list[dict[str, Any]]:
+    """Bacak başına özet: işlem, kazanç oranı, PnL (başlangıç bakiyesine katkı), komisyon, pozisyonda kalma."""
+    out = []
+    for i, leg in enumerate(legs):
+        leg_trades = [tr for j, tr in result.trades if j == i]
+        pnls = [tr.pnl for tr in leg_trades]
+        wins = sum(1 for p in pnls if p > 0)
+        has_data = len(leg.candles) > 0
+        first = int(np.searchsorted(result.ts, leg.candles.ts[0])) if has_data else len(result.ts)
+        live = result.holdings[i, first:]
+        out.append({
+            "leg": leg.name,
+            "strategy_id": leg.strategy_id,
+            "symbol": leg.symbol,
+            "bars": len(leg.candles),
+            "total_trades": len(leg_trades),
+            "win_rate_pct": round(wins / len(pnls) * 100, 2) if pnls else None,
+            "pnl": round(sum(pnls), 8),
+            "contribution_pct": round(sum(pnls) / initial_balance * 100, 4) if initial_balance else None,
+            "fees_paid": round(sum(tr.entry_fee + tr.exit_fee for tr in leg_trades), 8),
+            "exposure_pct": round(float((live > 0).mean()) * 100, 4) if len(live) else 0.0,
+            "rejected_orders": result.rejected[i],
+        })
+    return out
+
+
+def aggregate_metrics(
+    result: PortfolioResult,
+    legs: list[Leg],
+    initial_balance: float,
+    periods_per_year: float,
+    max_trades: int = 1000,
+) -> dict[str, Any]:
+    """Hesap düzeyinde simulator.metrics; işlem kaydına bacak adı eklenir."""
+    combined = simulator.SimResult(
+        result.final_balance,
+        [tr for _, tr in result.trades],
+        result.equity,
+        (result.holdings > 0).any(axis=0),
+    )
+    metrics = simulator.metrics(combined, initial_balance, periods_per_year, result.ts, max_trades)
+    for row, (i, _) in zip(metrics["trades"], result.trades):
+        row["leg"] = legs[i].name
+    return metrics
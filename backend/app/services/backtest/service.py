@@ -1,17 +1,34 @@
-"""Backtest service: OHLCV çek, strateji sinyali üret, metrik hesapla, DB'ye yaz."""
+"""Backtest service: yerel depodan OHLCV oku, strateji sinyali üret, metrik hesapla, DB'ye yaz."""
+import asyncio
 from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
+import numpy as np
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import json
 
+from app.config import get_settings
 from app.models.backtest_run import BacktestRun
 from app.models.strategy import Strategy
-from app.services.market_data import service as market_service
-from app.services.strategy_engine import signals
+from app.services.backtest import engine, portfolio, simulator, sweep, walkforward
+from app.services.market_data import candle_store
+from app.services.market_data.archive import CandleArrays
+from app.services.risk import service as risk_service
+
+_YEAR_MS = 365 * 24 * 3600 * 1000
+
+
+def periods_per_year(timeframe: str, exchange: str | None = None) -> float:
+    """Sharpe/Sortino yıllıklaştırması için yıldaki mum sayısı (kripto: 7/24).
+
+    Zaman dilimi burada borsanın timeframes haritasına göre doğrulanır: yoksa ("7m", "0m" ...) ValueError.
+    """
+    if not candle_store.valid_timeframe(timeframe, exchange):
+        raise ValueError(f"Geçersiz zaman dilimi: {timeframe}")
+    return _YEAR_MS / candle_store.timeframe_ms(timeframe)
 
 
 async def run_backtest(
@@ -24,61 +41,54 @@ async def run_backtest(
     start_ts: datetime,
     end_ts: datetime,
     initial_balance: Decimal = Decimal("10000"),
+    execution: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """OHLCV alır, strateji sinyali (MA cross / RSI) ile simülasyon yapar."""
+    """[start_ts, end_ts) OHLCV'sini yerel depodan alır, strateji sinyaliyle olay güdümlü simülasyon yapar.
+
+    execution: simulator.SimConfig alanları (emir tipi, komisyon, kayma, stop-loss ...); boşsa varsayılanlar.
+    """
     strategy = await db.get(Strategy, strategy_id)
     if not strategy or strategy.user_id != user_id:
         return {"ok": False, "hata": "Strateji bulunamadı"}
+    try:
+        config = simulator.SimConfig.from_dict(execution)
+        periods = periods_per_year(timeframe, exchange)
+    except (TypeError, ValueError) as e:
+        return {"ok": False, "hata": str(e)}
 
-    ohlcv_res = await market_service.get_ohlcv(exchange, symbol, timeframe, limit=500)
-    candles = ohlcv_res.get("candles") or []
-    if len(candles) < 2:
+    try:
+        arrays = await candle_store.get_arrays(
+            db, exchange, symbol, timeframe,
+            candle_store.to_ms(start_ts), candle_store.to_ms(end_ts),
+        )
+    except ValueError as e:
+        return {"ok": False, "hata": str(e)}
+    if len(arrays) < 2:
         return {"ok": False, "hata": "Yetersiz OHLCV verisi"}
 
     params = json.loads(strategy.params_json) if strategy.params_json else {}
-    min_bars = 25
-    if strategy.type == "ma_cross":
-        min_bars = max(int(params.get("long_period", 20)), 2) + 1
-    elif strategy.type == "rsi":
-        min_bars = int(params.get("rsi_period", 14)) + 2
 
-    balance = float(initial_balance)
-    position = 0.0
-    entry_price = 0.0
-    total_trades = 0
-    wins = 0
-    closes = [c[4] for c in candles]
-
-    for i in range(min_bars, len(candles)):
-        slice_candles = candles[: i + 1]
-        signal = signals.get_signal(strategy.type, slice_candles, strategy.params_json or "{}")
-        if not signal:
-            continue
-        price = float(closes[i])
-        if signal == "buy" and position <= 0:
-            if position < 0:
-                pnl = (entry_price - price) * abs(position)
-                balance += pnl
-                total_trades += 1
-                if pnl > 0:
-                    wins += 1
-            position = balance * 0.1 / price if balance > 0 else 0
-            entry_price = price
-        elif signal == "sell" and position > 0:
-            pnl = (price - entry_price) * position
-            balance += pnl
-            total_trades += 1
-            if pnl > 0:
-                wins += 1
-            position = 0.0
-
-    if position > 0:
-        balance += (float(closes[-1]) - entry_price) * position
-        total_trades += 1
-        if float(closes[-1]) > entry_price:
-            wins += 1
-
-    final_balance = Decimal(str(round(balance, 8)))
+    columns = {name: getattr(arrays, name) for name in ("open", "high", "low", "close", "volume")}
+
+    def _simule_et() -> tuple[simulator.SimResult, dict[str, Any]]:
+        sig = engine.compute_signals(strategy.type, arrays.close, params, columns, strategy.id)
+        if sig is None:
+            sig = engine.scalar_signals(strategy.type, arrays.to_ohlcv(), strategy.params_json or "{}")
+        result = simulator.simulate(
+            arrays.open, arrays.high, arrays.low, arrays.close, sig,
+            engine.min_bars_for(strategy.type, params), float(initial_balance), config,
+        )
+        return result, simulator.metrics(
+            result, float(initial_balance), periods, arrays.ts, get_settings().backtest_trade_log_max
+        )
+
+    try:
+        result, metrics = await asyncio.to_thread(_simule_et)
+    except ValueError as e:
+        return {"ok": False, "hata": str(e)}
+
+    total_trades, wins = result.total_trades, result.wins
+    final_balance = Decimal(str(round(result.final_balance, 8)))
     total_return_pct = (
         (final_balance - initial_balance) / initial_balance * 100
         if initial_balance
@@ -99,7 +109,7 @@ async def run_backtest(
         total_return_pct=total_return_pct,
         total_trades=total_trades,
         win_rate_pct=win_rate,
-        metrics_json=json.dumps(params),
+        metrics_json=json.dumps({"params": params, "execution": config.to_dict(), **metrics}),
     )
     db.add(run)
     await db.flush()
@@ -112,6 +122,360 @@ async def run_backtest(
         "total_return_pct": float(total_return_pct) if total_return_pct else None,
         "total_trades": total_trades,
         "win_rate_pct": float(win_rate) if win_rate else None,
+        **{k: v for k, v in metrics.items() if k not in ("trades", "trades_truncated")},
+    }
+
+
+async def run_sweep(
+    db: AsyncSession,
+    user_id: int,
+    strategy_id: int,
+    symbol: str,
+    exchange: str,
+    timeframe: str,
+    start_ts: datetime,
+    end_ts: datetime,
+    param_ranges: dict[str, Any],
+    initial_balance: Decimal = Decimal("10000"),
+    sort_by: str = "total_return_pct",
+    top: int = 50,
+    on_progress: Any = None,
+    execution: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Parametre taraması: mumlar bir kez okunur, kombinasyonlar süreç havuzunda değerlendirilir.
+
+    Sıralı sonuç tablosu tek bir BacktestRun kaydının metrics_json'ına yazılır (en iyi kombinasyonun metrikleriyle).
+    """
+    strategy = await db.get(Strategy, strategy_id)
+    if not strategy or strategy.user_id != user_id:
+        return {"ok": False, "hata": "Strateji bulunamadı"}
+    if strategy.type not in ("ma_cross", "rsi"):
+        return {"ok": False, "hata": f"Tarama bu strateji tipini desteklemiyor: {strategy.type}"}
+
+    base = json.loads(strategy.params_json) if strategy.params_json else {}
+    try:
+        config = simulator.SimConfig.from_dict(execution)
+        periods = periods_per_year(timeframe, exchange)
+    except (TypeError, ValueError) as e:
+        return {"ok": False, "hata": str(e)}
+    try:
+        combos = sweep.expand_grid(param_ranges, base)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"ok": False, "hata": f"Geçersiz parametre aralığı: {e!s}"}
+    try:
+        arrays = await candle_store.get_arrays(
+            db, exchange, symbol, timeframe,
+            candle_store.to_ms(start_ts), candle_store.to_ms(end_ts),
+        )
+    except ValueError as e:
+        return {"ok": False, "hata": str(e)}
+    if len(arrays) < 2:
+        return {"ok": False, "hata": "Yetersiz OHLCV verisi"}
+
+    results = await sweep.run_grid(
+        {name: getattr(arrays, name) for name in sweep.COLUMNS}, strategy.type, combos,
+        float(initial_balance), on_progress, config, periods,
+    )
+    ranked = sweep.rank(results, sort_by)
+    best = ranked[0] if ranked and "hata" not in ranked[0] else None
+    if best is None:
+        return {"ok": False, "hata": "Geçerli kombinasyon yok", "results": ranked[:top]}
+
+    final_balance = Decimal(str(best["final_balance"]))
+    run = BacktestRun(
+        user_id=user_id,
+        strategy_id=strategy_id,
+        symbol=symbol,
+        exchange=exchange,
+        timeframe=timeframe,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        initial_balance=initial_balance,
+        final_balance=final_balance,
+        total_return_pct=Decimal(str(best["total_return_pct"])) if best["total_return_pct"] is not None else None,
+        total_trades=best["total_trades"],
+        win_rate_pct=Decimal(str(best["win_rate_pct"])) if best["win_rate_pct"] is not None else None,
+        metrics_json=json.dumps({
+            "sweep": True,
+            "best_params": best["params"],
+            "param_ranges": param_ranges,
+            "sort_by": sort_by,
+            "execution": config.to_dict(),
+            "combinations": len(combos),
+            "results": ranked[:top],
+        }),
+    )
+    db.add(run)
+    await db.flush()
+    return {
+        "ok": True,
+        "run_id": run.id,
+        "combinations": len(combos),
+        "best_params": best["params"],
+        "results": ranked[:top],
+    }
+
+
+async def run_walkforward(
+    db: AsyncSession,
+    user_id: int,
+    strategy_id: int,
+    symbol: str,
+    exchange: str,
+    timeframe: str,
+    start_ts: datetime,
+    end_ts: datetime,
+    train_bars: int,
+    test_bars: int,
+    anchored: bool = False,
+    param_ranges: dict[str, Any] | None = None,
+    initial_balance: Decimal = Decimal("10000"),
+    sort_by: str = "total_return_pct",
+    on_progress: Any = None,
+    execution: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Walk-forward: kayan eğitim/test pencereleri, pencere tablosu ve birleştirilmiş örneklem dışı eğri.
+
+    param_ranges verilirse her eğitim penceresinde tarama yapılır; ml_signal stratejisinde model
+    her pencerede yeniden eğitilir; aksi halde strateji parametreleri sabit kalır.
+    """
+    strategy = await db.get(Strategy, strategy_id)
+    if not strategy or strategy.user_id != user_id:
+        return {"ok": False, "hata": "Strateji bulunamadı"}
+    if strategy.type not in ("ma_cross", "rsi", "custom", "ml_signal"):
+        return {"ok": False, "hata": f"Walk-forward bu strateji tipini desteklemiyor: {strategy.type}"}
+    if param_ranges and strategy.type not in ("ma_cross", "rsi"):
+        return {"ok": False, "hata": f"Tarama bu strateji tipini desteklemiyor: {strategy.type}"}
+
+    settings = get_settings()
+    base = json.loads(strategy.params_json) if strategy.params_json else {}
+    try:
+        config = simulator.SimConfig.from_dict(execution)
+        periods = periods_per_year(timeframe, exchange)
+        combos = sweep.expand_grid(param_ranges, base) if param_ranges else []
+    except (KeyError, TypeError, ValueError) as e:
+        return {"ok": False, "hata": str(e)}
+    try:
+        arrays = await candle_store.get_arrays(
+            db, exchange, symbol, timeframe,
+            candle_store.to_ms(start_ts), candle_store.to_ms(end_ts),
+        )
+        windows = walkforward.split_windows(len(arrays), train_bars, test_bars, anchored)
+    except ValueError as e:
+        return {"ok": False, "hata": str(e)}
+    if not windows:
+        return {"ok": False, "hata": "Yetersiz OHLCV verisi: en az bir eğitim + test penceresi gerekli"}
+    if len(windows) > settings.walkforward_max_windows:
+        return {"ok": False, "hata": f"Çok fazla pencere: {len(windows)} (limit: {settings.walkforward_max_windows})"}
+
+    balance = float(initial_balance)
+    results = await walkforward.run_windows(
+        {name: getattr(arrays, name) for name in sweep.COLUMNS}, strategy.type, base, combos, windows,
+        balance, config, periods, sort_by, on_progress,
+    )
+    oos = walkforward.stitch(results, balance)
+    metrics = simulator.metrics(oos, balance, periods, arrays.ts, settings.backtest_trade_log_max)
+
+    ts = arrays.ts
+    table = [
+        {
+            "window": i,
+            "train_start_ts": int(ts[w[0]]),
+            "test_start_ts": int(ts[w[1]]),
+            "test_end_ts": int(ts[w[2] - 1]),
+            "params": r.get("params"),
+            "train": r.get("train"),
+            "test": r.get("test"),
+            **({"hata": r["hata"]} if "hata" in r else {}),
+        }
+        for i, (w, r) in enumerate(zip(windows, results))
+    ]
+    first_test = windows[0][1]
+    equity = _downsample(ts[first_test:], oos.equity, settings.walkforward_equity_points)
+
+    final_balance = Decimal(str(round(oos.final_balance, 8)))
+    total_return_pct = (final_balance - initial_balance) / initial_balance * 100 if initial_balance else None
+    win_rate = Decimal(str(oos.wins)) / oos.total_trades * 100 if oos.total_trades else None
+    summary = {k: v for k, v in metrics.items() if k not in ("trades", "trades_truncated")}
+    run = BacktestRun(
+        user_id=user_id,
+        strategy_id=strategy_id,
+        symbol=symbol,
+        exchange=exchange,
+        timeframe=timeframe,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        initial_balance=initial_balance,
+        final_balance=final_balance,
+        total_return_pct=total_return_pct,
+        total_trades=oos.total_trades,
+        win_rate_pct=win_rate,
+        metrics_json=json.dumps({
+            "walkforward": True,
+            "params": base,
+            "param_ranges": param_ranges,
+            "train_bars": train_bars,
+            "test_bars": test_bars,
+            "anchored": anchored,
+            "sort_by": sort_by,
+            "execution": config.to_dict(),
+            "windows": table,
+            "equity": equity,
+            **metrics,
+        }),
+    )
+    db.add(run)
+    await db.flush()
+    return {
+        "ok": True,
+        "run_id": run.id,
+        "initial_balance": str(initial_balance),
+        "final_balance": str(final_balance),
+        "total_return_pct": float(total_return_pct) if total_return_pct is not None else None,
+        "total_trades": oos.total_trades,
+        "win_rate_pct": float(win_rate) if win_rate is not None else None,
+        **summary,
+        "windows": table,
+        "equity": equity,
+    }
+
+
+def _downsample(ts: np.ndarray, equity: np.ndarray, points: int) -> list[list]:
+    """Eğriyi en fazla points noktaya seyreltir: [[ts, değer], ...] (ilk ve son nokta dahil)."""
+    idx = np.unique(np.linspace(0, len(equity) - 1, min(len(equity), points)).round().astype(int))
+    return [[int(ts[i]), round(float(equity[i]), 8)] for i in idx.tolist()]
+
+
+async def run_portfolio_backtest(
+    db: AsyncSession,
+    user_id: int,
+    legs: list[dict[str, Any]],
+    timeframe: str,
+    start_ts: datetime,
+    end_ts: datetime,
+    initial_balance: Decimal = Decimal("10000"),
+    execution: dict[str, Any] | None = None,
+    risk_limits: dict[str, Any] | None = None,
+    on_progress: Any = None,
+) -> dict[str, Any]:
+    """Portföy backtesti: her bacak {"strategy_id", "symbol", "exchange"}; tek nakit, ortak risk kuralları.
+
+    risk_limits boşsa her bacağın limiti check_risk gibi stratejisinin RiskLimit kaydından okunur;
+    verilirse ({"max_position_size", "daily_loss_limit"}) tüm bacaklara uygulanır.
+    """
+    settings = get_settings()
+    if not legs:
+        return {"ok": False, "hata": "En az bir bacak gerekli"}
+    if len(legs) > settings.portfolio_max_legs:
+        return {"ok": False, "hata": f"Çok fazla bacak: {len(legs)} (limit: {settings.portfolio_max_legs})"}
+    try:
+        config = simulator.SimConfig.from_dict(execution)
+        portfolio.check_config(config)
+        periods = periods_per_year(timeframe)
+    except (TypeError, ValueError) as e:
+        return {"ok": False, "hata": str(e)}
+
+    start_ms, end_ms = candle_store.to_ms(start_ts), candle_store.to_ms(end_ts)
+    strategies: dict[int, Strategy] = {}
+    series: dict[tuple[str, str], CandleArrays] = {}  # aynı sembol birden çok bacakta bir kez okunur
+    built: list[portfolio.Leg] = []
+    for n, spec in enumerate(legs, start=1):
+        sid = spec["strategy_id"]
+        if sid not in strategies:
+            strategy = await db.get(Strategy, sid)
+            if not strategy or strategy.user_id != user_id:
+                return {"ok": False, "hata": f"Strateji bulunamadı: {sid}"}
+            if strategy.type not in ("ma_cross", "rsi", "custom"):
+                return {"ok": False, "hata": f"Portföy backtesti bu strateji tipini desteklemiyor: {strategy.type}"}
+            strategies[sid] = strategy
+        strategy = strategies[sid]
+        symbol = spec.get("symbol") or strategy.symbol
+        exchange = spec.get("exchange") or "binance"
+        if not candle_store.valid_timeframe(timeframe, exchange):
+            return {"ok": False, "hata": f"{exchange}: Geçersiz zaman dilimi: {timeframe}"}
+        key = (exchange, symbol)
+        if key not in series:
+            try:
+                series[key] = await candle_store.get_arrays(db, exchange, symbol, timeframe, start_ms, end_ms)
+            except ValueError as e:
+                return {"ok": False, "hata": f"{symbol}: {e!s}"}
+        if len(series[key]) < 2:
+            return {"ok": False, "hata": f"Yetersiz OHLCV verisi: {symbol}"}
+        limit = risk_limits if risk_limits is not None else await risk_service.get_user_risk_limits(db, user_id, sid)
+        if isinstance(limit, dict):
+            max_pos, daily = limit.get("max_position_size"), limit.get("daily_loss_limit")
+        else:
+            max_pos, daily = (limit.max_position_size, limit.daily_loss_limit) if limit else (None, None)
+        built.append(portfolio.Leg(
+            name=f"{sid}:{symbol}",
+            symbol=symbol,
+            strategy_type=strategy.type,
+            params=json.loads(strategy.params_json) if strategy.params_json else {},
+            candles=series[key],
+            strategy_id=sid,
+            max_position_size=float(max_pos) if max_pos is not None else None,
+            daily_loss_limit=float(daily) if daily is not None else None,
+        ))
+        if on_progress is not None:
+            on_progress(n, len(legs))
+
+    balance = float(initial_balance)
+
+    def _simule_et() -> tuple[portfolio.PortfolioResult, dict[str, Any], list[dict[str, Any]]]:
+        result = portfolio.simulate(built, balance, config)
+        return (
+            result,
+            portfolio.aggregate_metrics(result, built, balance, periods, settings.backtest_trade_log_max),
+            portfolio.leg_metrics(result, built, balance),
+        )
+
+    try:
+        result, metrics, leg_rows = await asyncio.to_thread(_simule_et)
+    except ValueError as e:
+        return {"ok": False, "hata": str(e)}
+
+    equity = _downsample(result.ts, result.equity, settings.walkforward_equity_points)
+    trades = [tr for _, tr in result.trades]
+    wins = sum(1 for tr in trades if tr.pnl > 0)
+    final_balance = Decimal(str(round(result.final_balance, 8)))
+    total_return_pct = (final_balance - initial_balance) / initial_balance * 100 if initial_balance else None
+    win_rate = Decimal(str(wins)) / len(trades) * 100 if trades else None
+    summary = {k: v for k, v in metrics.items() if k not in ("trades", "trades_truncated")}
+    run = BacktestRun(
+        user_id=user_id,
+        strategy_id=built[0].strategy_id,
+        symbol="portfolio",
+        exchange=legs[0].get("exchange") or "binance",
+        timeframe=timeframe,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        initial_balance=initial_balance,
+        final_balance=final_balance,
+        total_return_pct=total_return_pct,
+        total_trades=len(trades),
+        win_rate_pct=win_rate,
+        metrics_json=json.dumps({
+            "portfolio": True,
+            "legs": leg_rows,
+            "risk_limits": risk_limits,
+            "execution": config.to_dict(),
+            "equity": equity,
+            **metrics,
+        }),
+    )
+    db.add(run)
+    await db.flush()
+    return {
+        "ok": True,
+        "run_id": run.id,
+        "initial_balance": str(initial_balance),
+        "final_balance": str(final_balance),
+        "total_return_pct": float(total_return_pct) if total_return_pct is not None else None,
+        "total_trades": len(trades),
+        "win_rate_pct": float(win_rate) if win_rate is not None else None,
+        **summary,
+        "legs": leg_rows,
+        "equity": equity,
     }
 
 
@@ -129,19 +493,27 @@ async def list_backtest_runs(
     q = q.order_by(BacktestRun.created_at.desc()).offset(offset).limit(limit)
     result = await db.execute(q)
     runs = result.scalars().all()
-    items = [
-        {
-            "id": r.id,
-            "strategy_id": r.strategy_id,
-            "symbol": r.symbol,
-            "timeframe": r.timeframe,
-            "start_ts": r.start_ts,
-            "end_ts": r.end_ts,
-            "final_balance": str(r.final_balance),
-            "total_return_pct": float(r.total_return_pct) if r.total_return_pct else None,
-            "total_trades": r.total_trades,
-            "win_rate_pct": float(r.win_rate_pct) if r.win_rate_pct else None,
-        }
-        for r in runs
-    ]
-    return {"runs": items}
+    return {"runs": [_run_to_dict(r) for r in runs]}
+
+
+def _run_to_dict(r: BacktestRun) -> dict[str, Any]:
+    return {
+        "id": r.id,
+        "strategy_id": r.strategy_id,
+        "symbol": r.symbol,
+        "timeframe": r.timeframe,
+        "start_ts": r.start_ts,
+        "end_ts": r.end_ts,
+        "final_balance": str(r.final_balance),
+        "total_return_pct": float(r.total_return_pct) if r.total_return_pct else None,
+        "total_trades": r.total_trades,
+        "win_rate_pct": float(r.win_rate_pct) if r.win_rate_pct else None,
+    }
+
+
+async def get_backtest_run(db: AsyncSession, run_id: int, user_id: int) -> dict[str, Any] | None:
+    """Tek çalıştırma; metrics_json (drawdown, Sharpe, işlem kaydı ...) açılmış olarak."""
+    run = await db.get(BacktestRun, run_id)
+    if not run or run.user_id != user_id:
+        return None
+    return {**_run_to_dict(run), "metrics": json.loads(run.metrics_json) if run.metrics_json else None}
@@ -0,0 +1,399 @@
+"""Olay güdümlü backtest simülasyonu: emir tipleri, komisyon/kayma modelleri, bar içi tetikleme.
+
+Sinyal mumun kapanışında oluşur (zamanlayıcıdaki gibi). market emir o kapanıştan dolar; limit/stop
+emirler sonraki mumlarda high/low ile tetiklenir, stop-loss / take-profit da öyle. Döngü bar bar
+değil olaydan olaya ilerler: sıradaki sinyal ikili aramayla, sıradaki tetikleme kısa pencerede
+Python, uzun pencerede parça parça NumPy taramasıyla bulunur. Yalnızca uzun pozisyon: buy açar,
+sell kapatır. Varsayılan ayarlar (market, maliyetsiz, nakdin %10'u) sinyal kapanışında dolumdur.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any
+
+import numpy as np
+
+from app.services.backtest.engine import BUY, SELL
+
+ORDER_TYPES = ("market", "limit", "stop_market", "stop_limit")
+SLIPPAGE_MODELS = ("fixed", "range")
+
+_SCAN = 16  # bu kadar bara kadar Python döngüsü, sonrası NumPy
+_CHUNK = 256  # NumPy taramasında ilk parça (her adımda 4 katı)
+
+
+@dataclass(frozen=True)
+class SimConfig:
+    order_type: str = "market"  # market | limit | stop_market | stop_limit (giriş ve sinyal çıkışları)
+    position_fraction: float = 0.1  # giriş büyüklüğü: nakdin oranı
+    maker_fee_pct: float = 0.0  # limit dolumlar
+    taker_fee_pct: float = 0.0  # market / stop dolumlar
+    slippage_model: str = "fixed"  # fixed: fiyatın %'si; range: dolum mumunun (high - low) oranı
+    slippage: float = 0.0
+    limit_offset_pct: float = 0.0  # limit: al kapanışın %x altı, sat üstü; stop_limit: stop'tan uzaklık
+    stop_offset_pct: float = 0.0  # stop tetik: al kapanışın %x üstü, sat altı
+    order_ttl_bars: int = 0  # bekleyen emrin geçerli olduğu mum sayısı (0 = karşı sinyale kadar)
+    stop_loss_pct: float | None = None  # girişin %x altı (bar içi, low ile)
+    take_profit_pct: float | None = None  # girişin %x üstü (bar içi, high ile)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> SimConfig:
+        """Bilinmeyen anahtar veya geçersiz değerde ValueError."""
+        data = dict(data or {})
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Bilinmeyen simülasyon ayarı: {', '.join(sorted(unknown))}")
+        config = cls(**{k: v for k, v in data.items() if v is not None})
+        try:
+            config.validate()
+        except TypeError:
+            raise ValueError("Geçersiz simülasyon ayarı değeri") from None
+        return config
+
+    def validate(self) -> None:
+        if self.order_type not in ORDER_TYPES:
+            raise ValueError(f"Geçersiz emir tipi: {self.order_type}")
+        if self.slippage_model not in SLIPPAGE_MODELS:
+            raise ValueError(f"Geçersiz kayma modeli: {self.slippage_model}")
+        if not 0 < self.position_fraction <= 1:
+            raise ValueError("position_fraction 0 ile 1 arasında olmalı")
+        for name in ("maker_fee_pct", "taker_fee_pct", "slippage", "limit_offset_pct", "stop_offset_pct"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} negatif olamaz")
+        if self.order_ttl_bars < 0:
+            raise ValueError("order_ttl_bars negatif olamaz")
+        for name in ("stop_loss_pct", "take_profit_pct"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} pozitif olmalı")
+        if self.stop_loss_pct is not None and self.stop_loss_pct >= 100:
+            raise ValueError("stop_loss_pct 100'den küçük olmalı")
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Trade:
+    entry_bar: int
+    entry_price: float
+    qty: float
+    entry_fee: float
+    exit_bar: int = -1
+    exit_price: float = 0.0
+    exit_fee: float = 0.0
+    reason: str = ""  # signal | stop_loss | take_profit | end
+
+    @property
+    def pnl(self) -> float:
+        return (self.exit_price - self.entry_price) * self.qty - self.entry_fee - self.exit_fee
+
+
+@dataclass
+class SimResult:
+    final_balance: float
+    trades: list[Trade]
+    equity: np.ndarray  # start'tan son bara kadar her kapanıştaki özsermaye
+    exposure: np.ndarray = field(repr=False)  # aynı barlarda pozisyon var mı (bool)
+
+    @property
+    def total_trades(self) -> int:
+        return len(self.trades)
+
+    @property
+    def wins(self) -> int:
+        return sum(1 for t in self.trades if t.pnl > 0)
+
+
+def _first_le(values: list[float], arr: np.ndarray, a: int, b: int, x: float) -> int:
+    """[a, b] aralığında değeri x'e eşit/küçük ilk bar; yoksa -1."""
+    stop = min(b + 1, a + _SCAN)
+    for j in range(a, stop):
+        if values[j] <= x:
+            return j
+    chunk = _CHUNK
+    while stop <= b:
+        end = min(b + 1, stop + chunk)
+        hit = np.flatnonzero(arr[stop:end] <= x)
+        if len(hit):
+            return stop + int(hit[0])
+        stop, chunk = end, chunk * 4
+    return -1
+
+
+def _first_ge(values: list[float], arr: np.ndarray, a: int, b: int, x: float) -> int:
+    """[a, b] aralığında değeri x'e eşit/büyük ilk bar; yoksa -1."""
+    stop = min(b + 1, a + _SCAN)
+    for j in range(a, stop):
+        if values[j] >= x:
+            return j
+    chunk = _CHUNK
+    while stop <= b:
+        end = min(b + 1, stop + chunk)
+        hit = np.flatnonzero(arr[stop:end] >= x)
+        if len(hit):
+            return stop + int(hit[0])
+        stop, chunk = end, chunk * 4
+    return -1
+
+
+def _next(indices: list[int], t: int) -> int:
+    """Sıralı sinyal barlarında t'ye eşit/büyük ilki; yoksa -1."""
+    k = bisect_left(indices, t)
+    return indices[k] if k < len(indices) else -1
+
+
+def simulate(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    sig: np.ndarray,
+    start: int,
+    initial_balance: float,
+    config: SimConfig | None = None,
+) -> SimResult:
+    """Sinyal dizisini (1 al, -1 sat, 0 yok) emir/dolum olaylarıyla simüle eder."""
+    config = config or SimConfig()
+    arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in (open_, high, low, close)]
+    o_arr, h_arr, l_arr, c_arr = arrays
+    n = len(c_arr)
+    start = min(max(start, 0), n)
+    o, h, lo, c = (a.tolist() for a in arrays)
+    tail = np.asarray(sig[start:])
+    buys = (np.flatnonzero(tail == BUY) + start).tolist()
+    sells = (np.flatnonzero(tail == SELL) + start).tolist()
+
+    kind = config.order_type
+    maker = config.maker_fee_pct / 100
+    taker = config.taker_fee_pct / 100
+    slip_range = config.slippage_model == "range"
+    slip = config.slippage if slip_range else config.slippage / 100
+    limit_off = config.limit_offset_pct / 100
+    stop_off = config.stop_offset_pct / 100
+    ttl = config.order_ttl_bars
+    sl_pct = config.stop_loss_pct / 100 if config.stop_loss_pct else None
+    tp_pct = config.take_profit_pct / 100 if config.take_profit_pct else None
+
+    def slipped(price: float, side: int, j: int) -> float:
+        amount = slip * (h[j] - lo[j]) if slip_range else slip * price
+        return price + amount if side == BUY else price - amount
+
+    def order_prices(side: int, j: int) -> tuple[float, float]:
+        """Kapanışta verilen emrin (stop, limit) fiyatları."""
+        stop_px = c[j] * (1 + stop_off) if side == BUY else c[j] * (1 - stop_off)
+        if kind == "stop_limit":
+            return stop_px, stop_px * (1 + limit_off) if side == BUY else stop_px * (1 - limit_off)
+        return stop_px, c[j] * (1 - limit_off) if side == BUY else c[j] * (1 + limit_off)
+
+    def order_fill(side: int, stop_px: float, limit_px: float, a: int, b: int) -> tuple[int, float, float]:
+        """Bekleyen emrin [a, b] içindeki dolumu: (bar, fiyat, komisyon oranı); dolmazsa bar -1."""
+        if kind == "limit":
+            if side == BUY:
+                j = _first_le(lo, l_arr, a, b, limit_px)
+                return j, min(o[j], limit_px), maker
+            j = _first_ge(h, h_arr, a, b, limit_px)
+            return j, max(o[j], limit_px), maker
+        if side == BUY:
+            j = _first_ge(h, h_arr, a, b, stop_px)
+            trigger = max(o[j], stop_px)
+        else:
+            j = _first_le(lo, l_arr, a, b, stop_px)
+            trigger = min(o[j], stop_px)
+        if j < 0 or kind == "stop_market":
+            return j, slipped(trigger, side, j), taker
+        # stop_limit: tetik anında limit içindeyse hemen (taker, limitle sınırlı), değilse sonraki
+        # mumlarda limit emir olarak bekler (tetik mumunun geri kalanı bilinmediğinden sayılmaz).
+        if side == BUY and trigger <= limit_px:
+            return j, min(slipped(trigger, side, j), limit_px), taker
+        if side == SELL and trigger >= limit_px:
+            return j, max(slipped(trigger, side, j), limit_px), taker
+        if side == BUY:
+            j = _first_le(lo, l_arr, j + 1, b, limit_px)
+            return j, min(o[j], limit_px), maker
+        j = _first_ge(h, h_arr, j + 1, b, limit_px)
+        return j, max(o[j], limit_px), maker
+
+    def protective(trade: Trade, a: int, b: int) -> tuple[int, float, float, str]:
+        """Stop-loss / take-profit'in [a, b] içindeki ilk tetiklenmesi; aynı mumda ikisi varsa stop-loss."""
+        j_sl = j_tp = -1
+        if sl_pct is not None:
+            sl = trade.entry_price * (1 - sl_pct)
+            j_sl = _first_le(lo, l_arr, a, b, sl)
+        if tp_pct is not None:
+            tp = trade.entry_price * (1 + tp_pct)
+            j_tp = _first_ge(h, h_arr, a, j_sl if j_sl >= 0 else b, tp)
+        if j_sl >= 0 and (j_tp < 0 or j_sl <= j_tp):
+            return j_sl, slipped(min(o[j_sl], sl), SELL, j_sl), taker, "stop_loss"
+        if j_tp >= 0:
+            return j_tp, max(o[j_tp], tp), maker, "take_profit"
+        return -1, 0.0, 0.0, ""
+
+    cash = float(initial_balance)
+    trades: list[Trade] = []
+    position: Trade | None = None
+    pending: tuple[int, int, float, float] | None = None  # (yön, verildiği bar, stop, limit)
+
+    def enter(j: int, price: float, fee_rate: float) -> None:
+        nonlocal cash, position
+        if cash <= 0:
+            return
+        qty = cash * config.position_fraction / price
+        fee = qty * price * fee_rate
+        cash -= qty * price + fee
+        position = Trade(j, price, qty, fee)
+
+    def leave(j: int, price: float, fee_rate: float, reason: str) -> None:
+        nonlocal cash, position
+        fee = position.qty * price * fee_rate
+        cash += position.qty * price - fee
+        position.exit_bar, position.exit_price, position.exit_fee, position.reason = j, price, fee, reason
+        trades.append(position)
+        position = None
+
+    def on_signal(side: int, j: int) -> None:
+        """j kapanışındaki sinyal: market hemen dolar, diğerleri bekleyen emir olur."""
+        nonlocal pending
+        if kind == "market":
+            price = slipped(c[j], side, j)
+            enter(j, price, taker) if side == BUY else leave(j, price, taker, "signal")
+        else:
+            pending = (side, j, *order_prices(side, j))
+
+    last = n - 1
+    t = start  # t'den önceki barların bar içi ve kapanış olayları işlendi
+    skip = False  # t barının bar içi olayları da işlendi (yalnızca kapanışı kaldı)
+    while t < n:
+        a = t + 1 if skip else t
+        if pending is not None:
+            side, placed, stop_px, limit_px = pending
+            cancel = _next(sells if side == BUY else buys, t)
+            expire = min(placed + ttl, last) if ttl else last
+            end = min(expire, cancel) if cancel >= 0 else expire
+            j, price, fee_rate = order_fill(side, stop_px, limit_px, a, end)
+            if position is not None:
+                pj, pprice, pfee, reason = protective(position, a, end)
+                if pj >= 0 and (j < 0 or pj <= j):
+                    pending = None
+                    leave(pj, pprice, pfee, reason)
+                    t, skip = pj, True
+                    continue
+            if j >= 0:
+                pending = None
+                enter(j, price, fee_rate) if side == BUY else leave(j, price, fee_rate, "signal")
+                t, skip = j, True
+                continue
+            # karşı sinyalle iptal ya da süre doldu; aradaki aynı yönlü sinyaller yok sayılır
+            pending = None
+            t, skip = end + 1, False
+            continue
+        if position is None:
+            j = _next(buys, t)
+            if j < 0:
+                break
+            on_signal(BUY, j)
+            t, skip = j + 1, False
+            continue
+        j = _next(sells, t)
+        if sl_pct is not None or tp_pct is not None:
+            pj, pprice, pfee, reason = protective(position, a, j if j >= 0 else last)
+            if pj >= 0:
+                leave(pj, pprice, pfee, reason)
+                t, skip = pj, True
+                continue
+        if j < 0:
+            break
+        on_signal(SELL, j)
+        t, skip = j + 1, False
+
+    if position is not None:
+        # Açık pozisyon son kapanışla değerlenir (komisyonsuz)
+        leave(n, c[last], 0.0, "end")
+
+    equity, exposure = _equity_curve(c_arr, start, float(initial_balance), trades)
+    final = float(equity[-1]) if len(equity) else cash
+    return SimResult(final, trades, equity, exposure)
+
+
+def _equity_curve(
+    close: np.ndarray, start: int, initial_balance: float, trades: list[Trade]
+) -> tuple[np.ndarray, np.ndarray]:
+    """start'tan itibaren her kapanışta nakit + pozisyon değeri ve pozisyon maskesi."""
+    m = len(close) - start
+    cash_delta = np.zeros(m + 1)
+    held = np.zeros(m)
+    for tr in trades:
+        i, k = tr.entry_bar - start, tr.exit_bar - start
+        cash_delta[i] -= tr.qty * tr.entry_price + tr.entry_fee
+        cash_delta[k] += tr.qty * tr.exit_price - tr.exit_fee  # "end" için k = m (eğri dışında)
+        held[i:k] = tr.qty
+    equity = initial_balance + np.cumsum(cash_delta[:m]) + held * close[start:]
+    return equity, held > 0
+
+
+def metrics(
+    result: SimResult,
+    initial_balance: float,
+    periods_per_year: float,
+    ts: np.ndarray | None = None,
+    max_trades: int = 1000,
+) -> dict[str, Any]:
+    """metrics_json için özet metrikler ve işlem kaydı (ilk max_trades işlem)."""
+    equity = np.concatenate([[initial_balance], result.equity])
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, equity / peak - 1, 0.0)
+        returns = np.diff(equity) / equity[:-1]
+    returns = returns[np.isfinite(returns)]
+    scale = math.sqrt(periods_per_year) if periods_per_year > 0 else 0.0
+    std = float(returns.std()) if len(returns) > 1 else 0.0
+    downside = returns[returns < 0]
+    downside_std = float(np.sqrt(np.mean(downside ** 2))) if len(downside) else 0.0
+
+    pnls = [t.pnl for t in result.trades]
+    gross_profit = sum(p for p in pnls if p > 0)
+    gross_loss = -sum(p for p in pnls if p < 0)
+
+    def _ts(bar: int) -> int | None:
+        if ts is None or not len(ts):
+            return None
+        return int(ts[min(bar, len(ts) - 1)])
+
+    def _r(x: float | None, nd: int = 4) -> float | None:
+        return None if x is None or not math.isfinite(x) else round(x, nd)
+
+    log = [
+        {
+            "entry_ts": _ts(t.entry_bar),
+            "exit_ts": _ts(t.exit_bar),
+            "entry_price": _r(t.entry_price, 8),
+            "exit_price": _r(t.exit_price, 8),
+            "qty": _r(t.qty, 8),
+            "fee": _r(t.entry_fee + t.exit_fee, 8),
+            "pnl": _r(t.pnl, 8),
+            "pnl_pct": _r(t.pnl / (t.entry_price * t.qty) * 100) if t.entry_price * t.qty else None,
+            "bars": t.exit_bar - t.entry_bar,
+            "reason": t.reason,
+        }
+        for t in result.trades[:max_trades]
+    ]
+    reasons: dict[str, int] = {}
+    for t in result.trades:
+        reasons[t.reason] = reasons.get(t.reason, 0) + 1
+    mean = float(returns.mean()) if len(returns) else 0.0
+    return {
+        "max_drawdown_pct": _r(float(drawdown.min()) * 100),
+        "sharpe": _r(mean / std * scale) if std > 0 else None,
+        "sortino": _r(mean / downside_std * scale) if downside_std > 0 else None,
+        "exposure_pct": _r(float(result.exposure.mean()) * 100) if len(result.exposure) else 0.0,
+        "fees_paid": _r(sum(t.entry_fee + t.exit_fee for t in result.trades), 8),
+        "profit_factor": _r(gross_profit / gross_loss) if gross_loss > 0 else None,
+        "avg_trade_pnl": _r(sum(pnls) / len(pnls), 8) if pnls else None,
+        "best_trade_pnl": _r(max(pnls), 8) if pnls else None,
+        "worst_trade_pnl": _r(min(pnls), 8) if pnls else None,
+        "exit_reasons": reasons,
+        "trades": log,
+        "trades_truncated": len(result.trades) > max_trades,
+    }
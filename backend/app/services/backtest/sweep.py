@@ -0,0 +1,214 @@
+"""Parametre taraması (grid search): kombinasyonlar süreç havuzuna dağıtılır.
+
+OHLCV sütunları bir kez SharedMemory'ye kopyalanır; işçiler pickle yerine aynı belleğe bağlanır.
+Her kombinasyon run_backtest ile aynı olay güdümlü simülasyondan (aynı emir/komisyon ayarlarıyla) geçer.
+Bu modül DB'ye dokunmaz; kayıt ve ilerleme takibi backtest.service'tedir.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing as mp
+import os
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.backtest import engine, simulator
+
+_BATCH_SIZE = 16
+
+_pool: ProcessPoolExecutor | None = None
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+# İşçi tarafı: bağlanılan son SharedMemory (isim, nesne, sütunlar)
+_attached: tuple[str, shared_memory.SharedMemory, dict[str, np.ndarray]] | None = None
+
+
+def _values(spec: Any) -> list[Any]:
+    """[v1, v2, ...] veya {"start", "stop", "step"} (stop dahil) → değer listesi."""
+    if isinstance(spec, dict):
+        start, stop = spec["start"], spec["stop"]
+        step = spec.get("step", 1)
+        if step <= 0:
+            raise ValueError("step pozitif olmalı")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        vals = [start + i * step for i in range(max(count, 0))]
+        if all(isinstance(v, int) for v in (start, stop, step)):
+            return [int(v) for v in vals]
+        return [round(float(v), 10) for v in vals]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+
+def expand_grid(param_ranges: dict[str, Any], base: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    """Parametre aralıklarının kartezyen çarpımı; base parametreler her kombinasyona eklenir."""
+    names = list(param_ranges)
+    grids = [_values(param_ranges[n]) for n in names]
+    limit = get_settings().backtest_sweep_max_combinations
+    total = 1
+    for g in grids:
+        total *= len(g)
+    if total > limit:
+        raise ValueError(f"Çok fazla kombinasyon: {total} (limit: {limit})")
+    return [{**(base or {}), **dict(zip(names, combo))} for combo in itertools.product(*grids)]
+
+
+def share(columns: dict[str, np.ndarray]) -> shared_memory.SharedMemory:
+    """COLUMNS sırasıyla (sütun × mum) matrisini yeni SharedMemory'ye kopyalar; çağıran close + unlink eder."""
+    matrix = np.stack([np.asarray(columns[name], dtype=np.float64) for name in COLUMNS])
+    shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+    return shm
+
+
+def attach(name: str, length: int) -> dict[str, np.ndarray]:
+    """İşçi tarafı: paylaşılan matrise bağlanır (son bağlantı tekrar kullanılır), sütun adı → dizi."""
+    global _attached
+    if _attached is None or _attached[0] != name:
+        if _attached is not None:
+            _attached[1].close()
+            _attached = None
+        shm = shared_memory.SharedMemory(name=name)
+        matrix = np.ndarray((len(COLUMNS), length), dtype=np.float64, buffer=shm.buf)
+        _attached = (name, shm, dict(zip(COLUMNS, matrix)))
+    return _attached[2]
+
+
+def summarize(
+    params: dict[str, Any] | None,
+    result: simulator.SimResult,
+    initial_balance: float,
+    periods_per_year: float,
+) -> dict[str, Any]:
+    """Sonuç tablosu satırı."""
+    metrics = simulator.metrics(result, initial_balance, periods_per_year, max_trades=0)
+    balance, trades, wins = result.final_balance, result.total_trades, result.wins
+    return {
+        "params": params,
+        "final_balance": round(balance, 8),
+        "total_return_pct": round((balance - initial_balance) / initial_balance * 100, 4)
+        if initial_balance else None,
+        "total_trades": trades,
+        "win_rate_pct": round(wins / trades * 100, 2) if trades else None,
+        "max_drawdown_pct": metrics["max_drawdown_pct"],
+        "sharpe": metrics["sharpe"],
+    }
+
+
+def evaluate(
+    columns: dict[str, np.ndarray],
+    strategy_type: str,
+    params: dict[str, Any],
+    initial_balance: float,
+    config: simulator.SimConfig,
+    periods_per_year: float,
+    start: int = 0,
+) -> tuple[dict[str, Any], simulator.SimResult | None]:
+    """Tek kombinasyon: tüm seride sinyal, start'tan (ısınma barlarından önce değil) itibaren simülasyon."""
+    try:
+        sig = engine.compute_signals(strategy_type, columns["close"], params, columns)
+    except (TypeError, ValueError) as e:
+        return {"params": params, "hata": str(e)}, None
+    if sig is None:
+        return {"params": params, "hata": "Geçersiz parametre"}, None
+    result = simulator.simulate(
+        columns["open"], columns["high"], columns["low"], columns["close"], sig,
+        max(start, engine.min_bars_for(strategy_type, params)), initial_balance, config,
+    )
+    return summarize(params, result, initial_balance, periods_per_year), result
+
+
+def _evaluate_batch(
+    shm_name: str,
+    length: int,
+    strategy_type: str,
+    combos: list[dict[str, Any]],
+    initial_balance: float,
+    config: simulator.SimConfig,
+    periods_per_year: float,
+) -> list[dict[str, Any]]:
+    """İşçi süreçte çalışır: her kombinasyon için vektörel sinyal + olay güdümlü simülasyon."""
+    columns = attach(shm_name, length)
+    return [
+        evaluate(columns, strategy_type, params, initial_balance, config, periods_per_year)[0]
+        for params in combos
+    ]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Uygulama ömrü boyunca tek süreç havuzu (spawn: olay döngüsü thread'leriyle fork güvenli değil)."""
+    global _pool
+    if _pool is None:
+        workers = get_settings().backtest_sweep_workers or os.cpu_count() or 1
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def rank(results: list[dict[str, Any]], sort_by: str = "total_return_pct") -> list[dict[str, Any]]:
+    """Hatalı olmayanları sort_by'a göre azalan sırala; hatalılar sonda."""
+    ok = [r for r in results if "hata" not in r]
+    bad = [r for r in results if "hata" in r]
+    ok.sort(key=lambda r: (r.get(sort_by) is not None, r.get(sort_by) or 0), reverse=True)
+    for i, r in enumerate(ok, start=1):
+        r["rank"] = i
+    return ok + bad
+
+
+async def iter_pool(func: Callable[..., Any], calls: list[tuple]) -> AsyncIterator[Any]:
+    """func(*args) çağrılarını havuzda çalıştırır, sonuçları tamamlanma sırasıyla verir; hata/iptalde kalanlar iptal."""
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    futures = [loop.run_in_executor(pool, func, *args) for args in calls]
+    try:
+        for fut in asyncio.as_completed(futures):
+            yield await fut
+    finally:
+        for f in futures:
+            f.cancel()
+
+
+async def run_grid(
+    columns: dict[str, np.ndarray],
+    strategy_type: str,
+    combos: list[dict[str, Any]],
+    initial_balance: float,
+    on_progress: Callable[[int, int], None] | None = None,
+    config: simulator.SimConfig | None = None,
+    periods_per_year: float = 0.0,
+) -> list[dict[str, Any]]:
+    """Kombinasyonları havuzda değerlendirir; olay döngüsünü bloklamaz. columns: COLUMNS adlı diziler."""
+    config = config or simulator.SimConfig()
+    total = len(combos)
+    if total == 0:
+        return []
+    length = len(columns["close"])
+    shm = share(columns)
+    try:
+        calls = [
+            (shm.name, length, strategy_type, combos[i : i + _BATCH_SIZE],
+             initial_balance, config, periods_per_year)
+            for i in range(0, total, _BATCH_SIZE)
+        ]
+        results: list[dict[str, Any]] = []
+        async for batch in iter_pool(_evaluate_batch, calls):
+            results.extend(batch)
+            if on_progress is not None:
+                on_progress(len(results), total)
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
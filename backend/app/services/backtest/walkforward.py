@@ -0,0 +1,180 @@
+"""Walk-forward (ileriye doğru) değerlendirme: eğitim penceresinde seç, sonraki test penceresinde sına.
+
+Geçmiş ardışık, örtüşmeyen test pencerelerine bölünür; her birinin önünde kayan (veya anchored:
+baştan büyüyen) bir eğitim penceresi vardır. Eğitimde parametreler taranır (param_ranges) ya da
+ml_signal stratejisinde model yeniden eğitilir; test penceresi yalnızca seçilen ayarla simüle edilir.
+Pencereler sweep süreç havuzunda paralel çalışır. Pozisyon büyüklüğü nakitle orantılı olduğundan
+her pencere aynı başlangıç bakiyesiyle koşulur ve test eğrileri bileşik ölçeklenerek birleştirilir.
+Bu modül DB'ye dokunmaz; kayıt backtest.service'tedir.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import replace
+from typing import Any
+
+import numpy as np
+
+from app.services.backtest import engine, simulator, sweep
+from app.services.ml import trainer
+
+_ML_MIN_SAMPLES = 10
+
+
+def split_windows(n: int, train_bars: int, test_bars: int, anchored: bool = False) -> list[tuple[int, int, int]]:
+    """(eğitim başı, test başı, test sonu) bar indeksleri; test pencereleri uç uca, son pencere kısa olabilir."""
+    if train_bars < 1 or test_bars < 1:
+        raise ValueError("train_bars ve test_bars pozitif olmalı")
+    windows = []
+    test_start = train_bars
+    while test_start < n:
+        test_end = min(test_start + test_bars, n)
+        windows.append((0 if anchored else test_start - train_bars, test_start, test_end))
+        test_start = test_end
+    return windows
+
+
+def _row(summary: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in summary.items() if k not in ("params", "rank")}
+
+
+def _ml_signals(
+    columns: dict[str, np.ndarray], train_start: int, test_start: int, test_end: int
+) -> tuple[np.ndarray, dict[str, Any], float | None]:
+    """Eğitim penceresinde modeli yeniden eğitir; test barlarında 1 → al, 0 → sat (zamanlayıcı gibi)."""
+    close = columns["close"][:test_end]
+    features = trainer.feature_matrix(close, columns["volume"][:test_end])
+    lo, hi = max(train_start, 20), test_start - 1  # hedef (sonraki mum) test penceresine taşmasın
+    if test_start < 21 or hi - lo < _ML_MIN_SAMPLES:
+        raise ValueError("Eğitim penceresinde yetersiz örnek")
+    X, y = features[lo:hi], (close[lo + 1 : hi + 1] > close[lo:hi]).astype(int)
+    model = trainer.fit_classifier(X, y)
+    pred = model.predict(features[test_start:test_end])
+    sig = np.zeros(test_end, dtype=np.int8)
+    sig[test_start:test_end] = np.where(pred == 1, engine.BUY, engine.SELL)
+    actual = close[test_start + 1 : test_end] > close[test_start : test_end - 1]
+    test_accuracy = float((pred[:-1] == actual).mean()) if len(actual) else None
+    return sig, {"accuracy": round(float(model.score(X, y)), 4), "samples": len(X)}, test_accuracy
+
+
+def _run_window(
+    shm_name: str,
+    length: int,
+    strategy_type: str,
+    params: dict[str, Any],
+    combos: list[dict[str, Any]],
+    window: tuple[int, int, int],
+    initial_balance: float,
+    config: simulator.SimConfig,
+    periods_per_year: float,
+    sort_by: str,
+) -> dict[str, Any]:
+    """İşçi süreçte çalışır: tek pencerenin eğitimi ve testi. Sinyaller yalnızca test sonuna kadarki veriyle."""
+    columns = sweep.attach(shm_name, length)
+    train_start, test_start, test_end = window
+    out: dict[str, Any] = {"window": window, "params": params}
+    try:
+        if strategy_type == "ml_signal":
+            test_cols = {k: v[:test_end] for k, v in columns.items()}
+            sig, out["train"], accuracy = _ml_signals(columns, train_start, test_start, test_end)
+            result = simulator.simulate(
+                test_cols["open"], test_cols["high"], test_cols["low"], test_cols["close"],
+                sig, test_start, initial_balance, config,
+            )
+            out["test"] = {**_row(sweep.summarize(None, result, initial_balance, periods_per_year)),
+                           "accuracy": round(accuracy, 4) if accuracy is not None else None}
+            out["params"] = None
+        else:
+            train_cols = {k: v[:test_start] for k, v in columns.items()}
+            if combos:
+                rows = [
+                    sweep.evaluate(train_cols, strategy_type, p, initial_balance, config, periods_per_year,
+                                   start=train_start)[0]
+                    for p in combos
+                ]
+                ranked = sweep.rank(rows, sort_by)
+                if not ranked or "hata" in ranked[0]:
+                    return {**out, "hata": "Eğitim penceresinde geçerli kombinasyon yok"}
+                out["params"] = params = ranked[0]["params"]
+                out["train"] = _row(ranked[0])
+            else:
+                summary, _ = sweep.evaluate(
+                    train_cols, strategy_type, params, initial_balance, config, periods_per_year, start=train_start
+                )
+                out["train"] = _row(summary)
+            test_cols = {k: v[:test_end] for k, v in columns.items()}
+            summary, result = sweep.evaluate(
+                test_cols, strategy_type, params, initial_balance, config, periods_per_year, start=test_start
+            )
+            if result is None:
+                return {**out, "hata": summary["hata"]}
+            out["test"] = _row(summary)
+    except ValueError as e:
+        return {**out, "hata": str(e)}
+    # Isınma barları test başından sonraysa eğri kısa kalır: öncesi nakitte (düz) sayılır
+    pad = (test_end - test_start) - len(result.equity)
+    out["equity"] = np.concatenate([np.full(pad, initial_balance), result.equity])
+    out["exposure"] = np.concatenate([np.zeros(pad, dtype=bool), result.exposure])
+    out["trades"] = result.trades
+    return out
+
+
+def stitch(results: list[dict[str, Any]], initial_balance: float) -> simulator.SimResult:
+    """Pencere sonuçlarını (sıralı) tek örneklem dışı sonuca birleştirir: her pencere öncekinin bitişiyle ölçeklenir."""
+    running = initial_balance
+    equity: list[np.ndarray] = []
+    exposure: list[np.ndarray] = []
+    trades: list[simulator.Trade] = []
+    for r in results:
+        test_start, test_end = r["window"][1], r["window"][2]
+        if "hata" in r:
+            # Pencere işlem yapmadı: özsermaye düz
+            equity.append(np.full(test_end - test_start, running))
+            exposure.append(np.zeros(test_end - test_start, dtype=bool))
+            continue
+        scale = running / initial_balance
+        equity.append(r["equity"] * scale)
+        exposure.append(r["exposure"])
+        trades.extend(
+            replace(t, qty=t.qty * scale, entry_fee=t.entry_fee * scale, exit_fee=t.exit_fee * scale)
+            for t in r["trades"]
+        )
+        running = float(equity[-1][-1]) if len(equity[-1]) else running
+    curve = np.concatenate(equity) if equity else np.empty(0)
+    mask = np.concatenate(exposure) if exposure else np.empty(0, dtype=bool)
+    return simulator.SimResult(running, trades, curve, mask)
+
+
+async def run_windows(
+    columns: dict[str, np.ndarray],
+    strategy_type: str,
+    params: dict[str, Any],
+    combos: list[dict[str, Any]],
+    windows: list[tuple[int, int, int]],
+    initial_balance: float,
+    config: simulator.SimConfig,
+    periods_per_year: float,
+    sort_by: str = "total_return_pct",
+    on_progress: Callable[[int, int], None] | None = None,
+) -> list[dict[str, Any]]:
+    """Pencereleri havuzda paralel değerlendirir; sonuçlar pencere sırasıyla döner."""
+    if not windows:
+        return []
+    length = len(columns["close"])
+    shm = sweep.share(columns)
+    try:
+        calls = [
+            (shm.name, length, strategy_type, params, combos, w, initial_balance, config,
+             periods_per_year, sort_by)
+            for w in windows
+        ]
+        results: list[dict[str, Any]] = []
+        async for r in sweep.iter_pool(_run_window, calls):
+            results.append(r)
+            if on_progress is not None:
+                on_progress(len(results), len(windows))
+    finally:
+        shm.close()
+        shm.unlink()
+    results.sort(key=lambda r: r["window"][1])
+    return results
@@ -10,6 +10,7 @@ from app.models.order import Order
 from app.models.position import Position
 from app.services.risk import service as risk_service
 from app.services.market_data import service as market_service
+from app.services.realtime import user_events
 
 
 async def _fill_price_alis(symbol: str, exchange: str, limit_fiyat: Decimal | None) -> Decimal:
@@ -161,6 +162,8 @@ async def submit_paper_order(
                 )
 
     await db.flush()
+    user_events.emit(db, user_id, "orders", {"type": "order", "order": order_to_dict(order)})
+    user_events.emit(db, user_id, "positions", {"type": "positions", **(await list_positions(db, user_id))})
     return {
         "ok": True,
         "id": order.id,
@@ -184,24 +187,24 @@ async def list_orders(
     q = q.order_by(Order.created_at.desc()).offset(offset).limit(limit)
     result = await db.execute(q)
     orders = result.scalars().all()
-    items = [
-        {
-            "id": o.id,
-            "strategy_id": o.strategy_id,
-            "symbol": o.symbol,
-            "side": o.side,
-            "order_type": o.order_type,
-            "quantity": str(o.quantity),
-            "price": str(o.price) if o.price else None,
-            "stop_price": str(o.stop_price) if o.stop_price else None,
-            "status": o.status,
-            "mode": o.mode,
-            "realized_pnl": str(o.realized_pnl) if o.realized_pnl is not None else None,
-            "created_at": o.created_at,
-        }
-        for o in orders
-    ]
-    return {"orders": items}
+    return {"orders": [order_to_dict(o) for o in orders]}
+
+
+def order_to_dict(o: Order) -> dict[str, Any]:
+    return {
+        "id": o.id,
+        "strategy_id": o.strategy_id,
+        "symbol": o.symbol,
+        "side": o.side,
+        "order_type": o.order_type,
+        "quantity": str(o.quantity),
+        "price": str(o.price) if o.price else None,
+        "stop_price": str(o.stop_price) if o.stop_price else None,
+        "status": o.status,
+        "mode": o.mode,
+        "realized_pnl": str(o.realized_pnl) if o.realized_pnl is not None else None,
+        "created_at": o.created_at,
+    }
 
 
 async def list_positions(db: AsyncSession, user_id: int) -> dict[str, Any]:
@@ -1,4 +1,8 @@
 """Teknik indikatörler: RSI, MACD, MA. Sadece pandas/numpy, TA-Lib yok (hafif)."""
 from app.services.indicators.calculator import compute_ema, compute_macd, compute_rsi, compute_sma
+from app.services.indicators.incremental import EMA, MACD, RSI, SMA, IndicatorSet
 
-__all__ = ["compute_rsi", "compute_macd", "compute_sma", "compute_ema"]
+__all__ = [
+    "compute_rsi", "compute_macd", "compute_sma", "compute_ema",
+    "SMA", "EMA", "RSI", "MACD", "IndicatorSet",
+]
@@ -0,0 +1,73 @@
+"""Çoklu sembol indikatörleri: (sembol × mum) kapanış matrisi üzerinde kernels ile tek geçiş.
+
+Her satır bir sembol; kısa geçmişli semboller soldan NaN ile doldurulur. Satır sonuçları o
+sembol için compute_all ile aynıdır (NaN, ilk geçerli kapanışa kadar). Tarayıcılar içindir.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from app.services.indicators import kernels
+
+OUTPUTS = ("rsi", "macd", "macd_signal", "macd_histogram", "sma", "ema")
+
+
+def to_matrix(series: list[list[float]]) -> np.ndarray:
+    """Farklı uzunluktaki kapanış listelerini sağa hizalı (soldan NaN) matrise çevirir."""
+    width = max((len(s) for s in series), default=0)
+    out = np.full((len(series), width), np.nan)
+    for i, s in enumerate(series):
+        if s:
+            out[i, width - len(s):] = s
+    return out
+
+
+def compute_batch(
+    close: np.ndarray,
+    rsi_period: int = 14,
+    macd_fast: int = 12,
+    macd_slow: int = 26,
+    macd_signal: int = 9,
+    sma_period: int = 20,
+    ema_period: int = 20,
+) -> dict[str, np.ndarray]:
+    """compute_all'ın matris karşılığı: her çıktı close ile aynı boyutta (sembol × mum) dizi."""
+    close = np.asarray(close, dtype=float)
+    macd_line, signal_line, histogram = kernels.macd(close, macd_fast, macd_slow, macd_signal)
+    return {
+        "rsi": kernels.rsi(close, rsi_period),
+        "macd": macd_line,
+        "macd_signal": signal_line,
+        "macd_histogram": histogram,
+        "sma": kernels.sma(close, sma_period),
+        "ema": kernels.ema(close, 2.0 / (ema_period + 1)),
+    }
+
+
+def latest(results: dict[str, np.ndarray]) -> list[dict[str, float | None]]:
+    """Her satırın son sütun değerleri (NaN -> None)."""
+    rows = len(next(iter(results.values()))) if results else 0
+    last = {name: arr[:, -1] if arr.shape[1] else np.full(rows, np.nan) for name, arr in results.items()}
+    return [
+        {name: None if np.isnan(v[i]) else float(v[i]) for name, v in last.items()}
+        for i in range(rows)
+    ]
+
+
+def summarize(symbols: list[str], candles: list[list[list]]) -> dict[str, dict[str, Any]]:
+    """Sembol başına mum listelerinden son indikatör değerleri (tek vektörel geçiş)."""
+    if not symbols:
+        return {}
+    matrix = to_matrix([[float(c[4]) for c in rows] for rows in candles])
+    values = latest(compute_batch(matrix))
+    return {
+        symbol: {
+            "ts": rows[-1][0] if rows else None,
+            "close": float(rows[-1][4]) if rows else None,
+            "bars": len(rows),
+            **(vals if len(rows) >= 2 else dict.fromkeys(OUTPUTS)),
+        }
+        for symbol, rows, vals in zip(symbols, candles, values)
+    }
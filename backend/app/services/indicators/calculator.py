@@ -1,24 +1,10 @@
-"""Saf Python + pandas ile teknik indikatörler. Ek kütüphane yok (TA-Lib yok)."""
+"""Teknik indikatörler. Series fonksiyonları pandas ile; compute_all NumPy çekirdekleriyle (kernels)."""
 from typing import Any
 
 import numpy as np
 import pandas as pd
 
-
-def _ohlcv_to_dataframe(candles: list[list]) -> pd.DataFrame:
-    """ccxt OHLCV [[ts, o, h, l, c, v], ...] -> DataFrame."""
-    if not candles:
-        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
-    arr = np.array(candles)
-    return pd.DataFrame(
-        {
-            "open": arr[:, 1],
-            "high": arr[:, 2],
-            "low": arr[:, 3],
-            "close": arr[:, 4],
-            "volume": arr[:, 5] if arr.shape[1] > 5 else 0.0,
-        }
-    )
+from app.services.indicators import kernels
 
 
 def compute_rsi(close: pd.Series, period: int = 14) -> pd.Series:
@@ -72,8 +58,7 @@ def compute_all(
     candles: ccxt format [[ts, o, h, l, c, v], ...]
     Dönen değerler list (NaN'lar null), grafikte kullanılabilir.
     """
-    df = _ohlcv_to_dataframe(candles)
-    if df.empty or len(df) < 2:
+    if len(candles) < 2:
         return {
             "rsi": [],
             "macd": [],
@@ -83,23 +68,13 @@ def compute_all(
             "ema": [],
         }
 
-    close = df["close"].astype(float)
-
-    rsi = compute_rsi(close, rsi_period)
-    macd_line, signal_line, histogram = compute_macd(
-        close, macd_fast, macd_slow, macd_signal
-    )
-    sma = compute_sma(close, sma_period)
-    ema = compute_ema(close, ema_period)
-
-    def to_list(s: pd.Series) -> list[float | None]:
-        return [None if np.isnan(v) else float(v) for v in s]
-
+    close = np.array(candles, dtype=np.float64)[:, 4]
+    macd_line, signal_line, histogram = kernels.macd(close, macd_fast, macd_slow, macd_signal)
     return {
-        "rsi": to_list(rsi),
-        "macd": to_list(macd_line),
-        "macd_signal": to_list(signal_line),
-        "macd_histogram": to_list(histogram),
-        "sma": to_list(sma),
-        "ema": to_list(ema),
+        "rsi": kernels.nan_to_none(kernels.rsi(close, rsi_period)),
+        "macd": kernels.nan_to_none(macd_line),
+        "macd_signal": kernels.nan_to_none(signal_line),
+        "macd_histogram": kernels.nan_to_none(histogram),
+        "sma": kernels.nan_to_none(kernels.sma(close, sma_period)),
+        "ema": kernels.nan_to_none(kernels.ema(close, 2.0 / (ema_period + 1))),
     }
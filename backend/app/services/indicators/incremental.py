@@ -0,0 +1,343 @@
+"""Artımlı (akış) indikatörler: geçmişle tohumlanır, her yeni/güncellenen mumda O(1) güncellenir.
+
+Sonuçlar calculator'daki pandas karşılıklarıyla (ewm adjust=False, rolling mean) aynıdır.
+update(x) yeni mum ekler, revise(x) son mumu (oluşmakta olan) değiştirir. Durum to_dict/from_dict
+ile JSON'a çevrilebilir; compute_cached bunu (borsa, sembol, zaman dilimi, ilk mum) başına önbellekte
+tutar.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from collections import deque
+from typing import Any
+
+from app.config import get_settings
+from app.services.market_data import cache as market_cache
+
+OUTPUTS = ("rsi", "macd", "macd_signal", "macd_histogram", "sma", "ema")
+
+
+def _finite(x: float | None) -> float | None:
+    return None if x is None or math.isnan(x) else x
+
+
+class SMA:
+    """Basit hareketli ortalama: kayan pencere (pencere dolmadan None).
+
+    Değer her seferinde pencerenin math.fsum toplamından hesaplanır; böylece update/revise sırası
+    ne olursa olsun aynı pencere aynı sonucu verir (önbellekten devam = soğuk hesap).
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.window: deque[float] = deque()
+
+    def update(self, x: float) -> float | None:
+        self.window.append(x)
+        if len(self.window) > self.period:
+            self.window.popleft()
+        return self.value
+
+    def revise(self, x: float) -> float | None:
+        if not self.window:
+            return self.update(x)
+        self.window[-1] = x
+        return self.value
+
+    @property
+    def value(self) -> float | None:
+        return math.fsum(self.window) / self.period if len(self.window) == self.period else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"period": self.period, "window": list(self.window)}
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> SMA:
+        ind = cls(d["period"])
+        ind.window = deque(d["window"])
+        return ind
+
+
+class EMA:
+    """Üstel hareketli ortalama (pandas ewm(span, adjust=False)); ilk değer ilk gözlemdir."""
+
+    def __init__(self, period: int | None = None, alpha: float | None = None) -> None:
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.ema: float | None = None
+        self._prev: float | None = None  # son güncellemeden önceki değer (revise için)
+        self._count = 0
+
+    def update(self, x: float) -> float | None:
+        self._prev = self.ema
+        self._count += 1
+        self.ema = x if self.ema is None else (1 - self.alpha) * self.ema + self.alpha * x
+        return self.ema
+
+    def revise(self, x: float) -> float | None:
+        if self._count == 0:
+            return self.update(x)
+        self.ema = x if self._prev is None else (1 - self.alpha) * self._prev + self.alpha * x
+        return self.ema
+
+    @property
+    def value(self) -> float | None:
+        return self.ema
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"alpha": self.alpha, "ema": self.ema, "prev": self._prev, "count": self._count}
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> EMA:
+        ind = cls(alpha=d["alpha"])
+        ind.ema, ind._prev, ind._count = d["ema"], d["prev"], d["count"]
+        return ind
+
+
+class RSI:
+    """Wilder RSI (calculator.compute_rsi ile aynı: kazanç/kayıp ewm(alpha=1/period, adjust=False))."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self.gain = EMA(alpha=1.0 / period)
+        self.loss = EMA(alpha=1.0 / period)
+        self.close: float | None = None
+        self._prev_close: float | None = None
+
+    def _step(self, x: float, revise: bool) -> float | None:
+        base = self._prev_close if revise else self.close
+        # pandas: ilk mumda diff NaN'dır, kazanç ve kayıp 0 kabul edilir
+        delta = 0.0 if base is None else x - base
+        gain, loss = (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+        if revise:
+            self.gain.revise(gain)
+            self.loss.revise(loss)
+        else:
+            self._prev_close = self.close
+            self.gain.update(gain)
+            self.loss.update(loss)
+        self.close = x
+        return self.value
+
+    def update(self, x: float) -> float | None:
+        return self._step(x, revise=False)
+
+    def revise(self, x: float) -> float | None:
+        if self.close is None:
+            return self.update(x)
+        return self._step(x, revise=True)
+
+    @property
+    def value(self) -> float | None:
+        avg_loss = self.loss.value
+        if not avg_loss:
+            return None  # pandas: kayıp 0 ise rs NaN
+        return 100 - 100 / (1 + self.gain.value / avg_loss)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "period": self.period, "gain": self.gain.to_dict(), "loss": self.loss.to_dict(),
+            "close": self.close, "prev_close": self._prev_close,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> RSI:
+        ind = cls(d["period"])
+        ind.gain, ind.loss = EMA.from_dict(d["gain"]), EMA.from_dict(d["loss"])
+        ind.close, ind._prev_close = d["close"], d["prev_close"]
+        return ind
+
+
+class MACD:
+    """MACD çizgisi, sinyal ve histogram (calculator.compute_macd ile aynı)."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self.params = (fast, slow, signal)
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+
+    def update(self, x: float) -> tuple[float, float, float]:
+        line = self.fast.update(x) - self.slow.update(x)
+        self.signal.update(line)
+        return self.value
+
+    def revise(self, x: float) -> tuple[float, float, float]:
+        line = self.fast.revise(x) - self.slow.revise(x)
+        self.signal.revise(line)
+        return self.value
+
+    @property
+    def value(self) -> tuple[float | None, float | None, float | None]:
+        if self.signal.value is None:
+            return None, None, None
+        line = self.fast.value - self.slow.value
+        return line, self.signal.value, line - self.signal.value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "params": list(self.params), "fast": self.fast.to_dict(),
+            "slow": self.slow.to_dict(), "signal": self.signal.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> MACD:
+        ind = cls(*d["params"])
+        ind.fast, ind.slow, ind.signal = (EMA.from_dict(d[k]) for k in ("fast", "slow", "signal"))
+        return ind
+
+
+class IndicatorSet:
+    """compute_all'daki indikatörlerin artımlı karşılığı; mumlar ts'ye göre eklenir/güncellenir."""
+
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9,
+        sma_period: int = 20,
+        ema_period: int = 20,
+    ) -> None:
+        self.rsi = RSI(rsi_period)
+        self.macd = MACD(macd_fast, macd_slow, macd_signal)
+        self.sma = SMA(sma_period)
+        self.ema = EMA(ema_period)
+        self.last_ts: int | None = None
+
+    def push(self, candle: list) -> dict[str, float | None] | None:
+        """Mumu işler: yeni ts eklenir, son ts güncellenir; daha eski mum yok sayılır (None)."""
+        ts, close = candle[0], float(candle[4])
+        if self.last_ts is not None and ts < self.last_ts:
+            return None
+        op = "revise" if ts == self.last_ts else "update"
+        for ind in (self.rsi, self.macd, self.sma, self.ema):
+            getattr(ind, op)(close)
+        self.last_ts = ts
+        return self.values()
+
+    def seed(self, candles: list[list]) -> dict[str, list[float | None]]:
+        """Geçmişi işler; compute_all biçiminde seriler döner."""
+        series: dict[str, list[float | None]] = {name: [] for name in OUTPUTS}
+        for candle in candles:
+            revised = candle[0] == self.last_ts
+            values = self.push(candle)
+            if values is None:
+                continue
+            for name in OUTPUTS:
+                if revised:
+                    series[name][-1] = values[name]
+                else:
+                    series[name].append(values[name])
+        return series
+
+    def values(self) -> dict[str, float | None]:
+        line, signal, hist = self.macd.value
+        return {
+            "rsi": self.rsi.value,
+            "macd": _finite(line),
+            "macd_signal": _finite(signal),
+            "macd_histogram": _finite(hist),
+            "sma": self.sma.value,
+            "ema": self.ema.value,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "last_ts": self.last_ts, "rsi": self.rsi.to_dict(), "macd": self.macd.to_dict(),
+            "sma": self.sma.to_dict(), "ema": self.ema.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> IndicatorSet:
+        ind = cls()
+        ind.last_ts = d["last_ts"]
+        ind.rsi, ind.macd = RSI.from_dict(d["rsi"]), MACD.from_dict(d["macd"])
+        ind.sma, ind.ema = SMA.from_dict(d["sma"]), EMA.from_dict(d["ema"])
+        return ind
+
+
+# --- Önbellek: (borsa, sembol, zaman dilimi, ilk mum) başına durum + değer serileri ---
+
+
+def _slice(entry: dict[str, Any], candles: list[list]) -> dict[str, list] | None:
+    """Önbellekteki serilerden mumlara hizalı dilim.
+
+    Mumların tamamı aynı ts ve kapanışlarla kapsanmıyorsa (ör. borsa kapanmış bir mumu düzeltti) None.
+    """
+    ts = entry["ts"]
+    start = bisect_left(ts, candles[0][0])
+    end = start + len(candles)
+    if ts[start:end] != [c[0] for c in candles]:
+        return None
+    if entry["close"][start:end] != [float(c[4]) for c in candles]:
+        return None
+    return {name: entry["series"][name][start:end] for name in OUTPUTS}
+
+
+def _cold(candles: list[list]) -> tuple[dict[str, Any], dict[str, list]]:
+    ind = IndicatorSet()
+    series = ind.seed(candles)
+    entry = {
+        "state": ind.to_dict(),
+        "ts": [c[0] for c in candles],
+        "close": [float(c[4]) for c in candles],
+        "series": series,
+    }
+    return entry, series
+
+
+async def compute_cached(exchange: str, symbol: str, timeframe: str, candles: list[list]) -> dict[str, Any]:
+    """compute_all ile aynı biçim; sonuç her zaman bu mumlarla soğuk hesaplananla aynıdır.
+
+    EMA/RSI ilk mumdan itibaren özyinelemeli olduğundan durum istenen pencerenin ilk mumuyla
+    anahtarlanır: aynı başlangıçlı tekrar eden isteklerde yalnızca yeni/güncellenen mumlar işlenir.
+    Farklı başlangıç veya önbellekten farklı kapanış görülürse soğuk hesaplanır. Girdiler pencere
+    başına deterministik olduğundan eşzamanlı yazımlarda son yazan kazanır; kaybolan güncelleme
+    yalnızca bir sonraki istekte yeniden hesap demektir, yanlış sonuç değil.
+    """
+    if len(candles) < 2:
+        return {name: [] for name in OUTPUTS}
+    settings = get_settings()
+    backend = market_cache.get_backend()
+    key = market_cache.make_key("ind", exchange, symbol, timeframe, candles[0][0])
+    entry = None
+    if backend is not None:
+        try:
+            entry = await backend.get(key)
+        except Exception:
+            market_cache.stats["errors"] += 1
+
+    result = None
+    changed = True
+    if entry is not None and "close" in entry and entry["ts"] and entry["ts"][0] == candles[0][0]:
+        ind = IndicatorSet.from_dict(entry["state"])
+        ts, close = list(entry["ts"]), list(entry["close"])
+        series = {name: list(entry["series"][name]) for name in OUTPUTS}
+        changed = False
+        for candle in candles:
+            x = float(candle[4])
+            if candle[0] < ts[-1] or (candle[0] == ts[-1] and x == close[-1]):
+                continue
+            values = ind.push(candle)
+            changed = True
+            if candle[0] == ts[-1]:
+                close[-1] = x
+                for name in OUTPUTS:
+                    series[name][-1] = values[name]
+            else:
+                ts.append(candle[0])
+                close.append(x)
+                for name in OUTPUTS:
+                    series[name].append(values[name])
+        entry = {"state": ind.to_dict(), "ts": ts, "close": close, "series": series}
+        result = _slice(entry, candles)
+    if result is None:
+        entry, result = _cold(candles)
+        changed = True
+
+    # Başı kırpılmış seri aynı anahtarla artık kullanılamaz; uzun pencereler saklanmaz.
+    if backend is not None and changed and len(entry["ts"]) <= settings.indicator_state_max_bars:
+        try:
+            await backend.set(key, entry, settings.indicator_state_ttl_sec)
+        except Exception:
+            market_cache.stats["errors"] += 1
+    return result
@@ -0,0 +1,158 @@
+"""Saf NumPy indikatör çekirdekleri (DataFrame yok): son eksen boyunca, 1-B veya (sembol × mum) diziler.
+
+EMA özyinelemeli filtre (scipy.signal.lfilter; yoksa sütun döngüsü), SMA kümülatif toplam farkı,
+RSI Wilder yumuşatması. Sonuçlar calculator'daki pandas fonksiyonlarıyla aynıdır; baştaki NaN'lar
+(kısa geçmiş) korunur, her satır ilk geçerli değerinden başlar. exact_sma ve to_fixed / from_fixed
+güncelleme sırasından bağımsız (doğru yuvarlanmış) pencere toplamları içindir (kural dili).
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy opsiyonel (scikit-learn ile gelir)
+    lfilter = None
+
+
+def _as_2d(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return x.reshape(1, -1) if x.ndim == 1 else x
+
+
+def _leading_nan(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Baştaki NaN maskesi ve bu NaN'ları satırın ilk geçerli değeriyle dolduran kopya."""
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+    lead = np.arange(x.shape[1]) < first[:, None]
+    first_vals = np.take_along_axis(x, np.minimum(first, x.shape[1] - 1)[:, None], axis=1)
+    return lead, np.where(lead, first_vals, x)
+
+
+def _ema_loop(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Sütun döngüsü (satırlar vektörel); aradaki NaN'da önceki değer korunur (pandas ignore_na=False)."""
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for j in range(x.shape[1]):
+        col = x[:, j]
+        prev = np.where(np.isnan(prev), col, np.where(np.isnan(col), prev, (1 - alpha) * prev + alpha * col))
+        out[:, j] = prev
+    return out
+
+
+def ema(x, alpha: float) -> np.ndarray:
+    """ewm(alpha, adjust=False).mean(); span için alpha = 2 / (span + 1)."""
+    shape = np.shape(x)
+    x = _as_2d(x)
+    if x.shape[1] == 0:
+        return x.reshape(shape).copy()
+    lead, filled = _leading_nan(x)
+    rows = ~lead.all(axis=1)
+    if lfilter is not None and not np.isnan(filled[rows]).any():
+        # y[n] = alpha * x[n] + (1 - alpha) * y[n-1], y[0] = x[0]; doldurulan baş kısım sabit kalır
+        out, _ = lfilter([alpha], [1.0, alpha - 1.0], filled, axis=1, zi=(1 - alpha) * filled[:, :1])
+    else:
+        out = _ema_loop(x, alpha)
+    out[lead] = np.nan
+    return out.reshape(shape)
+
+
+def sma(x, period: int) -> np.ndarray:
+    """rolling(period).mean(); pencerede NaN varsa NaN."""
+    shape = np.shape(x)
+    x = _as_2d(x)
+    out = np.full_like(x, np.nan)
+    if period < 1 or x.shape[1] < period:
+        return out.reshape(shape)
+    valid = ~np.isnan(x)
+    zero = np.zeros((x.shape[0], 1))
+    csum = np.concatenate([zero, np.cumsum(np.where(valid, x, 0.0), axis=1)], axis=1)
+    ccount = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+    total = csum[:, period:] - csum[:, :-period]
+    count = ccount[:, period:] - ccount[:, :-period]
+    out[:, period - 1:] = np.where(count == period, total / period, np.nan)
+    return out.reshape(shape)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder RSI (calculator.compute_rsi ile aynı); ilk geçerli mumda kazanç/kayıp 0, kayıp 0 ise NaN."""
+    shape = np.shape(close)
+    close = _as_2d(close)
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    missing = np.isnan(close)
+    gain = np.where(missing, np.nan, np.where(delta > 0, delta, 0.0))
+    loss = np.where(missing, np.nan, np.where(delta < 0, -delta, 0.0))
+    avg_gain = ema(gain, 1.0 / period)
+    avg_loss = ema(loss, 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
+    return (100 - 100 / (1 + rs)).reshape(shape)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(macd_line, signal_line, histogram)."""
+    line = ema(close, 2.0 / (fast + 1)) - ema(close, 2.0 / (slow + 1))
+    signal_line = ema(line, 2.0 / (signal + 1))
+    return line, signal_line, line - signal_line
+
+
+def nan_to_none(a) -> list:
+    """Diziyi listeye çevirir, NaN'lar None (eleman başına Python kontrolü olmadan, toplu)."""
+    a = np.asarray(a, dtype=np.float64)
+    missing = ~np.isfinite(a)
+    if not missing.any():
+        return a.tolist()
+    out = a.astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+# --- Tam (kayıpsız) toplam: kayan pencere toplamı hangi sırayla güncellenirse güncellensin aynı ---
+
+FIXED_ONE = 1 << 1074  # en küçük alt-normal float 2^-1074; her sonlu float bunun tam katı
+
+
+def to_fixed(x: float) -> int:
+    """Sonlu float'ın 2^-1074 biriminde tam tamsayı karşılığı (toplama/çıkarmada yuvarlama yok)."""
+    num, den = x.as_integer_ratio()  # den 2'nin kuvveti
+    return num << (1075 - den.bit_length())
+
+
+def from_fixed(v: int) -> float:
+    """to_fixed toplamını en yakın float'a çevirir (int / int bölmesi doğru yuvarlanır)."""
+    try:
+        return v / FIXED_ONE
+    except OverflowError:
+        return math.copysign(math.inf, v)
+
+
+def exact_sma(x, period: int) -> np.ndarray:
+    """1-B sma; pencere toplamı doğru yuvarlanmış (math.fsum ile aynı), pencerede NaN/sonsuz varsa NaN.
+
+    Değerler serinin en küçük ortak ikili ölçeğinde tam tamsayılara çevrilir, kümülatif toplam tam
+    tutulur; sonuç adım adım kayan tam toplamla (to_fixed / from_fixed) bit düzeyinde aynıdır.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if period < 1 or n < period:
+        return out
+    finite = np.isfinite(x)
+    m, e = np.frexp(np.where(finite, x, 0.0))
+    mant = (m * 2.0**53).astype(np.int64)  # tam: x = mant * 2^(e - 53)
+    lsb = e.astype(np.int64) - 53
+    nonzero = mant != 0
+    scale = int(lsb[nonzero].min()) if nonzero.any() else 0
+    shift = np.where(nonzero, lsb - scale, 0)
+    fixed = np.left_shift(mant.astype(object), shift.astype(object))
+    csum = np.concatenate([np.zeros(1, dtype=object), np.cumsum(fixed)])
+    totals = csum[period:] - csum[:-period]
+    try:
+        sums = (totals / (1 << -scale) if scale < 0 else totals * (1 << scale) / 1).astype(np.float64)
+    except OverflowError:
+        sums = np.array([from_fixed(int(t) << (scale + 1074)) for t in totals])
+    bad = np.concatenate([[0], np.cumsum(~finite)])
+    out[period - 1:] = np.where(bad[period:] == bad[:-period], sums / period, np.nan)
+    return out
@@ -0,0 +1,218 @@
+"""İndikatör kataloğu: istek üzerine yalnızca istenen indikatörler, ara sonuçlar istek içinde paylaşılır.
+
+Her indikatör @indicator ile kaydedilir (parametre varsayılanları + çıktı adları). Hesaplama
+Context üzerinden yapılır: ctx.get("ema", period=12) aynı istekte bir kez hesaplanır, MACD ile
+EMA çıktısı gibi bağımlılıklar aynı diziyi kullanır. İstek biçimi: "rsi,ema:50,bbands:20:2".
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.indicators import kernels
+
+MAX_SPECS = 20
+
+
+@dataclass(frozen=True)
+class IndicatorDef:
+    name: str
+    func: Callable[..., np.ndarray | tuple[np.ndarray, ...]]
+    params: dict[str, int | float]  # sıralı; istekte konumsal verilir
+    outputs: tuple[str, ...]  # "" birincil çıktı (etiketin kendisi)
+    public: bool = True
+
+
+_registry: dict[str, IndicatorDef] = {}
+
+
+def indicator(name: str, outputs: tuple[str, ...] = ("",), public: bool = True, **params: int | float):
+    """İndikatör fonksiyonunu kataloğa ekler; fonksiyon (ctx, **params) alır."""
+
+    def register(func):
+        _registry[name] = IndicatorDef(name, func, params, outputs, public)
+        return func
+
+    return register
+
+
+class Context:
+    """Tek isteğin mum dizileri ve (ad, parametreler) başına hesaplanmış sonuçlar."""
+
+    def __init__(self, candles: list[list]) -> None:
+        arr = np.array(candles, dtype=np.float64).reshape(len(candles), -1)
+        self.open, self.high, self.low, self.close = (arr[:, i] for i in range(1, 5))
+        self.volume = arr[:, 5] if arr.shape[1] > 5 else np.zeros(len(candles))
+        self._memo: dict[tuple, Any] = {}
+
+    def get(self, name: str, **params: int | float) -> Any:
+        definition = _registry[name]
+        args = {**definition.params, **params}
+        key = (name, *args.values())
+        if key not in self._memo:
+            self._memo[key] = definition.func(self, **args)
+        return self._memo[key]
+
+
+def _rolling(x: np.ndarray, period: int, reduce: Callable[..., np.ndarray]) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        out[period - 1:] = reduce(sliding_window_view(x, period), axis=-1)
+    return out
+
+
+def _wilder(x: np.ndarray, period: int) -> np.ndarray:
+    return kernels.ema(x, 1.0 / period)
+
+
+@indicator("sma", period=20)
+def _sma(ctx: Context, period: int) -> np.ndarray:
+    return kernels.sma(ctx.close, period)
+
+
+@indicator("ema", period=20)
+def _ema(ctx: Context, period: int) -> np.ndarray:
+    return kernels.ema(ctx.close, 2.0 / (period + 1))
+
+
+@indicator("rsi", period=14)
+def _rsi(ctx: Context, period: int) -> np.ndarray:
+    return kernels.rsi(ctx.close, period)
+
+
+@indicator("macd", outputs=("", "signal", "histogram"), fast=12, slow=26, signal=9)
+def _macd(ctx: Context, fast: int, slow: int, signal: int) -> tuple[np.ndarray, ...]:
+    line = ctx.get("ema", period=fast) - ctx.get("ema", period=slow)
+    signal_line = kernels.ema(line, 2.0 / (signal + 1))
+    return line, signal_line, line - signal_line
+
+
+@indicator("bbands", outputs=("middle", "upper", "lower"), period=20, std=2.0)
+def _bbands(ctx: Context, period: int, std: float) -> tuple[np.ndarray, ...]:
+    """Bollinger bantları: SMA ± std × popülasyon standart sapması."""
+    middle = ctx.get("sma", period=period)
+    dev = _rolling(ctx.close, period, np.std)
+    return middle, middle + std * dev, middle - std * dev
+
+
+@indicator("tr", public=False)
+def _true_range(ctx: Context) -> np.ndarray:
+    prev_close = np.concatenate([[np.nan], ctx.close[:-1]])
+    ranges = np.stack([
+        ctx.high - ctx.low, np.abs(ctx.high - prev_close), np.abs(ctx.low - prev_close),
+    ])
+    return np.nanmax(ranges, axis=0)  # ilk mumda yalnızca high - low
+
+
+@indicator("atr", period=14)
+def _atr(ctx: Context, period: int) -> np.ndarray:
+    """Average True Range (Wilder yumuşatması)."""
+    return _wilder(ctx.get("tr"), period)
+
+
+@indicator("stoch", outputs=("k", "d"), k=14, d=3)
+def _stoch(ctx: Context, k: int, d: int) -> tuple[np.ndarray, ...]:
+    """Stokastik osilatör: %K ve %K'nın d periyotluk SMA'sı (%D)."""
+    lowest = _rolling(ctx.low, k, np.min)
+    highest = _rolling(ctx.high, k, np.max)
+    span = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_k = np.where(span > 0, 100 * (ctx.close - lowest) / span, np.nan)
+    return pct_k, kernels.sma(pct_k, d)
+
+
+@indicator("vwap")
+def _vwap(ctx: Context) -> np.ndarray:
+    """Dönen mum aralığı boyunca kümülatif VWAP (tipik fiyat × hacim)."""
+    typical = (ctx.high + ctx.low + ctx.close) / 3
+    volume = np.nan_to_num(ctx.volume)
+    cum_volume = np.cumsum(volume)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cum_volume > 0, np.cumsum(typical * volume) / cum_volume, np.nan)
+
+
+@indicator("obv")
+def _obv(ctx: Context) -> np.ndarray:
+    """On-Balance Volume; ilk mumda 0."""
+    direction = np.sign(np.diff(ctx.close, prepend=ctx.close[:1]))
+    return np.cumsum(direction * np.nan_to_num(ctx.volume))
+
+
+@indicator("adx", outputs=("", "plus_di", "minus_di"), period=14)
+def _adx(ctx: Context, period: int) -> tuple[np.ndarray, ...]:
+    """Average Directional Index ve +DI/-DI (Wilder yumuşatması)."""
+    up = np.diff(ctx.high, prepend=ctx.high[:1])
+    down = -np.diff(ctx.low, prepend=ctx.low[:1])
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    atr = ctx.get("atr", period=period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(atr > 0, 100 * _wilder(plus_dm, period) / atr, np.nan)
+        minus_di = np.where(atr > 0, 100 * _wilder(minus_dm, period) / atr, np.nan)
+        total = plus_di + minus_di
+        dx = np.where(total > 0, 100 * np.abs(plus_di - minus_di) / total, np.nan)
+    return _wilder(dx, period), plus_di, minus_di
+
+
+# --- İstek ---
+
+
+@dataclass(frozen=True)
+class Spec:
+    label: str
+    name: str
+    params: dict[str, int | float]
+
+
+def parse_specs(text: str) -> list[Spec]:
+    """"rsi,ema:50,bbands:20:2" -> Spec listesi; hatalı istekte ValueError."""
+    specs: list[Spec] = []
+    for raw in dict.fromkeys(p.strip() for p in text.split(",") if p.strip()):
+        name, *values = raw.split(":")
+        definition = _registry.get(name)
+        if definition is None or not definition.public:
+            raise ValueError(f"Bilinmeyen indikatör: {name}")
+        if len(values) > len(definition.params):
+            raise ValueError(f"{name} en fazla {len(definition.params)} parametre alır")
+        params = dict(definition.params)
+        for key, value in zip(definition.params, values):
+            default = definition.params[key]
+            try:
+                params[key] = type(default)(value)
+            except ValueError:
+                raise ValueError(f"{name}: geçersiz {key} değeri: {value}") from None
+            if params[key] <= 0:
+                raise ValueError(f"{name}: {key} pozitif olmalı")
+        specs.append(Spec(raw.replace(":", "_"), name, params))
+    if len(specs) > MAX_SPECS:
+        raise ValueError(f"En fazla {MAX_SPECS} indikatör istenebilir")
+    return specs
+
+
+def compute(candles: list[list], specs: list[Spec]) -> dict[str, list[float | None]]:
+    """İstenen indikatörleri hesaplar; çıktı anahtarı etiket (+ "_" + çıktı adı)."""
+    if len(candles) < 2:
+        return {}
+    ctx = Context(candles)
+    result: dict[str, list[float | None]] = {}
+    for spec in specs:
+        definition = _registry[spec.name]
+        values = ctx.get(spec.name, **spec.params)
+        if not isinstance(values, tuple):
+            values = (values,)
+        for output, series in zip(definition.outputs, values):
+            key = f"{spec.label}_{output}" if output else spec.label
+            result[key] = kernels.nan_to_none(series)
+    return result
+
+
+def catalog() -> list[dict[str, Any]]:
+    return [
+        {"name": d.name, "params": d.params, "outputs": [f"{d.name}_{o}" if o else d.name for o in d.outputs]}
+        for d in _registry.values()
+        if d.public
+    ]
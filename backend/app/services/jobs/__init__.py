@@ -0,0 +1 @@
+"""Arka plan iş kuyruğu: uzun süren backtest, tarama ve ML eğitimi ayrı işçi süreçlerinde."""
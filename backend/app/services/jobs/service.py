@@ -0,0 +1,181 @@
+"""İş kuyruğu: gönder, sorgula, iptal; işçiler için sahiplenme (FOR UPDATE SKIP LOCKED) ve sonuç yazma."""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.job import Job
+
+JOB_KINDS = ("backtest", "sweep", "walkforward", "portfolio", "train")
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("done", "error", "cancelled")
+
+# Sahiplenmeyi işçiler arasında sıraya sokan advisory lock anahtarı (kullanıcı başı limit tutarlı kalsın)
+_CLAIM_LOCK_KEY = 0x6A6F6273  # "jobs"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_to_dict(job: Job, with_result: bool = True) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "id": job.id,
+        "kind": job.kind,
+        "durum": job.status,
+        "progress": {"done": job.progress_done, "total": job.progress_total},
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+    if with_result:
+        out["result"] = json.loads(job.result_json) if job.result_json else None
+        out["hata"] = job.error
+    return out
+
+
+async def submit_job(
+    db: AsyncSession, user_id: int, kind: str, payload: dict[str, Any]
+) -> dict[str, Any]:
+    """İşi kuyruğa ekler ve hemen job_id döner. Kullanıcı başı bekleyen iş limiti uygulanır."""
+    if kind not in JOB_KINDS:
+        return {"ok": False, "hata": f"Bilinmeyen iş türü: {kind}"}
+    limit = get_settings().jobs_max_pending_per_user
+    pending = (
+        await db.execute(
+            select(func.count(Job.id)).where(Job.user_id == user_id, Job.status.in_(ACTIVE_STATUSES))
+        )
+    ).scalar() or 0
+    if pending >= limit:
+        return {"ok": False, "hata": f"Bekleyen iş limiti aşıldı (limit: {limit})."}
+    job = Job(user_id=user_id, kind=kind, status="queued", payload_json=json.dumps(payload), progress_done=0)
+    db.add(job)
+    await db.flush()
+    return {"ok": True, "job_id": job.id, "durum": job.status}
+
+
+async def get_job(db: AsyncSession, job_id: int, user_id: int) -> Job | None:
+    job = await db.get(Job, job_id)
+    if not job or job.user_id != user_id:
+        return None
+    return job
+
+
+async def list_jobs(db: AsyncSession, user_id: int, limit: int = 20, offset: int = 0) -> dict[str, Any]:
+    q = (
+        select(Job)
+        .where(Job.user_id == user_id)
+        .order_by(Job.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    jobs = (await db.execute(q)).scalars().all()
+    return {"jobs": [job_to_dict(j, with_result=False) for j in jobs]}
+
+
+async def cancel_job(db: AsyncSession, job_id: int, user_id: int) -> dict[str, Any]:
+    """Yalnızca henüz başlamamış (queued) iş iptal edilebilir."""
+    job = await get_job(db, job_id, user_id)
+    if job is None:
+        return {"ok": False, "hata": "İş bulunamadı"}
+    if job.status != "queued":
+        return {"ok": False, "hata": f"İş iptal edilemez (durum: {job.status})"}
+    job.status = "cancelled"
+    job.finished_at = _now()
+    return {"ok": True, "mesaj": "İş iptal edildi."}
+
+
+async def requeue_stale(db: AsyncSession) -> int:
+    """Heartbeat'i zaman aşımına uğramış (ölmüş işçi) running işleri kuyruğa geri alır."""
+    cutoff = _now() - timedelta(seconds=get_settings().jobs_stale_after_sec)
+    result = await db.execute(
+        update(Job)
+        .where(Job.status == "running", Job.heartbeat_at < cutoff)
+        .values(status="queued", worker_id=None, started_at=None, heartbeat_at=None)
+    )
+    return result.rowcount or 0
+
+
+async def claim_next(db: AsyncSession, worker_id: str) -> Job | None:
+    """Sıradaki uygun işi bu işçiye atar (çağıran commit eder).
+
+    Kullanıcının çalışan iş sayısı jobs_max_running_per_user'a ulaştıysa onun işleri atlanır.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _CLAIM_LOCK_KEY})
+    per_user = get_settings().jobs_max_running_per_user
+    running = (
+        select(Job.user_id)
+        .where(Job.status == "running")
+        .group_by(Job.user_id)
+        .having(func.count(Job.id) >= per_user)
+    )
+    q = (
+        select(Job)
+        .where(Job.status == "queued", Job.user_id.not_in(running))
+        .order_by(Job.created_at, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = (await db.execute(q)).scalar_one_or_none()
+    if job is None:
+        return None
+    now = _now()
+    job.status = "running"
+    job.worker_id = worker_id
+    job.started_at = now
+    job.heartbeat_at = now
+    await db.flush()
+    return job
+
+
+async def heartbeat(db: AsyncSession, job_ids: list[int], worker_id: str) -> None:
+    """Yalnızca hâlâ bu işçiye ait running işler (kuyruğa geri alınıp başkasına geçenler değil)."""
+    if job_ids:
+        await db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.worker_id == worker_id, Job.status == "running")
+            .values(heartbeat_at=_now())
+        )
+
+
+async def set_progress(
+    db: AsyncSession, job_id: int, worker_id: str, done: int, total: int | None
+) -> bool:
+    """İlerlemeyi yazar; heartbeat gibi yalnızca iş hâlâ bu işçide running ise. Yazıldıysa True."""
+    res = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.worker_id == worker_id, Job.status == "running")
+        .values(progress_done=done, progress_total=total, heartbeat_at=_now())
+    )
+    return (res.rowcount or 0) > 0
+
+
+async def finish_job(
+    db: AsyncSession,
+    job_id: int,
+    worker_id: str,
+    result: dict[str, Any] | None,
+    error: str | None = None,
+) -> bool:
+    """Sonucu yazar. result["ok"] False ise iş error durumuna geçer.
+
+    Yalnızca iş hâlâ bu işçide running ise yazılır; heartbeat kaçırıldığı için iş kuyruğa geri alınıp
+    başka işçiye geçtiyse False döner ve çağıran sonucu (BacktestRun / model kaydı) kalıcılaştırmamalı.
+    """
+    failed = error is not None or (result is not None and result.get("ok") is False)
+    res = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.worker_id == worker_id, Job.status == "running")
+        .values(
+            status="error" if failed else "done",
+            result_json=json.dumps(result, default=str) if result is not None else None,
+            error=error or (result or {}).get("hata"),
+            finished_at=_now(),
+        )
+    )
+    return (res.rowcount or 0) > 0
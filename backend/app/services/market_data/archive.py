@@ -0,0 +1,233 @@
+"""Sütunlu, memory-mapped mum arşivi: (borsa, sembol, zaman dilimi) başına sabit genişlikli dosyalar.
+
+Her sütun ayrı dosyadır: ts int64 (ms), open/high/low/close/volume float64. Dosyalara yalnızca
+sondan ekleme yapılır; okuma numpy.memmap üzerinden kopyasız dilimler (view) döner.
+API, işçiler ve zamanlayıcı aynı seriyi aynalayabilir: ekleme ve yeniden yazma seri başına
+süreçler arası kilitle (flock) sıralanır, okuyucular açılışta paylaşımlı kilit alır.
+"""
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.config import get_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: kilit yok (tek süreçli geliştirme)
+    fcntl = None
+
+COLUMNS: tuple[tuple[str, type], ...] = (
+    ("ts", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+)
+
+
+@dataclass(frozen=True)
+class CandleArrays:
+    """OHLCV sütunları (eşit uzunlukta 1-D diziler)."""
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def empty(cls) -> CandleArrays:
+        return cls(*(np.empty(0, dtype=dtype) for _, dtype in COLUMNS))
+
+    @classmethod
+    def from_ohlcv(cls, candles: list[list]) -> CandleArrays:
+        """ccxt [[ts, o, h, l, c, v], ...] → sütunlar (kopya)."""
+        if not candles:
+            return cls.empty()
+        arr = np.array([c[:6] if len(c) >= 6 else [*c[:5], 0.0] for c in candles], dtype=np.float64)
+        return cls(
+            ts=arr[:, 0].astype(np.int64),
+            open=np.ascontiguousarray(arr[:, 1]),
+            high=np.ascontiguousarray(arr[:, 2]),
+            low=np.ascontiguousarray(arr[:, 3]),
+            close=np.ascontiguousarray(arr[:, 4]),
+            volume=np.ascontiguousarray(arr[:, 5]),
+        )
+
+    def to_ohlcv(self) -> list[list]:
+        """Sütunlar → ccxt formatı (ts int, diğerleri float)."""
+        return [
+            [int(t), o, h, lo, c, v]
+            for t, o, h, lo, c, v in zip(
+                self.ts.tolist(), self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist(), self.volume.tolist(),
+            )
+        ]
+
+    def slice(self, start: int, stop: int) -> CandleArrays:
+        return CandleArrays(*(getattr(self, name)[start:stop] for name, _ in COLUMNS))
+
+
+def _safe(part: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", part)
+
+
+def series_dir(exchange_id: str, symbol: str, timeframe: str) -> Path:
+    root = Path(get_settings().candle_archive_dir).resolve()
+    return root / _safe(exchange_id) / _safe(symbol) / _safe(timeframe)
+
+
+@contextmanager
+def _locked(directory: Path, exclusive: bool = True) -> Iterator[None]:
+    """Seri başına kilit; dosya dizinin yanında durur (dizin yer değiştirse de aynı kilit).
+
+    Kilit await boyunca tutulmaz: aynı süreçteki korutinler birbirini bekletmez.
+    """
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    with open(directory.with_name(directory.name + ".lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def _length(directory: Path) -> int:
+    """Geçerli satır sayısı: tüm sütun dosyalarının en kısası (yarım kalmış yazmaya karşı)."""
+    sizes = []
+    for name, dtype in COLUMNS:
+        path = directory / f"{name}.bin"
+        if not path.exists():
+            return 0
+        sizes.append(path.stat().st_size // np.dtype(dtype).itemsize)
+    return min(sizes)
+
+
+def _map(directory: Path, name: str, dtype: type, length: int) -> np.ndarray:
+    if length == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(directory / f"{name}.bin", dtype=dtype, mode="r", shape=(length,))
+
+
+def open_series(exchange_id: str, symbol: str, timeframe: str) -> CandleArrays:
+    """Tüm seriyi memory-mapped (salt okunur) sütunlar olarak açar."""
+    directory = series_dir(exchange_id, symbol, timeframe)
+    # Eşlenen dosyalar yer değiştirilse de açık kalır; kilit yalnızca açılış için
+    with _locked(directory, exclusive=False):
+        length = _length(directory)
+        return CandleArrays(*(_map(directory, name, dtype, length) for name, dtype in COLUMNS))
+
+
+def read_range(
+    exchange_id: str, symbol: str, timeframe: str, start_ms: int, end_ms: int
+) -> CandleArrays:
+    """[start_ms, end_ms) aralığını kopyasız view'lar olarak döner."""
+    series = open_series(exchange_id, symbol, timeframe)
+    if len(series) == 0:
+        return series
+    lo = int(np.searchsorted(series.ts, start_ms, side="left"))
+    hi = int(np.searchsorted(series.ts, end_ms, side="left"))
+    return series.slice(lo, hi)
+
+
+def bounds(exchange_id: str, symbol: str, timeframe: str) -> tuple[int, int] | None:
+    """(ilk_ts, son_ts) veya arşiv boşsa None."""
+    series = open_series(exchange_id, symbol, timeframe)
+    if len(series) == 0:
+        return None
+    return int(series.ts[0]), int(series.ts[-1])
+
+
+def _truncate(directory: Path, length: int) -> None:
+    for name, dtype in COLUMNS:
+        path = directory / f"{name}.bin"
+        if path.exists():
+            os.truncate(path, length * np.dtype(dtype).itemsize)
+
+
+def append(exchange_id: str, symbol: str, timeframe: str, data: CandleArrays) -> int:
+    """Son ts'den yeni olan satırları sona ekler. Eklenen satır sayısını döner."""
+    directory = series_dir(exchange_id, symbol, timeframe)
+    with _locked(directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        length = _length(directory)
+        _truncate(directory, length)  # yarım kalmış önceki yazmayı at
+        if length:
+            last = int(_map(directory, "ts", np.int64, length)[-1])
+            start = int(np.searchsorted(data.ts, last, side="right"))
+        else:
+            start = 0
+        if start >= len(data):
+            return 0
+        # ts en son yazılır: _length her zaman tam yazılmış satırları görür.
+        for name, dtype in reversed(COLUMNS):
+            column = np.ascontiguousarray(getattr(data, name)[start:], dtype=dtype)
+            with open(directory / f"{name}.bin", "ab") as f:
+                f.write(column.tobytes())
+        return len(data) - start
+
+
+def _remove_stale(directory: Path) -> None:
+    """Çökmüş yazarlardan kalan geçici dizinleri siler (sahibi süreç artık yoksa)."""
+    for path in directory.parent.glob(f"{directory.name}.*-*-*"):
+        kind, _, rest = path.name[len(directory.name) + 1 :].partition("-")
+        pid = rest.partition("-")[0]
+        if kind not in ("tmp", "old") or not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class Rewriter:
+    """Seriyi sıfırdan yazar (başa ekleme gerektiğinde).
+
+    Parçalar yazana özel geçici dizine (süreç id + rastgele ek) yazılır; commit() seri kilidi
+    altında yer değiştirir, kilitli okuyucular seriyi hiçbir an eksik görmez.
+    """
+
+    def __init__(self, exchange_id: str, symbol: str, timeframe: str) -> None:
+        self.directory = series_dir(exchange_id, symbol, timeframe)
+        self._tmp = self.directory.with_name(f"{self.directory.name}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        self._tmp.mkdir(parents=True)
+        self._files = {name: open(self._tmp / f"{name}.bin", "wb") for name, _ in COLUMNS}
+        self.rows = 0
+
+    def write(self, chunk: CandleArrays) -> None:
+        for name, dtype in COLUMNS:
+            self._files[name].write(np.ascontiguousarray(getattr(chunk, name), dtype=dtype).tobytes())
+        self.rows += len(chunk)
+
+    def _close(self) -> None:
+        for f in self._files.values():
+            f.close()
+
+    def commit(self) -> int:
+        self._close()
+        old = self._tmp.with_name(self._tmp.name.replace(".tmp-", ".old-", 1))
+        with _locked(self.directory):
+            if self.directory.exists():
+                os.replace(self.directory, old)
+            os.replace(self._tmp, self.directory)
+        shutil.rmtree(old, ignore_errors=True)
+        _remove_stale(self.directory)
+        return self.rows
+
+    def abort(self) -> None:
+        self._close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
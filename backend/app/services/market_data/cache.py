@@ -0,0 +1,173 @@
+"""Piyasa verisi önbelleği: TTL + single-flight (aynı anda gelen aynı istekler tek upstream çağrısı).
+
+Arka uç ayarlanabilir: süreç içi LRU (memory) veya redis_url üzerinden Redis.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.config import get_settings
+
+stats: dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+_inflight: dict[str, asyncio.Future] = {}
+_backend: MemoryBackend | RedisBackend | None = None
+_backend_ready = False
+
+
+class MemoryBackend:
+    """Süreç içi LRU; her girdi kendi son kullanma anıyla tutulur."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def close(self) -> None:
+        self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Redis arka ucu; değerler JSON olarak, TTL milisaniye hassasiyetiyle saklanır."""
+
+    name = "redis"
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Any | None:
+        raw = await self._redis.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._redis.set(key, json.dumps(value), px=max(int(ttl * 1000), 1))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def size(self) -> int | None:
+        return None
+
+
+def get_backend() -> MemoryBackend | RedisBackend | None:
+    """Ayarlara göre arka ucu bir kez oluşturur. market_cache_backend=none ise None."""
+    global _backend, _backend_ready
+    if not _backend_ready:
+        settings = get_settings()
+        kind = settings.market_cache_backend
+        if kind == "redis" and settings.redis_url:
+            _backend = RedisBackend(settings.redis_url)
+        elif kind in ("memory", "redis"):
+            _backend = MemoryBackend(settings.market_cache_max_entries)
+        else:
+            _backend = None
+        _backend_ready = True
+    return _backend
+
+
+async def close() -> None:
+    """Arka ucu kapatır (uygulama kapanışında)."""
+    global _backend, _backend_ready
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
+    _backend_ready = False
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    return "md:" + namespace + ":" + ":".join(str(p) for p in parts)
+
+
+def _cacheable(value: Any) -> bool:
+    """Hata içeren yanıtlar ("hata" anahtarı) önbelleğe alınmaz."""
+    return isinstance(value, dict) and "hata" not in value
+
+
+async def cached(key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """key için önbellekteki değeri döner; yoksa loader'ı tek sefer çalıştırır.
+
+    Aynı key için eşzamanlı ıskalar aynı upstream çağrısını bekler (coalesced).
+    """
+    backend = get_backend()
+    if backend is None or ttl <= 0:
+        return await loader()
+    try:
+        value = await backend.get(key)
+    except Exception:
+        stats["errors"] += 1
+        value = None
+    if value is not None:
+        stats["hits"] += 1
+        return value
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        stats["coalesced"] += 1
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            # Lider iptal edildiyse (biz değil) kendi çağrımızı yapalım.
+            if pending.cancelled() and task is not None and not task.cancelling():
+                return await cached(key, ttl, loader)
+            raise
+
+    stats["misses"] += 1
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        value = await loader()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # bekleyen yoksa "never retrieved" uyarısını önler
+        raise
+    else:
+        if _cacheable(value):
+            try:
+                await backend.set(key, value, ttl)
+            except Exception:
+                stats["errors"] += 1
+        future.set_result(value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+def get_stats() -> dict[str, Any]:
+    backend = get_backend()
+    return {
+        "backend": backend.name if backend is not None else "none",
+        "entries": backend.size() if backend is not None else 0,
+        "inflight": len(_inflight),
+        **stats,
+    }
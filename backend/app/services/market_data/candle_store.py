@@ -0,0 +1,298 @@
+"""Yerel OHLCV deposu: borsadan sayfalı backfill, sonra yalnızca eksik kuyruk çekilir.
+
+Backtest ve ML eğitimi tarih aralığını buradan okur (yerel aralık taraması).
+Yalnızca kapanmış mumlar saklanır; açık mum hiçbir zaman yazılmaz.
+get_arrays, Postgres deposunu sütunlu memmap arşivine (archive) aynalayıp NumPy view'ları döner.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from collections.abc import AsyncIterator
+from typing import Any
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.candle import Candle
+from app.services.market_data import archive, exchanges
+from app.services.market_data import service as market_service
+
+_INSERT_CHUNK = 1000
+_ARCHIVE_CHUNK = 100_000
+TIMEFRAME_MAX_LEN = 10  # strategies.timeframe String(10); diğer tablolarda sütun daha geniş
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """"1m", "1h", "1d" vb. → milisaniye."""
+    import ccxt.async_support as ccxt
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+def valid_timeframe(timeframe: str, exchange_id: str | None = None) -> bool:
+    """Borsanın timeframes haritasında olan ve DB sütununa sığan zaman dilimi mi ("7m", "1y" → False).
+
+    exchange_id desteklenen borsalardan değilse (twelvedata, verilmemiş) herhangi birinin haritası yeter.
+    """
+    if not isinstance(timeframe, str) or not 0 < len(timeframe) <= TIMEFRAME_MAX_LEN:
+        return False
+    if exchange_id in exchanges.SUPPORTED_EXCHANGES:
+        return timeframe in exchanges.timeframes(exchange_id)
+    return any(timeframe in exchanges.timeframes(e) for e in exchanges.SUPPORTED_EXCHANGES)
+
+
+_WEEK_OFFSET_MS = 4 * 86_400_000  # 1970-01-01 Perşembe; haftalık mumlar Pazartesi 00:00 UTC açılır
+
+
+def _months(ts_ms: int) -> int:
+    dt = datetime.fromtimestamp(ts_ms / 1000, timezone.utc)
+    return dt.year * 12 + dt.month - 1
+
+
+def _month_start_ms(months: int) -> int:
+    return to_ms(datetime(months // 12, months % 12 + 1, 1, tzinfo=timezone.utc))
+
+
+def candle_open_ms(ts_ms: int, timeframe: str) -> int:
+    """ts_ms anını içeren mumun açılışı: haftalar Pazartesi, aylar ayın 1'i (UTC), diğerleri epoch hizalı."""
+    unit, amount = timeframe[-1], int(timeframe[:-1])
+    if unit == "M":
+        months = _months(ts_ms)
+        return _month_start_ms(months - months % amount)
+    tf = timeframe_ms(timeframe)
+    offset = _WEEK_OFFSET_MS if unit == "w" else 0
+    return (ts_ms - offset) // tf * tf + offset
+
+
+def candle_close_ms(open_ms: int, timeframe: str) -> int:
+    """open_ms'te açılan mumun kapanışı (= sonraki mumun açılışı); ay uzunluğu takvimden."""
+    if timeframe[-1] == "M":
+        return _month_start_ms(_months(open_ms) + int(timeframe[:-1]))
+    return open_ms + timeframe_ms(timeframe)
+
+
+def to_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+async def _fetch_range(
+    exchange_id: str, symbol: str, timeframe: str, since_ms: int, until_ms: int
+) -> list[list]:
+    """[since_ms, until_ms) aralığını sayfa sayfa fetch_ohlcv ile çeker.
+
+    Borsa sayfa başına istenenden az mum dönebilir (düşük üst sınır); sayfa boyutuna değil,
+    imlecin ilerlemesine bakılır.
+    """
+    ex = await exchanges.get_exchange(exchange_id)
+    page = get_settings().candle_store_page_limit
+    out: list[list] = []
+    cursor = since_ms
+    while cursor < until_ms:
+        batch = await ex.fetch_ohlcv(symbol, timeframe=timeframe, since=cursor, limit=page)
+        if not batch:
+            break
+        out.extend(c for c in batch if cursor <= c[0] < until_ms)
+        last_ts = int(batch[-1][0])
+        if last_ts < cursor:
+            break
+        cursor = candle_close_ms(last_ts, timeframe)
+    return out
+
+
+async def _insert(
+    db: AsyncSession, exchange_id: str, symbol: str, timeframe: str, candles: list[list]
+) -> None:
+    for i in range(0, len(candles), _INSERT_CHUNK):
+        rows = [
+            {
+                "exchange": exchange_id,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "ts": int(c[0]),
+                "open": float(c[1]),
+                "high": float(c[2]),
+                "low": float(c[3]),
+                "close": float(c[4]),
+                "volume": float(c[5]) if len(c) > 5 and c[5] is not None else 0.0,
+            }
+            for c in candles[i : i + _INSERT_CHUNK]
+        ]
+        await db.execute(pg_insert(Candle).values(rows).on_conflict_do_nothing())
+
+
+async def sync_candles(
+    db: AsyncSession,
+    exchange_id: str,
+    symbol: str,
+    timeframe: str,
+    start_ms: int,
+    end_ms: int,
+) -> int:
+    """Depoyu [start_ms, end_ms) için tamamlar: baştaki eksik + kuyruk. Eklenen mum sayısını döner."""
+    # Açık mumun açılış zamanı; bundan küçük ts'ler kapanmıştır.
+    end_ms = min(end_ms, candle_open_ms(_now_ms(), timeframe))
+    if start_ms >= end_ms:
+        return 0
+    first_ts, last_ts = (
+        await db.execute(
+            select(func.min(Candle.ts), func.max(Candle.ts)).where(
+                Candle.exchange == exchange_id,
+                Candle.symbol == symbol,
+                Candle.timeframe == timeframe,
+            )
+        )
+    ).one()
+    ranges: list[tuple[int, int]] = []
+    if first_ts is None:
+        ranges.append((start_ms, end_ms))
+    else:
+        if start_ms < first_ts:
+            # end_ms depodan önce bitse de baş deliği first_ts'e kadar doldurulur; yoksa
+            # [end_ms, first_ts) hiç çekilmez ve sonraki okumalar ortası delik seri görür.
+            ranges.append((start_ms, first_ts))
+        tail = candle_close_ms(last_ts, timeframe)
+        if tail < end_ms:
+            # Delik kalmasın diye kuyruk her zaman son mumdan devam eder.
+            ranges.append((tail, end_ms))
+    added = 0
+    for since, until in ranges:
+        candles = await _fetch_range(exchange_id, symbol, timeframe, since, until)
+        if candles:
+            await _insert(db, exchange_id, symbol, timeframe, candles)
+            added += len(candles)
+    if added:
+        await db.flush()
+    return added
+
+
+async def load_candles(
+    db: AsyncSession,
+    exchange_id: str,
+    symbol: str,
+    timeframe: str,
+    start_ms: int,
+    end_ms: int,
+) -> list[list]:
+    """Depodan [start_ms, end_ms) aralığını ccxt formatında okur (borsaya gitmez)."""
+    result = await db.execute(
+        select(Candle.ts, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume)
+        .where(
+            Candle.exchange == exchange_id,
+            Candle.symbol == symbol,
+            Candle.timeframe == timeframe,
+            Candle.ts >= start_ms,
+            Candle.ts < end_ms,
+        )
+        .order_by(Candle.ts)
+    )
+    return [list(row) for row in result.all()]
+
+
+async def get_candles(
+    db: AsyncSession,
+    exchange_id: str,
+    symbol: str,
+    timeframe: str,
+    start_ms: int,
+    end_ms: int,
+) -> list[list]:
+    """Aralığı senkronlayıp yerelden döner. twelvedata depolanmaz, doğrudan sağlayıcıdan filtrelenir."""
+    if exchange_id == "twelvedata":
+        res: dict[str, Any] = await market_service.get_ohlcv(exchange_id, symbol, timeframe, limit=5000)
+        return [c for c in (res.get("candles") or []) if start_ms <= c[0] < end_ms]
+    await sync_candles(db, exchange_id, symbol, timeframe, start_ms, end_ms)
+    return await load_candles(db, exchange_id, symbol, timeframe, start_ms, end_ms)
+
+
+def default_range_ms(timeframe: str, bars: int = 500) -> tuple[int, int]:
+    """Aralık verilmediğinde son `bars` mum: (start_ms, end_ms)."""
+    end_ms = _now_ms()
+    return end_ms - bars * timeframe_ms(timeframe), end_ms
+
+
+async def _iter_store(
+    db: AsyncSession, exchange_id: str, symbol: str, timeframe: str, after_ts: int | None
+) -> AsyncIterator[archive.CandleArrays]:
+    """Depoyu ts sırasıyla parça parça okur (keyset sayfalama)."""
+    cursor = after_ts
+    while True:
+        q = select(
+            Candle.ts, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume
+        ).where(
+            Candle.exchange == exchange_id,
+            Candle.symbol == symbol,
+            Candle.timeframe == timeframe,
+        )
+        if cursor is not None:
+            q = q.where(Candle.ts > cursor)
+        rows = (await db.execute(q.order_by(Candle.ts).limit(_ARCHIVE_CHUNK))).all()
+        if not rows:
+            return
+        arr = np.array(rows, dtype=np.float64)
+        yield archive.CandleArrays(
+            ts=np.array([r[0] for r in rows], dtype=np.int64),
+            open=arr[:, 1].copy(),
+            high=arr[:, 2].copy(),
+            low=arr[:, 3].copy(),
+            close=arr[:, 4].copy(),
+            volume=arr[:, 5].copy(),
+        )
+        cursor = int(rows[-1][0])
+        if len(rows) < _ARCHIVE_CHUNK:
+            return
+
+
+async def _mirror_to_archive(
+    db: AsyncSession, exchange_id: str, symbol: str, timeframe: str
+) -> None:
+    """Arşivi depo ile eşitler: eksik kuyruk eklenir, baş eksikse seri yeniden yazılır."""
+    store_first, store_last = (
+        await db.execute(
+            select(func.min(Candle.ts), func.max(Candle.ts)).where(
+                Candle.exchange == exchange_id,
+                Candle.symbol == symbol,
+                Candle.timeframe == timeframe,
+            )
+        )
+    ).one()
+    if store_first is None:
+        return
+    arch = archive.bounds(exchange_id, symbol, timeframe)
+    if arch is None or arch[0] > store_first:
+        writer = archive.Rewriter(exchange_id, symbol, timeframe)
+        try:
+            async for chunk in _iter_store(db, exchange_id, symbol, timeframe, None):
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+        return
+    if arch[1] < store_last:
+        async for chunk in _iter_store(db, exchange_id, symbol, timeframe, arch[1]):
+            archive.append(exchange_id, symbol, timeframe, chunk)
+
+
+async def get_arrays(
+    db: AsyncSession,
+    exchange_id: str,
+    symbol: str,
+    timeframe: str,
+    start_ms: int,
+    end_ms: int,
+) -> archive.CandleArrays:
+    """Aralığı senkronlayıp memory-mapped sütunlar olarak döner (Python listesi oluşturmaz)."""
+    if exchange_id == "twelvedata":
+        return archive.CandleArrays.from_ohlcv(
+            await get_candles(db, exchange_id, symbol, timeframe, start_ms, end_ms)
+        )
+    await sync_candles(db, exchange_id, symbol, timeframe, start_ms, end_ms)
+    await _mirror_to_archive(db, exchange_id, symbol, timeframe)
+    return archive.read_range(exchange_id, symbol, timeframe, start_ms, end_ms)
@@ -0,0 +1,108 @@
+"""Süreç genelinde ccxt borsa istemcileri: borsa başına tek sıcak istemci.
+
+HTTP oturumu, yüklenmiş market listesi ve rate limiter durumu çağrılar arasında
+korunur; markets periyodik olarak yenilenir, kapanış FastAPI lifespan'da yapılır.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from typing import Any
+
+from app.config import get_settings
+
+SUPPORTED_EXCHANGES = ("binance", "bybit")
+
+_clients: dict[str, Any] = {}
+_stream_clients: dict[str, Any] = {}  # ccxt.pro (WebSocket) istemcileri
+_markets_loaded_at: dict[str, float] = {}
+_locks: dict[str, asyncio.Lock] = {}
+
+
+def _create_exchange(exchange_id: str):
+    import ccxt.async_support as ccxt
+    if exchange_id == "binance":
+        return ccxt.binance({"enableRateLimit": True})
+    if exchange_id == "bybit":
+        return ccxt.bybit({"enableRateLimit": True})
+    raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+
+
+@functools.lru_cache(maxsize=None)
+def timeframes(exchange_id: str) -> frozenset[str]:
+    """Borsanın OHLCV zaman dilimleri (ccxt tanımındaki timeframes; ağa gitmez)."""
+    if exchange_id not in SUPPORTED_EXCHANGES:
+        raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+    import ccxt
+    return frozenset(getattr(ccxt, exchange_id)().timeframes)
+
+
+def _lock_for(exchange_id: str) -> asyncio.Lock:
+    lock = _locks.get(exchange_id)
+    if lock is None:
+        lock = _locks[exchange_id] = asyncio.Lock()
+    return lock
+
+
+async def get_exchange(exchange_id: str):
+    """Borsa istemcisini döner; ilk çağrıda oluşturur ve markets yükler.
+
+    markets, exchange_markets_refresh_sec süresi dolunca yeniden yüklenir.
+    Dönen istemci paylaşımlıdır, çağıran kapatmamalıdır.
+    """
+    if exchange_id not in SUPPORTED_EXCHANGES:
+        raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+    refresh_sec = get_settings().exchange_markets_refresh_sec
+    ex = _clients.get(exchange_id)
+    loaded_at = _markets_loaded_at.get(exchange_id)
+    if ex is not None and loaded_at is not None and time.monotonic() - loaded_at < refresh_sec:
+        return ex
+    async with _lock_for(exchange_id):
+        ex = _clients.get(exchange_id)
+        if ex is None:
+            ex = _create_exchange(exchange_id)
+            _clients[exchange_id] = ex
+        loaded_at = _markets_loaded_at.get(exchange_id)
+        if loaded_at is None or time.monotonic() - loaded_at >= refresh_sec:
+            try:
+                await ex.load_markets(reload=loaded_at is not None)
+            except Exception:
+                # Yenileme başarısızsa eski markets ile devam; ilk yükleme hatası yukarı çıkar.
+                if loaded_at is None:
+                    raise
+            else:
+                _markets_loaded_at[exchange_id] = time.monotonic()
+    return ex
+
+
+def _create_stream_exchange(exchange_id: str):
+    import ccxt.pro as ccxtpro
+    if exchange_id == "binance":
+        return ccxtpro.binance({"enableRateLimit": True})
+    if exchange_id == "bybit":
+        return ccxtpro.bybit({"enableRateLimit": True})
+    raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+
+
+def get_stream_exchange(exchange_id: str):
+    """Borsa başına tek ccxt.pro istemcisi (watch_* akışları aynı WebSocket bağlantılarını paylaşır)."""
+    if exchange_id not in SUPPORTED_EXCHANGES:
+        raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+    ex = _stream_clients.get(exchange_id)
+    if ex is None:
+        ex = _stream_clients[exchange_id] = _create_stream_exchange(exchange_id)
+    return ex
+
+
+async def close_all() -> None:
+    """Tüm istemcileri kapatır (uygulama kapanışında)."""
+    clients = list(_clients.values()) + list(_stream_clients.values())
+    _clients.clear()
+    _stream_clients.clear()
+    _markets_loaded_at.clear()
+    for ex in clients:
+        try:
+            await ex.close()
+        except Exception:
+            pass
@@ -1,6 +1,9 @@
 """Twelve Data API: Forex ve altın (EUR/USD, XAU/USD vb.)."""
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import deque
 from typing import Any
 
 import httpx
@@ -17,10 +20,97 @@ DEFAULT_SYMBOLS = [
 ]
 
 
+BUDGET_ERROR = "Twelve Data dakikalık kredi limiti doldu, daha sonra tekrar deneyin."
+
+_client: httpx.AsyncClient | None = None
+
+
+class CreditBudget:
+    """Kayan 60 sn pencerede harcanan krediyi izler; limit dolunca sıradaki isteği bekletir."""
+
+    def __init__(self, per_minute: int, window_sec: float = 60.0) -> None:
+        self.per_minute = per_minute
+        self.window_sec = window_sec
+        self._spent: deque[tuple[float, int]] = deque()
+        self._lock = asyncio.Lock()
+
+    def _used(self, now: float) -> int:
+        while self._spent and now - self._spent[0][0] >= self.window_sec:
+            self._spent.popleft()
+        return sum(cost for _, cost in self._spent)
+
+    async def acquire(self, cost: int = 1, max_wait: float = 0.0) -> bool:
+        """cost kadar kredi ayırır. max_wait içinde yer açılmazsa False döner."""
+        deadline = time.monotonic() + max_wait
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._used(now) + cost <= self.per_minute or not self._spent:
+                    self._spent.append((now, cost))
+                    return True
+                wait = self._spent[0][0] + self.window_sec - now
+                if now + wait > deadline:
+                    return False
+                await asyncio.sleep(wait)
+
+    def remaining(self) -> int:
+        return max(self.per_minute - self._used(time.monotonic()), 0)
+
+
+_budget: CreditBudget | None = None
+
+
 def _interval(s: str) -> str:
     return INTERVAL_MAP.get(s.lower(), "1h")
 
 
+def get_client() -> httpx.AsyncClient:
+    """Paylaşımlı, havuzlu HTTP istemcisi (uygulama ömrü boyunca tek)."""
+    global _client
+    if _client is None or _client.is_closed:
+        settings = get_settings()
+        http2 = settings.twelve_data_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=settings.twelve_data_timeout_sec,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.twelve_data_max_connections,
+                max_keepalive_connections=settings.twelve_data_max_keepalive_connections,
+                keepalive_expiry=settings.twelve_data_keepalive_expiry_sec,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Paylaşımlı istemciyi kapatır (uygulama kapanışında)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_budget() -> CreditBudget:
+    global _budget
+    if _budget is None:
+        _budget = CreditBudget(get_settings().twelve_data_credits_per_minute)
+    return _budget
+
+
+async def _get(path: str, params: dict[str, Any], cost: int = 1) -> httpx.Response | None:
+    """Kredi bütçesinden düşerek GET yapar. Bütçe zamanında açılmazsa None."""
+    settings = get_settings()
+    if not await get_budget().acquire(cost, settings.twelve_data_budget_max_wait_sec):
+        return None
+    return await get_client().get(path, params={**params, "apikey": settings.twelve_data_api_key})
+
+
 async def get_symbols_twelvedata() -> dict[str, Any]:
     """Twelve Data API'den forex_pairs ve commodities sembollerini çeker.
     API key yoksa varsayılan liste döner."""
@@ -32,25 +122,11 @@ async def get_symbols_twelvedata() -> dict[str, Any]:
             "source": "default",
         }
     symbols: set[str] = set()
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        # Forex çiftleri
-        r_forex = await client.get(
-            f"{BASE_URL}/forex_pairs",
-            params={"apikey": settings.twelve_data_api_key},
-        )
-        if r_forex.status_code == 200:
-            data = r_forex.json()
-            for item in (data.get("data") or []):
-                s = item.get("symbol")
-                if s and isinstance(s, str) and "/" in s:
-                    symbols.add(s)
-        # Emtialar (altın, gümüş vb. - XAU/USD, XAG/USD formatında olanlar)
-        r_comm = await client.get(
-            f"{BASE_URL}/commodities",
-            params={"apikey": settings.twelve_data_api_key},
-        )
-        if r_comm.status_code == 200:
-            data = r_comm.json()
+    # Forex çiftleri, ardından emtialar (altın, gümüş vb. - XAU/USD, XAG/USD formatında olanlar)
+    for path in ("/forex_pairs", "/commodities"):
+        r = await _get(path, {})
+        if r is not None and r.status_code == 200:
+            data = r.json()
             for item in (data.get("data") or []):
                 s = item.get("symbol")
                 if s and isinstance(s, str) and "/" in s:
@@ -69,16 +145,12 @@ async def get_ohlcv_twelvedata(symbol: str, timeframe: str, limit: int) -> dict[
     if not settings.twelve_data_api_key:
         return {"exchange": "twelvedata", "symbol": symbol, "candles": [], "hata": "API anahtarı yok."}
     interval = _interval(timeframe)
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        r = await client.get(
-            f"{BASE_URL}/time_series",
-            params={
-                "symbol": symbol,
-                "interval": interval,
-                "outputsize": min(limit, 5000),
-                "apikey": settings.twelve_data_api_key,
-            },
-        )
+    r = await _get(
+        "/time_series",
+        {"symbol": symbol, "interval": interval, "outputsize": min(limit, 5000)},
+    )
+    if r is None:
+        return {"exchange": "twelvedata", "symbol": symbol, "candles": [], "hata": BUDGET_ERROR}
     if r.status_code != 200:
         return {"exchange": "twelvedata", "symbol": symbol, "candles": [], "hata": r.text}
     data = r.json()
@@ -102,11 +174,9 @@ async def get_ticker_twelvedata(symbol: str) -> dict[str, Any]:
     settings = get_settings()
     if not settings.twelve_data_api_key:
         return {"symbol": symbol, "last": None, "change_24h": None, "hata": "API anahtarı yok."}
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        r = await client.get(
-            f"{BASE_URL}/quote",
-            params={"symbol": symbol, "apikey": settings.twelve_data_api_key},
-        )
+    r = await _get("/quote", {"symbol": symbol})
+    if r is None:
+        return {"symbol": symbol, "last": None, "change_24h": None, "hata": BUDGET_ERROR}
     if r.status_code != 200:
         return {"symbol": symbol, "last": None, "change_24h": None, "hata": r.text}
     data = r.json()
@@ -1,28 +1,25 @@
 """Market data: ccxt (kripto) + Twelve Data (forex/altın)."""
 from typing import Any
 
+from app.config import get_settings
+from app.services.market_data import cache, exchanges
 from app.services.market_data import providers as prov
 
 
-def _get_exchange(exchange_id: str):
-    import ccxt.async_support as ccxt
-    if exchange_id == "binance":
-        return ccxt.binance({"enableRateLimit": True})
-    if exchange_id == "bybit":
-        return ccxt.bybit({"enableRateLimit": True})
-    raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+async def get_symbols(exchange_id: str) -> dict[str, Any]:
+    return await cache.cached(
+        cache.make_key("symbols", exchange_id),
+        get_settings().market_cache_ttl_symbols_sec,
+        lambda: _load_symbols(exchange_id),
+    )
 
 
-async def get_symbols(exchange_id: str) -> dict[str, Any]:
+async def _load_symbols(exchange_id: str) -> dict[str, Any]:
     if exchange_id == "twelvedata":
         return await prov.twelvedata.get_symbols_twelvedata()
-    ex = _get_exchange(exchange_id)
-    try:
-        await ex.load_markets()
-        symbols = list(ex.symbols)[:100]
-        return {"exchange": exchange_id, "symbols": symbols}
-    finally:
-        await ex.close()
+    ex = await exchanges.get_exchange(exchange_id)
+    symbols = list(ex.symbols)[:100]
+    return {"exchange": exchange_id, "symbols": symbols}
 
 
 async def get_ohlcv(
@@ -31,39 +28,53 @@ async def get_ohlcv(
     timeframe: str = "1h",
     limit: int = 100,
 ) -> dict[str, Any]:
+    return await cache.cached(
+        cache.make_key("ohlcv", exchange_id, symbol, timeframe, limit),
+        get_settings().market_cache_ttl_ohlcv_sec,
+        lambda: _load_ohlcv(exchange_id, symbol, timeframe, limit),
+    )
+
+
+async def _load_ohlcv(exchange_id: str, symbol: str, timeframe: str, limit: int) -> dict[str, Any]:
     if exchange_id == "twelvedata":
         return await prov.twelvedata.get_ohlcv_twelvedata(symbol, timeframe, limit)
-    ex = _get_exchange(exchange_id)
-    try:
-        ohlcv = await ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-        return {
-            "exchange": exchange_id,
-            "symbol": symbol,
-            "timeframe": timeframe,
-            "candles": ohlcv,
-        }
-    finally:
-        await ex.close()
+    ex = await exchanges.get_exchange(exchange_id)
+    ohlcv = await ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+    return {
+        "exchange": exchange_id,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "candles": ohlcv,
+    }
 
 
 async def get_ticker(exchange_id: str, symbol: str) -> dict[str, Any]:
+    return await cache.cached(
+        cache.make_key("ticker", exchange_id, symbol),
+        get_settings().market_cache_ttl_ticker_sec,
+        lambda: _load_ticker(exchange_id, symbol),
+    )
+
+
+async def _load_ticker(exchange_id: str, symbol: str) -> dict[str, Any]:
     if exchange_id == "twelvedata":
         return await prov.twelvedata.get_ticker_twelvedata(symbol)
-    ex = _get_exchange(exchange_id)
-    try:
-        ticker = await ex.fetch_ticker(symbol)
-        return {
-            "symbol": ticker["symbol"],
-            "last": ticker.get("last"),
-            "bid": ticker.get("bid"),
-            "ask": ticker.get("ask"),
-            "volume": ticker.get("baseVolume"),
-            "change_24h": ticker.get("percentage"),
-            "high_24h": ticker.get("high"),
-            "low_24h": ticker.get("low"),
-        }
-    finally:
-        await ex.close()
+    ex = await exchanges.get_exchange(exchange_id)
+    return ticker_to_dict(await ex.fetch_ticker(symbol))
+
+
+def ticker_to_dict(ticker: dict[str, Any]) -> dict[str, Any]:
+    """ccxt ticker → API formatı (REST ve canlı akış ortak)."""
+    return {
+        "symbol": ticker["symbol"],
+        "last": ticker.get("last"),
+        "bid": ticker.get("bid"),
+        "ask": ticker.get("ask"),
+        "volume": ticker.get("baseVolume"),
+        "change_24h": ticker.get("percentage"),
+        "high_24h": ticker.get("high"),
+        "low_24h": ticker.get("low"),
+    }
 
 
 async def get_order_book(
@@ -74,17 +85,18 @@ async def get_order_book(
     """Emir defteri: alış (bids) ve satış (asks) listesi. twelvedata desteklemez."""
     if exchange_id == "twelvedata":
         return {"exchange": exchange_id, "symbol": symbol, "bids": [], "asks": []}
-    ex = _get_exchange(exchange_id)
-    try:
-        ob = await ex.fetch_order_book(symbol, limit)
-        return {
-            "exchange": exchange_id,
-            "symbol": symbol,
-            "bids": [[float(p), float(q)] for p, q in (ob.get("bids") or [])[:limit]],
-            "asks": [[float(p), float(q)] for p, q in (ob.get("asks") or [])[:limit]],
-        }
-    finally:
-        await ex.close()
+    ex = await exchanges.get_exchange(exchange_id)
+    ob = await ex.fetch_order_book(symbol, limit)
+    return order_book_to_dict(exchange_id, symbol, ob, limit)
+
+
+def order_book_to_dict(exchange_id: str, symbol: str, ob: dict[str, Any], limit: int) -> dict[str, Any]:
+    return {
+        "exchange": exchange_id,
+        "symbol": symbol,
+        "bids": [[float(p), float(q)] for p, q, *_ in (ob.get("bids") or [])[:limit]],
+        "asks": [[float(p), float(q)] for p, q, *_ in (ob.get("asks") or [])[:limit]],
+    }
 
 
 async def get_trades(
@@ -95,18 +107,17 @@ async def get_trades(
     """Son işlemler (market trades). twelvedata desteklemez."""
     if exchange_id == "twelvedata":
         return {"exchange": exchange_id, "symbol": symbol, "trades": []}
-    ex = _get_exchange(exchange_id)
-    try:
-        trades = await ex.fetch_trades(symbol, limit=limit)
-        out = []
-        for t in trades[:limit]:
-            out.append({
-                "id": t.get("id"),
-                "price": float(t.get("price", 0)),
-                "amount": float(t.get("amount", 0)),
-                "side": t.get("side", "buy"),
-                "timestamp": t.get("timestamp"),
-            })
-        return {"exchange": exchange_id, "symbol": symbol, "trades": out}
-    finally:
-        await ex.close()
+    ex = await exchanges.get_exchange(exchange_id)
+    trades = await ex.fetch_trades(symbol, limit=limit)
+    out = [trade_to_dict(t) for t in trades[:limit]]
+    return {"exchange": exchange_id, "symbol": symbol, "trades": out}
+
+
+def trade_to_dict(t: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": t.get("id"),
+        "price": float(t.get("price", 0)),
+        "amount": float(t.get("amount", 0)),
+        "side": t.get("side", "buy"),
+        "timestamp": t.get("timestamp"),
+    }
@@ -0,0 +1,92 @@
+"""Çevrimdışı sentetik piyasa akışı (market_stream_source="stub"): borsaya bağlanmadan geliştirme/test.
+
+Topic başına deterministik (topic anahtarıyla tohumlanmış) rastgele yürüyüş üretir; çıktılar
+gerçek kaynaklarla aynı biçimdedir. Mumlar zaman dilimine hizalıdır, geçmiş de üretilir.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.config import get_settings
+from app.services.market_data.candle_store import timeframe_ms
+
+_START_PRICE = 100.0
+
+
+def _rng(topic) -> random.Random:
+    seed = int.from_bytes(hashlib.blake2b(topic.key().encode(), digest_size=8).digest(), "big")
+    return random.Random(seed)
+
+
+def _step(rng: random.Random, price: float) -> float:
+    return max(price * (1 + rng.gauss(0, 0.001)), 0.01)
+
+
+def _history(rng: random.Random, tf: int, now_ms: int, count: int) -> tuple[deque, float]:
+    candles: deque = deque(maxlen=count)
+    price = _START_PRICE
+    current = now_ms // tf * tf
+    for ts in range(current - (count - 1) * tf, current + 1, tf):
+        ticks = [price]
+        for _ in range(4):
+            ticks.append(_step(rng, ticks[-1]))
+        c = ticks[-1]
+        candles.append([ts, price, max(price, *ticks), min(price, *ticks), c, round(rng.uniform(1, 50), 4)])
+        price = c
+    return candles, price
+
+
+async def source(topic) -> AsyncIterator[dict[str, Any]]:
+    settings = get_settings()
+    rng = _rng(topic)
+    interval = settings.market_stream_stub_interval_sec
+    ex, symbol = topic.exchange, topic.symbol
+    price = _START_PRICE
+    if topic.channel == "ohlcv":
+        tf = timeframe_ms(topic.timeframe)
+        candles, price = _history(rng, tf, int(time.time() * 1000), settings.market_stream_ohlcv_limit)
+        while True:
+            now_ms = int(time.time() * 1000)
+            price = _step(rng, price)
+            ts = now_ms // tf * tf
+            last = candles[-1]
+            if ts > last[0]:
+                candles.append([ts, last[4], max(last[4], price), min(last[4], price), price, 0.0])
+            else:
+                # Yayınlanmış listeler paylaşıldığı için mum yerinde değiştirilmez
+                candles[-1] = [last[0], last[1], max(last[2], price), min(last[3], price), price, last[5]]
+            candles[-1][5] = round(candles[-1][5] + rng.uniform(0, 1), 4)
+            yield {"exchange": ex, "symbol": symbol, "timeframe": topic.timeframe, "candles": list(candles)}
+            await asyncio.sleep(interval)
+    trades: deque = deque(maxlen=settings.market_stream_trades_limit)
+    trade_id = 0
+    while True:
+        price = _step(rng, price)
+        if topic.channel == "ticker":
+            spread = price * 0.0001
+            yield {
+                "symbol": symbol, "last": price, "bid": price - spread, "ask": price + spread,
+                "volume": None, "change_24h": None, "high_24h": None, "low_24h": None,
+            }
+        elif topic.channel == "trades":
+            trade_id += 1
+            trades.append({
+                "id": str(trade_id), "price": price, "amount": round(rng.uniform(0.001, 1), 6),
+                "side": rng.choice(("buy", "sell")), "timestamp": int(time.time() * 1000),
+            })
+            yield {"exchange": ex, "symbol": symbol, "trades": list(trades)}
+        else:
+            depth = settings.market_stream_orderbook_depth
+            step = price * 0.0002
+            yield {
+                "exchange": ex, "symbol": symbol,
+                "bids": [[price - (i + 1) * step, round(rng.uniform(0.1, 5), 4)] for i in range(depth)],
+                "asks": [[price + (i + 1) * step, round(rng.uniform(0.1, 5), 4)] for i in range(depth)],
+            }
+        await asyncio.sleep(interval)
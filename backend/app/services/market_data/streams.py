@@ -0,0 +1,266 @@
+"""Canlı piyasa akışları: (borsa, sembol, kanal) başına tek upstream akış, son durum bellekte.
+
+Kanallar: ticker, ohlcv (zaman dilimiyle), trades, orderbook. Kaynak ccxt.pro watch_* (WebSocket);
+borsa akış desteklemiyorsa (ör. twelvedata) REST yoklamasına düşülür. market_stream_source="stub"
+ile çevrimdışı sentetik akış kullanılır (stream_stub).
+
+Aboneler acquire/release ile referans sayar; son abone gidince akış market_stream_idle_sec sonra kapanır.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import get_settings
+from app.services.market_data import exchanges
+from app.services.market_data import service as market_service
+
+CHANNELS = ("ticker", "ohlcv", "trades", "orderbook")
+
+# ccxt.pro'da kanal başına gereken yetenek
+_WATCH_CAPABILITY = {
+    "ticker": "watchTicker",
+    "ohlcv": "watchOHLCV",
+    "trades": "watchTrades",
+    "orderbook": "watchOrderBook",
+}
+
+_MAX_BACKOFF_SEC = 30.0
+
+
+@dataclass(frozen=True)
+class Topic:
+    exchange: str
+    symbol: str
+    channel: str
+    timeframe: str = ""  # yalnızca ohlcv
+
+    def key(self) -> str:
+        return ":".join(p for p in (self.exchange, self.symbol, self.channel, self.timeframe) if p)
+
+
+class Stream:
+    """Tek topic'in son durumu; her güncellemede version artar ve bekleyenler uyanır."""
+
+    def __init__(self, topic: Topic) -> None:
+        self.topic = topic
+        self.state: dict[str, Any] | None = None
+        self.version = 0
+        self.updated_at: float | None = None  # time.monotonic()
+        self.error: str | None = None
+        self.refs = 0
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._idle_handle: asyncio.TimerHandle | None = None
+
+    def publish(self, state: dict[str, Any]) -> None:
+        self.state = state
+        self.version += 1
+        self.updated_at = time.monotonic()
+        self.error = None
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def fail(self, error: str) -> None:
+        self.error = error
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, after_version: int, timeout: float | None = None) -> bool:
+        """version > after_version olana (veya hata gelene) kadar bekler; zaman aşımında False."""
+        if self.version > after_version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"stream:{self.topic.key()}")
+
+    async def stop(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Kaynak kesilirse üstel bekleme ile yeniden bağlanır."""
+        backoff = 1.0
+        while True:
+            try:
+                async for state in _source(self.topic):
+                    self.publish(state)
+                    backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.fail(str(e))
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _MAX_BACKOFF_SEC)
+
+
+_streams: dict[Topic, Stream] = {}
+
+
+def make_topic(exchange: str, symbol: str, channel: str, timeframe: str | None = None) -> Topic:
+    if channel not in CHANNELS:
+        raise ValueError(f"Bilinmeyen kanal: {channel}")
+    if channel == "ohlcv":
+        return Topic(exchange, symbol, channel, timeframe or "1h")
+    return Topic(exchange, symbol, channel)
+
+
+def acquire(topic: Topic) -> Stream:
+    """Topic akışına abone olur; akış yoksa başlatır."""
+    stream = _streams.get(topic)
+    if stream is None:
+        stream = _streams[topic] = Stream(topic)
+    if stream._idle_handle is not None:
+        stream._idle_handle.cancel()
+        stream._idle_handle = None
+    stream.refs += 1
+    stream.start()
+    return stream
+
+
+def release(stream: Stream) -> None:
+    """Aboneliği bırakır; son abone gidince akış bekleme süresi sonunda kapatılır."""
+    stream.refs = max(stream.refs - 1, 0)
+    if stream.refs == 0 and stream._idle_handle is None:
+        loop = asyncio.get_running_loop()
+        stream._idle_handle = loop.call_later(
+            get_settings().market_stream_idle_sec, _close_if_idle, stream.topic
+        )
+
+
+def _close_if_idle(topic: Topic) -> None:
+    stream = _streams.get(topic)
+    if stream is None:
+        return
+    stream._idle_handle = None
+    if stream.refs == 0:
+        del _streams[topic]
+        asyncio.create_task(stream.stop())
+
+
+@asynccontextmanager
+async def subscribe(topic: Topic) -> AsyncIterator[Stream]:
+    stream = acquire(topic)
+    try:
+        yield stream
+    finally:
+        release(stream)
+
+
+def peek(topic: Topic) -> Stream | None:
+    """Çalışan akışı abone olmadan döner (yoksa None)."""
+    return _streams.get(topic)
+
+
+def active_topics() -> list[dict[str, Any]]:
+    return [
+        {"topic": t.key(), "refs": s.refs, "version": s.version, "hata": s.error}
+        for t, s in _streams.items()
+    ]
+
+
+async def close_all() -> None:
+    """Tüm akışları durdurur (uygulama kapanışında)."""
+    streams = list(_streams.values())
+    _streams.clear()
+    for stream in streams:
+        await stream.stop()
+
+
+# --- Kaynaklar: her biri topic'in tam güncel durumunu (REST yanıtlarıyla aynı biçimde) üretir ---
+
+
+def _source(topic: Topic) -> AsyncIterator[dict[str, Any]]:
+    if get_settings().market_stream_source == "stub":
+        from app.services.market_data import stream_stub
+        return stream_stub.source(topic)
+    if topic.exchange == "twelvedata":
+        return _poll_source(topic)
+    client = exchanges.get_stream_exchange(topic.exchange)
+    if not client.has.get(_WATCH_CAPABILITY[topic.channel]):
+        return _poll_source(topic)
+    return _watch_source(client, topic)
+
+
+async def _seed_candles(topic: Topic) -> deque:
+    limit = get_settings().market_stream_ohlcv_limit
+    res = await market_service.get_ohlcv(topic.exchange, topic.symbol, topic.timeframe, limit)
+    if "hata" in res:
+        raise RuntimeError(res["hata"])
+    return deque(res.get("candles") or [], maxlen=limit)
+
+
+def merge_candles(candles: deque, updates: list[list]) -> None:
+    """Güncellemeleri ts'ye göre birleştirir: son mum yerinde güncellenir, yeniler sona eklenir."""
+    for c in updates:
+        if candles and c[0] == candles[-1][0]:
+            candles[-1] = list(c)
+        elif not candles or c[0] > candles[-1][0]:
+            candles.append(list(c))
+
+
+async def _watch_source(client, topic: Topic) -> AsyncIterator[dict[str, Any]]:
+    settings = get_settings()
+    ex, symbol = topic.exchange, topic.symbol
+    if topic.channel == "ticker":
+        while True:
+            yield market_service.ticker_to_dict(await client.watch_ticker(symbol))
+    elif topic.channel == "ohlcv":
+        candles = await _seed_candles(topic)
+        yield {"exchange": ex, "symbol": symbol, "timeframe": topic.timeframe, "candles": list(candles)}
+        while True:
+            merge_candles(candles, await client.watch_ohlcv(symbol, topic.timeframe))
+            yield {"exchange": ex, "symbol": symbol, "timeframe": topic.timeframe, "candles": list(candles)}
+    elif topic.channel == "trades":
+        recent: deque = deque(maxlen=settings.market_stream_trades_limit)
+        seen: set[Any] = set()
+        while True:
+            for t in await client.watch_trades(symbol):
+                # ccxt önbelleği önceki işlemleri de döndürebilir
+                if t.get("id") is not None and t["id"] in seen:
+                    continue
+                recent.append(market_service.trade_to_dict(t))
+                seen = {r["id"] for r in recent}
+            yield {"exchange": ex, "symbol": symbol, "trades": list(recent)}
+    elif topic.channel == "orderbook":
+        while True:
+            ob = await client.watch_order_book(symbol)
+            yield market_service.order_book_to_dict(ex, symbol, ob, settings.market_stream_orderbook_depth)
+
+
+async def _poll_source(topic: Topic) -> AsyncIterator[dict[str, Any]]:
+    """Akış desteklemeyen sağlayıcılar için REST yoklaması (tüm aboneler için tek istek)."""
+    settings = get_settings()
+    ex, symbol = topic.exchange, topic.symbol
+    while True:
+        if topic.channel == "ticker":
+            res = await market_service.get_ticker(ex, symbol)
+        elif topic.channel == "ohlcv":
+            res = await market_service.get_ohlcv(ex, symbol, topic.timeframe, settings.market_stream_ohlcv_limit)
+        elif topic.channel == "trades":
+            res = await market_service.get_trades(ex, symbol, settings.market_stream_trades_limit)
+        else:
+            res = await market_service.get_order_book(ex, symbol, settings.market_stream_orderbook_depth)
+        if "hata" in res:
+            raise RuntimeError(res["hata"])
+        yield res
+        await asyncio.sleep(settings.market_stream_poll_sec)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
@@ -11,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.models.ml_model import MLModel
-from app.services.market_data import service as market_service
+from app.services.market_data import candle_store
 from app.services.ml import trainer
 
 
@@ -93,10 +94,19 @@ async def train_from_ohlcv(
     timeframe: str,
     name: str,
     version: str = "v1",
+    start_ts: datetime | None = None,
+    end_ts: datetime | None = None,
 ) -> dict[str, Any]:
-    """OHLCV çeker, eğitim yapar, model kaydı oluşturur."""
-    ohlcv_res = await market_service.get_ohlcv(exchange, symbol, timeframe, limit=500)
-    candles = ohlcv_res.get("candles") or []
+    """OHLCV'yi yerel depodan okur (aralık yoksa son 500 mum), eğitim yapar, model kaydı oluşturur."""
+    start_ms, end_ms = candle_store.default_range_ms(timeframe)
+    if start_ts is not None:
+        start_ms = candle_store.to_ms(start_ts)
+    if end_ts is not None:
+        end_ms = candle_store.to_ms(end_ts)
+    try:
+        candles = await candle_store.get_candles(db, exchange, symbol, timeframe, start_ms, end_ms)
+    except ValueError as e:
+        return {"ok": False, "hata": str(e)}
     if len(candles) < 50:
         return {"ok": False, "hata": "Yetersiz OHLCV verisi (en az 50 mum gerekli)."}
 
@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 import os
+import uuid
 from pathlib import Path
 from typing import Any
 
 import joblib
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
@@ -52,23 +54,48 @@ def _ohlcv_to_features(closes: list[float], volumes: list[float]) -> np.ndarray:
     ], dtype=np.float32)
 
 
+def feature_matrix(closes, volumes) -> np.ndarray:
+    """Her mum için özellik satırı (tek geçiş): satır i = _ohlcv_to_features(ilk i + 1 mum).
+
+    İlk 20 satır (yetersiz geçmiş) NaN. Değerler mum mum hesaplamayla bit düzeyinde aynıdır.
+    """
+    c = np.asarray(closes, dtype=float)
+    v = np.asarray(volumes, dtype=float)
+    n = len(c)
+    out = np.full((n, len(FEATURE_NAMES)), np.nan)
+    if n < 21 or len(v) != n:
+        return out.astype(np.float32)
+    ret = np.diff(c) / (c[:-1] + 1e-12)  # ret[k]: k + 1. mumun getirisi
+    i = np.arange(20, n)
+    ma5 = sliding_window_view(c, 5).mean(axis=-1)[i - 4]
+    ma20 = sliding_window_view(c, 20).mean(axis=-1)[i - 19]
+    hacim3 = sliding_window_view(v, 3).mean(axis=-1)
+    out[20:] = np.column_stack([
+        ret[i - 1], ret[i - 2], ret[i - 3], ret[i - 5],
+        ma5 / (ma20 + 1e-12) - 1.0,
+        hacim3[i - 2] / (hacim3[i - 5] + 1e-12) - 1.0,
+    ])
+    return out.astype(np.float32)
+
+
 def build_Xy(candles: list[list]) -> tuple[np.ndarray, np.ndarray]:
     """OHLCV mum listesinden X (özellikler) ve y (hedef: sonraki mum yukarı mı 1/0)."""
     if len(candles) < 22:
         return np.array([]), np.array([])
-    closes = [c[4] for c in candles]
+    closes = np.array([c[4] for c in candles], dtype=float)
     volumes = [c[5] if len(c) > 5 else 0.0 for c in candles]
-    X_list = []
-    y_list = []
-    for i in range(20, len(closes) - 1):
-        feat = _ohlcv_to_features(closes[: i + 1], volumes[: i + 1])
-        if len(feat) == 0:
-            continue
-        X_list.append(feat)
-        y_list.append(1 if closes[i + 1] > closes[i] else 0)
-    if not X_list:
-        return np.array([]), np.array([])
-    return np.array(X_list), np.array(y_list)
+    X = feature_matrix(closes, volumes)[20:-1]
+    y = (closes[21:] > closes[20:-1]).astype(int)
+    return X, y
+
+
+def fit_classifier(X: np.ndarray, y: np.ndarray, random_state: int = 42) -> LogisticRegression:
+    """train_and_save ile aynı model; tek sınıflı hedefte ValueError."""
+    if len(np.unique(y)) < 2:
+        raise ValueError("Eğitim hedefinde tek sınıf var")
+    model = LogisticRegression(max_iter=500, random_state=random_state)
+    model.fit(X, y)
+    return model
 
 
 def train_and_save(
@@ -93,14 +120,15 @@ def train_and_save(
     if len(X_train) < 5:
         raise ValueError("Eğitim seti çok küçük")
 
-    model = LogisticRegression(max_iter=500, random_state=random_state)
-    model.fit(X_train, y_train)
+    model = fit_classifier(X_train, y_train, random_state)
     y_pred = model.predict(X_test)
     acc = float(accuracy_score(y_test, y_pred))
 
     path = Path(artifact_dir).resolve()
     path.mkdir(parents=True, exist_ok=True)
-    filename = f"{model_name}_{version}.joblib".replace("/", "_").replace(" ", "_")
+    # Çalıştırma başına benzersiz: aynı ad/sürümle eğitilen modeller (başka kullanıcı, kuyruğa geri
+    # alınıp iki işçide koşan iş) birbirinin dosyasını ezmez veya silmez.
+    filename = f"{model_name}_{version}_{uuid.uuid4().hex[:12]}.joblib".replace("/", "_").replace(" ", "_")
     full_path = path / filename
     artifact = {
         "model": model,
@@ -1,4 +1,4 @@
-"""Mum pattern tespiti: Hammer, Doji, Engulfing. Kural tabanlı."""
+"""Mum pattern tespiti: Hammer, Doji, Engulfing, Harami, Star, üç asker/karga. Kural tabanlı."""
 from app.services.patterns.candle_detector import detect_patterns
 
 __all__ = ["detect_patterns"]
@@ -1,6 +1,11 @@
-"""Mum pattern: Hammer, Doji, Engulfing."""
+"""Mum pattern: Hammer, Doji, Engulfing, Harami, sabah/akşam yıldızı, üç asker/karga.
+
+is_* fonksiyonları tek mum içindir; detect_patterns tüm mumları NumPy maskeleriyle tek geçişte tarar.
+"""
 from typing import Any
 
+import numpy as np
+
 
 def _row(candles: list[list], i: int) -> tuple[float, float, float, float]:
     if i < 0 or i >= len(candles):
@@ -39,17 +44,130 @@ def is_bearish_engulfing(candles: list[list], i: int) -> bool:
     return c0 > o0 and c1 < o1 and o1 >= c0 and c1 <= o0
 
 
+# --- Vektörel tespit: tüm mumlar için pattern başına bir boolean maske ---
+
+
+class _Bars:
+    """O/H/L/C dizileri ve ortak türevler; prev(x, k) k mum önceki değer (baştakiler NaN)."""
+
+    def __init__(self, ohlc: np.ndarray) -> None:
+        self.o, self.h, self.lo, self.c = ohlc.T
+        self.body = np.abs(self.c - self.o)
+        self.full = self.h - self.lo
+        self.top = np.maximum(self.o, self.c)
+        self.bottom = np.minimum(self.o, self.c)
+        self.bull = self.c > self.o
+        self.bear = self.c < self.o
+
+    @staticmethod
+    def prev(x: np.ndarray, k: int = 1) -> np.ndarray:
+        out = np.empty(len(x), dtype=x.dtype)
+        if x.dtype == bool:
+            out[:k] = False
+        else:
+            out[:k] = np.nan
+        out[k:] = x[:-k] if k else x
+        return out
+
+
+def _hammer(b: _Bars) -> np.ndarray:
+    full = np.where(b.full > 0, b.full, 1.0)
+    lower = b.bottom - b.lo
+    return (
+        (b.full > 0) & (b.body / full <= 0.4) & (lower / (b.body + 1e-8) >= 2.0)
+        & ((b.h - b.top) <= b.body * 0.5)
+    )
+
+
+def _doji(b: _Bars) -> np.ndarray:
+    full = np.where(b.full > 0, b.full, 1.0)
+    return (b.full > 0) & (b.body / full <= 0.1)
+
+
+def _bullish_engulfing(b: _Bars) -> np.ndarray:
+    o0, c0 = b.prev(b.o), b.prev(b.c)
+    return (c0 < o0) & (b.c > b.o) & (b.o <= c0) & (b.c >= o0)
+
+
+def _bearish_engulfing(b: _Bars) -> np.ndarray:
+    o0, c0 = b.prev(b.o), b.prev(b.c)
+    return (c0 > o0) & (b.c < b.o) & (b.o >= c0) & (b.c <= o0)
+
+
+def _bullish_harami(b: _Bars) -> np.ndarray:
+    """Düşüş mumunun gövdesi içinde kalan daha küçük yükseliş mumu."""
+    o0, c0 = b.prev(b.o), b.prev(b.c)
+    return b.prev(b.bear) & b.bull & (b.o >= c0) & (b.c <= o0) & (b.body < b.prev(b.body))
+
+
+def _bearish_harami(b: _Bars) -> np.ndarray:
+    o0, c0 = b.prev(b.o), b.prev(b.c)
+    return b.prev(b.bull) & b.bear & (b.o <= c0) & (b.c >= o0) & (b.body < b.prev(b.body))
+
+
+def _star(b: _Bars, bullish: bool) -> np.ndarray:
+    """Sabah/akşam yıldızı: güçlü mum, küçük gövdeli yıldız, ilk gövdenin ortasını geçen ters mum."""
+    first_dir, last_dir = (b.bear, b.bull) if bullish else (b.bull, b.bear)
+    o0, c0, body0, full0 = (b.prev(x, 2) for x in (b.o, b.c, b.body, b.full))
+    body1, top1, bottom1 = (b.prev(x) for x in (b.body, b.top, b.bottom))
+    mid0 = (o0 + c0) / 2
+    strong = b.prev(first_dir, 2) & (body0 >= 0.5 * full0) & (body1 <= 0.3 * body0)
+    if bullish:
+        return strong & (top1 <= c0) & last_dir & (b.c > mid0)
+    return strong & (bottom1 >= c0) & last_dir & (b.c < mid0)
+
+
+def _three(b: _Bars, bullish: bool) -> np.ndarray:
+    """Üç beyaz asker / üç kara karga: aynı yönde, her biri öncekinin gövdesinde açılan üç güçlü mum."""
+    direction = b.bull if bullish else b.bear
+    strong = direction & (b.body >= 0.5 * b.full)
+    advancing = (b.c > b.prev(b.c)) if bullish else (b.c < b.prev(b.c))
+    opens_inside = (b.o >= b.prev(b.bottom)) & (b.o <= b.prev(b.top))
+    step = strong & advancing & opens_inside
+    return step & b.prev(step) & b.prev(strong, 2)
+
+
+# Sıra, aynı mumdaki kayıtların sırasıdır (ilk dördü detect_patterns'ın önceki çıktısıyla aynı).
+PATTERNS: tuple[tuple[str, str, Any], ...] = (
+    ("hammer", "bullish", _hammer),
+    ("doji", "neutral", _doji),
+    ("bullish_engulfing", "bullish", _bullish_engulfing),
+    ("bearish_engulfing", "bearish", _bearish_engulfing),
+    ("bullish_harami", "bullish", _bullish_harami),
+    ("bearish_harami", "bearish", _bearish_harami),
+    ("morning_star", "bullish", lambda b: _star(b, bullish=True)),
+    ("evening_star", "bearish", lambda b: _star(b, bullish=False)),
+    ("three_white_soldiers", "bullish", lambda b: _three(b, bullish=True)),
+    ("three_black_crows", "bearish", lambda b: _three(b, bullish=False)),
+)
+
+
+def _ohlc(candles: list[list]) -> np.ndarray:
+    """(n, 4) O/H/L/C; eksik satırlar _row gibi sıfır."""
+    try:
+        arr = np.array(candles, dtype=np.float64)
+        if arr.ndim == 2 and arr.shape[1] >= 5:
+            return arr[:, 1:5]
+    except (ValueError, TypeError):
+        pass
+    return np.array([_row(candles, i) for i in range(len(candles))], dtype=np.float64).reshape(-1, 4)
+
+
+def pattern_masks(candles: list[list]) -> dict[str, np.ndarray]:
+    """Pattern adı -> mum başına boolean maske."""
+    bars = _Bars(_ohlc(candles))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {name: fn(bars) for name, _, fn in PATTERNS}
+
+
 def detect_patterns(candles: list[list]) -> list[dict[str, Any]]:
-    out: list[dict[str, Any]] = []
+    """Tüm pattern'ler tek geçişte; kayıtlar mum sırasına, aynı mumda PATTERNS sırasına göre."""
     if not candles or len(candles) < 2:
-        return out
-    for i in range(len(candles)):
-        if is_hammer(candles, i):
-            out.append({"index": i, "name": "hammer", "type": "bullish"})
-        if is_doji(candles, i):
-            out.append({"index": i, "name": "doji", "type": "neutral"})
-        if is_bullish_engulfing(candles, i):
-            out.append({"index": i, "name": "bullish_engulfing", "type": "bullish"})
-        if is_bearish_engulfing(candles, i):
-            out.append({"index": i, "name": "bearish_engulfing", "type": "bearish"})
-    return out
+        return []
+    masks = pattern_masks(candles)
+    hits = np.stack([masks[name] for name, _, _ in PATTERNS], axis=1)
+    rows, cols = np.nonzero(hits)
+    return [
+        {"index": i, "name": PATTERNS[j][0], "type": PATTERNS[j][1]}
+        for i, j in zip(rows.tolist(), cols.tolist())
+    ]
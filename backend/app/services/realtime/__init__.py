@@ -0,0 +1 @@
+"""Gerçek zamanlı yayın: WebSocket aboneleri için pub/sub merkezi ve akış beslemeleri."""
@@ -0,0 +1,143 @@
+"""Piyasa akışlarından hub kanalları: akış güncellendikçe çerçeve bir kez kodlanıp yayılır."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.services.market_data import streams
+from app.services.realtime.hub import Producer, Publish
+
+
+def market_key(topic: streams.Topic, limit: int | None = None) -> str:
+    """Kanal anahtarı; ohlcv'de mum sayısı çerçeve içeriğini değiştirdiği için anahtara girer."""
+    key = f"market:{topic.key()}"
+    return f"{key}:{limit}" if limit else key
+
+
+def market_producer(topic: streams.Topic, limit: int | None = None) -> Producer:
+    """Topic akışına abone olur; her yeni durumu (veya hatayı) tek seferde JSON'a çevirip yayar."""
+
+    async def produce(publish: Publish) -> None:
+        async with streams.subscribe(topic) as stream:
+            version = 0
+            while True:
+                await stream.wait(version)
+                if stream.version > version:
+                    version = stream.version
+                    state = stream.state
+                    if limit and "candles" in state:
+                        state = {**state, "candles": state["candles"][-limit:]}
+                    await publish(json.dumps(state))
+                elif stream.error:
+                    await publish(json.dumps({"hata": stream.error, "sembol": topic.symbol}))
+
+    return produce
+
+
+# --- OHLCV delta akışı: abonelikte snapshot, sonra yalnızca değişen mumlar (seq numaralı) ---
+
+_SEQ_PREFIX = '{"seq":'
+READY = "\x00ready"  # ilk mum seti geldi: bekleyen aboneler snapshot alabilir (istemciye gitmez)
+
+
+class OhlcvFeed:
+    """Topic'in yayınlanan mum durumu ve son seq; snapshot'lar bundan kesilir."""
+
+    def __init__(self, topic: streams.Topic) -> None:
+        self.topic = topic
+        self.candles: list[list] = []
+        self._last: list | None = None  # son mumun kopyası (kaynak listeyi yerinde güncelleyebilir)
+        self.seq = 0
+        self.ready = asyncio.Event()
+
+    def snapshot(self, limit: int) -> str:
+        return json.dumps({
+            "seq": self.seq,
+            "type": "snapshot",
+            "topic": self.topic.key(),
+            "exchange": self.topic.exchange,
+            "symbol": self.topic.symbol,
+            "timeframe": self.topic.timeframe,
+            "candles": self.candles[-limit:],
+        })
+
+    def diff(self, candles: list[list]) -> list[list]:
+        """Önceki duruma göre değişen (güncellenen oluşmakta olan + yeni) mumlar."""
+        if self._last is None or not candles:
+            return candles
+        last_ts = self._last[0]
+        i = len(candles)
+        while i > 0 and candles[i - 1][0] >= last_ts:
+            i -= 1
+        changed = candles[i:]
+        if changed and changed[0][0] == last_ts and changed[0] == self._last:
+            changed = changed[1:]
+        return changed
+
+    def update(self, candles: list[list]) -> None:
+        self.candles = candles
+        self._last = list(candles[-1]) if candles else None
+
+
+_ohlcv_feeds: dict[streams.Topic, OhlcvFeed] = {}
+
+
+def ohlcv_key(topic: streams.Topic) -> str:
+    return f"ohlcv-delta:{topic.key()}"
+
+
+def frame_seq(frame: str) -> int | None:
+    """Güncelleme çerçevesinin seq'i (JSON çözmeden); seq taşımayan çerçevede None."""
+    if not frame.startswith(_SEQ_PREFIX):
+        return None
+    return int(frame[len(_SEQ_PREFIX) : frame.index(",", len(_SEQ_PREFIX))])
+
+
+def ready_feed(topic: streams.Topic) -> OhlcvFeed | None:
+    """Çalışan delta üreticisinin durumu; ilk mum seti henüz gelmediyse None (READY çerçevesi beklenir)."""
+    feed = _ohlcv_feeds.get(topic)
+    return feed if feed is not None and feed.ready.is_set() else None
+
+
+def ohlcv_producer(topic: streams.Topic) -> Producer:
+    """Kline akışını izler; her değişiklikte yalnızca değişen mumları seq ile yayar (süreç içi)."""
+
+    async def produce(publish: Publish) -> None:
+        feed = _ohlcv_feeds[topic] = OhlcvFeed(topic)
+        key = topic.key()
+
+        def error_frame(error: str) -> str:
+            return json.dumps({"type": "error", "topic": key, "hata": error, "sembol": topic.symbol})
+
+        try:
+            async with streams.subscribe(topic) as stream:
+                version = 0
+                while True:
+                    await stream.wait(version)
+                    if stream.version > version:
+                        version = stream.version
+                        candles = stream.state["candles"]
+                        changed = feed.diff(candles)
+                        first = not feed.ready.is_set()
+                        feed.update(candles)
+                        if first:
+                            feed.ready.set()
+                            await publish(READY)
+                            continue
+                        if not changed:
+                            continue
+                        feed.seq += 1
+                        await publish(
+                            f'{_SEQ_PREFIX}{feed.seq},"type":"update","topic":{json.dumps(key)},'
+                            f'"candles":{json.dumps(changed)}}}'
+                        )
+                    elif stream.error:
+                        await publish(error_frame(stream.error))
+        except Exception as e:
+            # Üretici bitiyor: aboneler son hatayı alır, kanal kapanınca bağlantıları sonlanır
+            await publish(error_frame(str(e)))
+        finally:
+            if _ohlcv_feeds.get(topic) is feed:
+                del _ohlcv_feeds[topic]
+
+    return produce
@@ -0,0 +1,277 @@
+"""Yayın merkezi (pub/sub): kanal başına tek üretici, tüm abonelere aynı önceden kodlanmış çerçeve.
+
+Her kanalın (ör. "binance:BTC/USDT:ticker") en fazla bir üretici görevi vardır; ürettiği çerçeve
+bir kez JSON'a çevrilir ve abonelerin sınırlı kuyruklarına aynı str nesnesi olarak konur.
+Yavaş istemci diğerlerini bekletmez: durum kanallarında yalnızca en son çerçeve tutulur
+(conflation), olay kanallarında kuyruk taşarsa istemci "geride kaldı" olarak işaretlenir.
+
+ws_hub_redis_bridge açıksa çerçeveler Redis pub/sub üzerinden dağıtılır: kanal başına
+tüm süreçler arasında tek üretici (Redis kira anahtarı ile seçilir), diğer süreçler dinler.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.config import get_settings
+
+Publish = Callable[[str], Awaitable[None]]
+Producer = Callable[[Publish], Awaitable[None]]
+
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+stats: dict[str, int] = {"frames": 0, "deliveries": 0, "conflated": 0, "lagged": 0}
+
+
+class Subscriber:
+    """İstemci başına sınırlı çerçeve kuyruğu."""
+
+    def __init__(self, maxsize: int, conflate: bool) -> None:
+        self._frames: deque[str] = deque()
+        self._maxsize = max(maxsize, 1)
+        self._conflate = conflate
+        self._ready = asyncio.Event()
+        self.lagged = False  # kuyruk taştı, çerçeve kaçırıldı (olay kanalları)
+
+    def offer(self, frame: str) -> None:
+        if self._conflate:
+            if self._frames:
+                stats["conflated"] += 1
+            self._frames.clear()
+        elif len(self._frames) >= self._maxsize:
+            self._frames.clear()
+            if not self.lagged:
+                stats["lagged"] += 1
+            self.lagged = True
+        self._frames.append(frame)
+        self._ready.set()
+
+    async def get(self) -> str:
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
+    def get_nowait(self) -> str | None:
+        return self._frames.popleft() if self._frames else None
+
+
+class _Channel:
+    def __init__(self, key: str, producer: Producer | None, conflate: bool, bridged: bool) -> None:
+        self.key = key
+        self.producer = producer
+        self.conflate = conflate
+        self.bridged = bridged
+        self.subscribers: set[Subscriber] = set()
+        self.last_frame: str | None = None  # yeni abone son durumu hemen alır (durum kanalları)
+        self.task: asyncio.Task | None = None
+
+    def deliver(self, frame: str) -> None:
+        if self.conflate:
+            self.last_frame = frame
+        stats["frames"] += 1
+        for sub in self.subscribers:
+            sub.offer(frame)
+        stats["deliveries"] += len(self.subscribers)
+
+    async def publish_local(self, frame: str) -> None:
+        self.deliver(frame)
+
+
+_channels: dict[str, _Channel] = {}
+
+
+async def _run_channel(channel: _Channel) -> None:
+    bridge = get_bridge() if channel.bridged else None
+    if bridge is not None:
+        try:
+            await bridge.run(channel)
+            return
+        except Exception:
+            pass  # Redis'e ulaşılamıyor: bu süreçte yerel üretime düş
+    if channel.producer is not None:
+        await channel.producer(channel.publish_local)
+
+
+@asynccontextmanager
+async def subscribe(
+    key: str, producer: Producer | None = None, conflate: bool = True, bridged: bool = True
+) -> AsyncIterator[Subscriber]:
+    """Kanala abone olur; kanal yoksa oluşturulur ve üreticisi başlatılır.
+
+    Son abone ayrılınca üretici durdurulur. producer None ise kanal yalnızca publish() ile beslenir.
+    bridged=False kanallar Redis köprüsü açık olsa da süreç içinde üretilir.
+    """
+    channel = _channels.get(key)
+    if channel is None or (channel.producer is not None and channel.task is not None and channel.task.done()):
+        # Üreticisi bitmiş kanala katılınmaz: yeni abone üreticiyi yeniden başlatır
+        channel = _channels[key] = _Channel(key, producer, conflate, bridged)
+        channel.task = asyncio.create_task(_run_channel(channel), name=f"hub:{key}")
+    sub = Subscriber(get_settings().ws_hub_client_queue, channel.conflate)
+    if channel.last_frame is not None:
+        sub.offer(channel.last_frame)
+    channel.subscribers.add(sub)
+    try:
+        yield sub
+    finally:
+        channel.subscribers.discard(sub)
+        if not channel.subscribers and _channels.get(key) is channel:
+            del _channels[key]
+            if channel.task is not None:
+                channel.task.cancel()
+
+
+def producer_task(key: str) -> asyncio.Task | None:
+    """Kanalın üretici görevi (abonelik sürerken); bittiyse kanal artık çerçeve üretmez."""
+    channel = _channels.get(key)
+    return channel.task if channel is not None else None
+
+
+async def publish(key: str, frame: str) -> None:
+    """Üreticisi olmayan (olay) kanallarına çerçeve gönderir; köprü açıksa tüm süreçlere."""
+    bridge = get_bridge()
+    if bridge is not None:
+        try:
+            await bridge.publish(key, frame)
+            return
+        except Exception:
+            pass
+    channel = _channels.get(key)
+    if channel is not None:
+        channel.deliver(frame)
+
+
+def get_stats() -> dict[str, Any]:
+    return {
+        **stats,
+        "channels": len(_channels),
+        "subscribers": sum(len(c.subscribers) for c in _channels.values()),
+        "redis_bridge": get_bridge() is not None,
+    }
+
+
+async def close_all() -> None:
+    channels = list(_channels.values())
+    _channels.clear()
+    for channel in channels:
+        if channel.task is not None:
+            channel.task.cancel()
+    global _bridge
+    if _bridge is not None:
+        await _bridge.close()
+        _bridge = None
+
+
+# --- Redis köprüsü ---
+
+
+class RedisBridge:
+    """Süreç başına tek pub/sub bağlantısı; kanal başına üretici Redis kirasıyla seçilir."""
+
+    _PREFIX = "zenithai:hub:"
+    _RENEW = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+    )
+    _RELEASE = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self._pubsub = self._redis.pubsub()
+        self._reader: asyncio.Task | None = None
+        self._lease_ms = int(get_settings().ws_hub_lease_ttl_sec * 1000)
+
+    def _topic(self, key: str) -> str:
+        return f"{self._PREFIX}frames:{key}"
+
+    async def publish(self, key: str, frame: str, keep_last: bool = False) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.publish(self._topic(key), frame)
+            if keep_last:
+                # Sonradan katılan süreçler son durumu buradan alır
+                pipe.set(f"{self._PREFIX}last:{key}", frame, px=self._lease_ms * 4)
+            await pipe.execute()
+
+    async def _read(self) -> None:
+        prefix = self._topic("")
+        while True:
+            if not self._pubsub.subscribed:
+                await asyncio.sleep(0.1)
+                continue
+            msg = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if msg is None:
+                continue
+            channel = _channels.get(msg["channel"].decode()[len(prefix):])
+            if channel is not None:
+                channel.deliver(msg["data"].decode())
+
+    async def run(self, channel: _Channel) -> None:
+        """Kanalı Redis'e bağlar; üretici varsa kirayı alan süreç üretir, diğerleri dinler."""
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+        await self._pubsub.subscribe(self._topic(channel.key))
+        try:
+            if channel.conflate and channel.last_frame is None:
+                last = await self._redis.get(f"{self._PREFIX}last:{channel.key}")
+                if last is not None:
+                    channel.deliver(last.decode())
+            if channel.producer is None:
+                await asyncio.Event().wait()
+            lease = f"{self._PREFIX}lease:{channel.key}"
+            while True:
+                if await self._redis.set(lease, NODE_ID, nx=True, px=self._lease_ms):
+                    await self._lead(channel, lease)
+                await asyncio.sleep(self._lease_ms / 2000)
+        finally:
+            try:
+                await self._pubsub.unsubscribe(self._topic(channel.key))
+            except Exception:
+                pass
+
+    async def _lead(self, channel: _Channel, lease: str) -> None:
+        """Kira tutuldukça üreticiyi çalıştırır; kira kaybedilirse üretici durdurulur."""
+        async def publish(frame: str) -> None:
+            await self.publish(channel.key, frame, keep_last=channel.conflate)
+
+        task = asyncio.create_task(channel.producer(publish))
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=self._lease_ms / 3000)
+                if not task.done() and not await self._redis.eval(
+                    self._RENEW, 1, lease, NODE_ID, self._lease_ms
+                ):
+                    return
+        finally:
+            task.cancel()
+            try:
+                await self._redis.eval(self._RELEASE, 1, lease, NODE_ID)
+            except Exception:
+                pass
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        try:
+            await self._pubsub.aclose()
+        finally:
+            await self._redis.aclose()
+
+
+_bridge: RedisBridge | None = None
+
+
+def get_bridge() -> RedisBridge | None:
+    global _bridge
+    settings = get_settings()
+    if _bridge is None and settings.ws_hub_redis_bridge and settings.redis_url:
+        _bridge = RedisBridge(settings.redis_url)
+    return _bridge
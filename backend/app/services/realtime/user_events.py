@@ -0,0 +1,55 @@
+"""Kullanıcı olayları (emir, pozisyon): transaction commit edildikten sonra hub'a yayınlanır.
+
+Olaylar oturuma (session.info) biriktirilir; rollback olursa atılır. Zamanlayıcı gibi başka
+süreçlerde oluşan olayların API'deki WebSocket istemcilerine ulaşması için Redis köprüsü gerekir.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.services.realtime import hub
+
+USER_CHANNELS = ("orders", "positions")
+
+_INFO_KEY = "realtime_events"
+
+# Yayın görevlerine referans: event loop yalnızca zayıf referans tutar, GC bitmeden toplamasın
+_pending: set[asyncio.Task] = set()
+
+
+def user_key(user_id: int, channel: str) -> str:
+    return f"user:{user_id}:{channel}"
+
+
+def emit(db: AsyncSession, user_id: int, channel: str, payload: dict[str, Any]) -> None:
+    """Olayı commit sonrasında yayınlanmak üzere oturuma ekler (çerçeve şimdi kodlanır)."""
+    frame = json.dumps(payload, default=str)
+    db.sync_session.info.setdefault(_INFO_KEY, []).append((user_key(user_id, channel), frame))
+
+
+async def _publish_all(events: list[tuple[str, str]]) -> None:
+    for key, frame in events:
+        try:
+            await hub.publish(key, frame)
+        except Exception:
+            pass
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(_INFO_KEY, None)
+    if events:
+        task = asyncio.get_running_loop().create_task(_publish_all(events))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
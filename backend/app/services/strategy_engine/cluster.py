@@ -0,0 +1,78 @@
+"""Zamanlayıcı kümesi: düğüm üyeliği (heartbeat) ve strateji id üzerinde tutarlı hash halkası.
+
+Her düğüm yalnızca halkada kendisine düşen stratejileri değerlendirir. Düğüm eklenip çıktığında
+yalnızca ~1/N strateji el değiştirir; geçiş anındaki çakışmalar scheduler'daki advisory lock ve
+koşullu last_candle_ts güncellemesiyle engellenir.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.scheduler_node import SchedulerNode
+
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_VNODES = 64  # düğüm başına sanal nokta (dengeli dağılım için)
+
+
+def _hash(key: str) -> int:
+    """Süreçler arası sabit 64-bit hash (yerleşik hash() süreç başına tuzlanır)."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Tutarlı hash halkası: anahtar, saat yönünde ilk sanal noktanın düğümüne düşer."""
+
+    def __init__(self, nodes: list[str]) -> None:
+        points = sorted((_hash(f"{node}#{i}"), node) for node in set(nodes) for i in range(_VNODES))
+        self._keys = [p for p, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def owner(self, key: str) -> str | None:
+        if not self._keys:
+            return None
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[i]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def heartbeat(db: AsyncSession, node_id: str = NODE_ID) -> None:
+    """Düğümü kaydeder veya heartbeat'ini yeniler (çağıran commit eder)."""
+    now = _now()
+    stmt = insert(SchedulerNode).values(node_id=node_id, started_at=now, heartbeat_at=now)
+    await db.execute(
+        stmt.on_conflict_do_update(index_elements=["node_id"], set_={"heartbeat_at": now})
+    )
+
+
+async def leave(db: AsyncSession, node_id: str = NODE_ID) -> None:
+    """Kapanışta düğümü siler; stratejileri beklemeden diğer düğümlere geçer."""
+    await db.execute(delete(SchedulerNode).where(SchedulerNode.node_id == node_id))
+
+
+async def alive_nodes(db: AsyncSession) -> list[str]:
+    """Heartbeat'i zaman aşımına uğramamış düğümler; ölü kayıtlar da temizlenir."""
+    cutoff = _now() - timedelta(seconds=get_settings().scheduler_node_ttl_sec)
+    await db.execute(delete(SchedulerNode).where(SchedulerNode.heartbeat_at < cutoff))
+    result = await db.execute(select(SchedulerNode.node_id).order_by(SchedulerNode.node_id))
+    return list(result.scalars().all())
+
+
+async def current_ring(db: AsyncSession, node_id: str = NODE_ID) -> tuple[HashRing, list[str]]:
+    """Canlı düğümlerden halka; bu düğüm heartbeat yazamasa bile halkaya dahil edilir."""
+    nodes = await alive_nodes(db)
+    if node_id not in nodes:
+        nodes.append(node_id)
+    return HashRing(nodes), nodes
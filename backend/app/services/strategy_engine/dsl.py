@@ -0,0 +1,504 @@
+"""Özel strateji kural dili ("custom" tipi): params_json = {"buy": "<ifade>", "sell": "<ifade>"}.
+
+Örnek: crosses_above(ema(close, 12), ema(close, 26)) and rsi(close, 14) < 40
+
+İfade Python sözdizimiyle ayrıştırılır (ast; eval yok), yalnızca izin verilen düğümler kabul edilir
+ve paylaşılan düğümlerden oluşan bir DAG'a derlenir: aynı alt ifade (ör. ema(close, 12)) buy ve
+sell kurallarında tek düğümdür. Program geçmiş üzerinde seri seri (backtest) veya mum mum artımlı
+(canlı, düğüm başına O(1)) değerlendirilir; iki yol bit düzeyinde aynı sonucu verir. Bunun için
+ema ve rsi iki yolda da aynı adım sınıflarıyla hesaplanır, sma ise iki yolda da doğru yuvarlanmış
+tam pencere toplamıyla (kernels.exact_sma / to_fixed): son bitteki yuvarlama farkı bile
+crosses_above ve karşılaştırmaları eşitlikte çevirir.
+Derlenmiş programlar strateji id'si + parametre özeti ile önbelleğe alınır.
+
+Seriler: open, high, low, close, volume. Fonksiyonlar: sma(x, n), ema(x, n), rsi(x, n),
+highest(x, n), lowest(x, n), prev(x[, n]), crosses_above(a, b), crosses_below(a, b).
+Operatörler: + - * / , < <= > >= == != , and or not. rsi Wilder yumuşatmalıdır (grafikteki RSI).
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import math
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.indicators import kernels
+
+SOURCES = ("open", "high", "low", "close", "volume")
+_SOURCE_INDEX = {name: i + 1 for i, name in enumerate(SOURCES)}  # ccxt mum sütunu
+
+# Pencere fonksiyonları ve periyot varsayılanı (None: periyot zorunlu)
+_WINDOW_FUNCS = {"sma": None, "ema": None, "rsi": 14, "highest": None, "lowest": None, "prev": 1}
+_CROSS_FUNCS = ("crosses_above", "crosses_below")
+
+_BIN_OPS = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div"}
+_CMP_OPS = {ast.Lt: "lt", ast.LtE: "le", ast.Gt: "gt", ast.GtE: "ge", ast.Eq: "eq", ast.NotEq: "ne"}
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_NODES = 200
+MAX_PERIOD = 5000
+_CACHE_SIZE = 1024
+
+BUY = 1
+SELL = -1
+
+
+@dataclass(frozen=True)
+class Node:
+    op: str
+    args: tuple[int, ...]  # alt düğüm indeksleri (program.nodes içinde, topolojik sırada)
+    param: Any  # kaynak adı / sabit / periyot
+    kind: str  # "num" | "bool"
+
+
+class _Compiler:
+    """ast -> paylaşılan düğüm listesi (aynı (op, args, param) tek düğüm)."""
+
+    def __init__(self) -> None:
+        self.nodes: list[Node] = []
+        self._index: dict[tuple, int] = {}
+
+    def _add(self, op: str, args: tuple[int, ...], param: Any, kind: str) -> int:
+        key = (op, args, param)
+        idx = self._index.get(key)
+        if idx is None:
+            if len(self.nodes) >= MAX_NODES:
+                raise ValueError(f"Kural çok büyük (en fazla {MAX_NODES} düğüm)")
+            idx = self._index[key] = len(self.nodes)
+            self.nodes.append(Node(op, args, param, kind))
+        return idx
+
+    def _expect(self, idx: int, kind: str, what: str) -> int:
+        if self.nodes[idx].kind != kind:
+            expected = "sayısal" if kind == "num" else "mantıksal (koşul)"
+            raise ValueError(f"{what} {expected} bir ifade bekliyor")
+        return idx
+
+    def compile(self, text: str) -> int:
+        if len(text) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"Kural çok uzun (en fazla {MAX_EXPRESSION_LENGTH} karakter)")
+        try:
+            tree = ast.parse(text, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Sözdizimi hatası: {e.msg} (sütun {e.offset})") from None
+        return self._expect(self.visit(tree.body), "bool", "Kural")
+
+    def visit(self, node: ast.AST) -> int:
+        if isinstance(node, ast.Name):
+            if node.id not in SOURCES:
+                raise ValueError(f"Bilinmeyen seri: {node.id} (kullanılabilir: {', '.join(SOURCES)})")
+            return self._add("src", (), node.id, "num")
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return self._add("const", (), float(node.value), "num")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = node.operand
+            if isinstance(operand, ast.Constant) and type(operand.value) in (int, float):
+                return self._add("const", (), -float(operand.value), "num")
+            return self._add("neg", (self._expect(self.visit(operand), "num", "-"),), None, "num")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return self._add("not", (self._expect(self.visit(node.operand), "bool", "not"),), None, "bool")
+        if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+            op = _BIN_OPS[type(node.op)]
+            args = (self._expect(self.visit(node.left), "num", op), self._expect(self.visit(node.right), "num", op))
+            return self._add(op, args, None, "num")
+        if isinstance(node, ast.BoolOp):
+            op = "and" if isinstance(node.op, ast.And) else "or"
+            idx = self._expect(self.visit(node.values[0]), "bool", op)
+            for value in node.values[1:]:
+                idx = self._add(op, (idx, self._expect(self.visit(value), "bool", op)), None, "bool")
+            return idx
+        if isinstance(node, ast.Compare):
+            # a < b < c -> (a < b) and (b < c)
+            left = self._expect(self.visit(node.left), "num", "Karşılaştırma")
+            result = None
+            for op, comparator in zip(node.ops, node.comparators):
+                if type(op) not in _CMP_OPS:
+                    raise ValueError("Desteklenmeyen karşılaştırma")
+                right = self._expect(self.visit(comparator), "num", "Karşılaştırma")
+                cmp = self._add(_CMP_OPS[type(op)], (left, right), None, "bool")
+                result = cmp if result is None else self._add("and", (result, cmp), None, "bool")
+                left = right
+            return result
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            return self._call(node)
+        raise ValueError(f"Desteklenmeyen ifade: {ast.unparse(node)}")
+
+    def _call(self, node: ast.Call) -> int:
+        name = node.func.id
+        if node.keywords:
+            raise ValueError(f"{name}: yalnızca konumsal argüman kullanılabilir")
+        if name in _CROSS_FUNCS:
+            if len(node.args) != 2:
+                raise ValueError(f"{name}(a, b) iki argüman alır")
+            args = tuple(self._expect(self.visit(a), "num", name) for a in node.args)
+            return self._add(name, args, None, "bool")
+        if name not in _WINDOW_FUNCS:
+            raise ValueError(f"Bilinmeyen fonksiyon: {name}")
+        default = _WINDOW_FUNCS[name]
+        if not 1 <= len(node.args) <= 2 or (len(node.args) == 1 and default is None):
+            raise ValueError(f"{name}(x, n) kullanımı bekleniyor")
+        series = self._expect(self.visit(node.args[0]), "num", name)
+        period = default
+        if len(node.args) == 2:
+            arg = node.args[1]
+            if not (isinstance(arg, ast.Constant) and type(arg.value) is int):
+                raise ValueError(f"{name}: periyot tam sayı sabit olmalı")
+            period = arg.value
+        if not 1 <= period <= MAX_PERIOD:
+            raise ValueError(f"{name}: periyot 1 ile {MAX_PERIOD} arasında olmalı")
+        return self._add(name, (series,), period, "num")
+
+
+@dataclass(frozen=True)
+class Program:
+    nodes: tuple[Node, ...]
+    buy: int | None
+    sell: int | None
+
+    @property
+    def lookback(self) -> int:
+        """Kuralların geriye baktığı en uzun mum sayısı (zincirlenmiş periyotlar toplanır)."""
+        depth: list[int] = []
+        for node in self.nodes:
+            own = node.param if node.op in _WINDOW_FUNCS else 1 if node.op in _CROSS_FUNCS else 0
+            depth.append(own + max((depth[a] for a in node.args), default=0))
+        return max((depth[i] for i in (self.buy, self.sell) if i is not None), default=0)
+
+    # --- Vektörel değerlendirme (geçmiş) ---
+
+    def evaluate(self, columns: dict[str, np.ndarray]) -> list[np.ndarray]:
+        n = len(columns["close"])
+        values: list[np.ndarray] = []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for node in self.nodes:
+                values.append(_vector(node, [values[a] for a in node.args], columns, n))
+        return values
+
+    def signals(self, columns: dict[str, np.ndarray]) -> np.ndarray:
+        """out[i]: i. mumdaki sinyal (1 al, -1 sat, 0 yok); buy önceliklidir."""
+        values = self.evaluate(columns)
+        n = len(columns["close"])
+        buy = values[self.buy] if self.buy is not None else np.zeros(n, dtype=bool)
+        sell = values[self.sell] if self.sell is not None else np.zeros(n, dtype=bool)
+        out = np.zeros(n, dtype=np.int8)
+        out[buy] = BUY
+        out[sell & ~buy] = SELL
+        return out
+
+
+def _shift(x: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if k < len(x):
+        out[k:] = x[: len(x) - k]
+    return out
+
+
+def _rolling(x: np.ndarray, period: int, reduce: Callable[..., np.ndarray]) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        out[period - 1:] = reduce(sliding_window_view(x, period), axis=-1)
+    return out
+
+
+def _scan(state: Any, x: np.ndarray) -> np.ndarray:
+    """Artımlı adım sınıfını seri boyunca koşturur (canlı yolla aynı aritmetik)."""
+    return np.fromiter(map(state.step, x.tolist()), dtype=np.float64, count=len(x))
+
+
+def _vector(node: Node, args: list[np.ndarray], columns: dict[str, np.ndarray], n: int) -> np.ndarray:
+    op = node.op
+    if op == "src":
+        if node.param not in columns:
+            raise ValueError(f"Mum verisinde {node.param} sütunu yok")
+        return np.asarray(columns[node.param], dtype=np.float64)
+    if op == "const":
+        return np.full(n, node.param)
+    if op == "sma":
+        return kernels.exact_sma(args[0], node.param)
+    if op == "ema":
+        return _scan(_Ema(2.0 / (node.param + 1)), args[0])
+    if op == "rsi":
+        return _scan(_Rsi(node.param), args[0])
+    if op == "highest":
+        return _rolling(args[0], node.param, np.max)
+    if op == "lowest":
+        return _rolling(args[0], node.param, np.min)
+    if op == "prev":
+        return _shift(args[0], node.param)
+    if op == "neg":
+        return -args[0]
+    if op == "add":
+        return args[0] + args[1]
+    if op == "sub":
+        return args[0] - args[1]
+    if op == "mul":
+        return args[0] * args[1]
+    if op == "div":
+        return np.where(args[1] == 0, np.nan, args[0] / args[1])
+    if op == "lt":
+        return args[0] < args[1]
+    if op == "le":
+        return args[0] <= args[1]
+    if op == "gt":
+        return args[0] > args[1]
+    if op == "ge":
+        return args[0] >= args[1]
+    if op == "eq":
+        return args[0] == args[1]
+    if op == "ne":
+        return args[0] != args[1]
+    if op == "and":
+        return args[0] & args[1]
+    if op == "or":
+        return args[0] | args[1]
+    if op == "not":
+        return ~args[0]
+    a, b = args
+    prev_a, prev_b = _shift(a, 1), _shift(b, 1)
+    if op == "crosses_above":
+        return (prev_a <= prev_b) & (a > b)
+    return (prev_a >= prev_b) & (a < b)
+
+
+# --- Artımlı değerlendirme (canlı): düğüm başına durum, mum başına O(1) ---
+
+_NAN = float("nan")
+
+
+class _Ema:
+    """kernels.ema gibi: ilk geçerli değerden başlar, NaN girdide önceki değer korunur."""
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+        self.value = _NAN
+
+    def step(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        self.value = x if math.isnan(self.value) else (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class _Rsi:
+    def __init__(self, period: int) -> None:
+        self.gain, self.loss = _Ema(1.0 / period), _Ema(1.0 / period)
+        self.prev = _NAN
+
+    def step(self, x: float) -> float:
+        if math.isnan(x):
+            gain = loss = _NAN
+        else:
+            delta = x - self.prev  # önceki NaN ise fark NaN: kazanç/kayıp 0
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+        self.prev = x
+        avg_gain, avg_loss = self.gain.step(gain), self.loss.step(loss)
+        if math.isnan(avg_loss) or avg_loss == 0:
+            return _NAN
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class _Sma:
+    """Son `period` değerin ortalaması; pencerede NaN/sonsuz varsa NaN.
+
+    Toplam tam tamsayı (kernels.to_fixed) olarak kayar: ekleme/çıkarma yuvarlamasız, O(1); değer
+    doğru yuvarlanmış pencere toplamı / period (math.fsum ile aynı).
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.values: deque[int | None] = deque()  # None: NaN / sonsuz
+        self.missing = 0
+        self.total = 0
+
+    def step(self, x: float) -> float:
+        if math.isfinite(x):
+            fixed = kernels.to_fixed(x)
+            self.total += fixed
+        else:
+            fixed = None
+            self.missing += 1
+        self.values.append(fixed)
+        if len(self.values) > self.period:
+            old = self.values.popleft()
+            if old is None:
+                self.missing -= 1
+            else:
+                self.total -= old
+        if len(self.values) < self.period or self.missing:
+            return _NAN
+        return kernels.from_fixed(self.total) / self.period
+
+
+class _Window:
+    """Son `period` değerin en büyüğü/küçüğü (monoton kuyruk); pencerede NaN varsa NaN."""
+
+    def __init__(self, op: str, period: int) -> None:
+        self.op, self.period = op, period
+        self.values: deque[float] = deque()
+        self.nans = 0
+        self._mono: deque[tuple[int, float]] = deque()  # (sıra, değer)
+        self._i = 0
+
+    def step(self, x: float) -> float:
+        nan = math.isnan(x)
+        self.values.append(x)
+        self.nans += nan
+        if len(self.values) > self.period and math.isnan(self.values.popleft()):
+            self.nans -= 1
+        if not nan:
+            better = (lambda v: v <= x) if self.op == "highest" else (lambda v: v >= x)
+            while self._mono and better(self._mono[-1][1]):
+                self._mono.pop()
+            self._mono.append((self._i, x))
+        while self._mono and self._mono[0][0] <= self._i - self.period:
+            self._mono.popleft()
+        self._i += 1
+        if len(self.values) < self.period or self.nans:
+            return _NAN
+        return self._mono[0][1]
+
+
+class _Prev:
+    def __init__(self, period: int) -> None:
+        self.values: deque[float] = deque(maxlen=period + 1)
+
+    def step(self, x: float) -> float:
+        self.values.append(x)
+        return self.values[0] if len(self.values) == self.values.maxlen else _NAN
+
+
+class _Cross:
+    def __init__(self, above: bool) -> None:
+        self.above = above
+        self.prev = (_NAN, _NAN)
+
+    def step(self, a: float, b: float) -> bool:
+        pa, pb = self.prev
+        self.prev = (a, b)
+        return (pa <= pb and a > b) if self.above else (pa >= pb and a < b)
+
+
+def _div(a: float, b: float) -> float:
+    return _NAN if b == 0 else a / b
+
+
+_SCALAR_OPS: dict[str, Callable[..., Any]] = {
+    "neg": lambda a: -a,
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div": _div,
+    "lt": lambda a, b: a < b,
+    "le": lambda a, b: a <= b,
+    "gt": lambda a, b: a > b,
+    "ge": lambda a, b: a >= b,
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+    "not": lambda a: not a,
+}
+
+
+class IncrementalProgram:
+    """Programın canlı durumu; step(candle) tüm düğümleri bir mum ilerletir."""
+
+    def __init__(self, program: Program) -> None:
+        self.program = program
+        self._steps: list[Callable[[list, list], Any]] = [self._make_step(n) for n in program.nodes]
+
+    @staticmethod
+    def _make_step(node: Node) -> Callable[[list, list], Any]:
+        args = node.args
+        op = node.op
+        if op == "src":
+            col = _SOURCE_INDEX[node.param]
+            return lambda candle, v: float(candle[col]) if len(candle) > col and candle[col] is not None else _NAN
+        if op == "const":
+            value = node.param
+            return lambda candle, v: value
+        state: Any
+        if op == "ema":
+            state = _Ema(2.0 / (node.param + 1))
+        elif op == "rsi":
+            state = _Rsi(node.param)
+        elif op == "sma":
+            state = _Sma(node.param)
+        elif op in ("highest", "lowest"):
+            state = _Window(op, node.param)
+        elif op == "prev":
+            state = _Prev(node.param)
+        elif op in _CROSS_FUNCS:
+            state = _Cross(op == "crosses_above")
+            a, b = args
+            return lambda candle, v: state.step(v[a], v[b])
+        else:
+            fn = _SCALAR_OPS[op]
+            if len(args) == 1:
+                (a,) = args
+                return lambda candle, v: fn(v[a])
+            a, b = args
+            return lambda candle, v: fn(v[a], v[b])
+        (a,) = args
+        return lambda candle, v: state.step(v[a])
+
+    def step(self, candle: list) -> str | None:
+        values: list[Any] = []
+        for step in self._steps:
+            values.append(step(candle, values))
+        program = self.program
+        if program.buy is not None and values[program.buy]:
+            return "buy"
+        if program.sell is not None and values[program.sell]:
+            return "sell"
+        return None
+
+
+# --- Derleme ve önbellek ---
+
+
+def compile_rules(params: dict[str, Any]) -> Program:
+    """{"buy": ..., "sell": ...} kurallarını tek programa derler (ortak düğümler paylaşılır)."""
+    compiler = _Compiler()
+    outputs: dict[str, int | None] = {}
+    for side in ("buy", "sell"):
+        text = params.get(side)
+        if text is None or (isinstance(text, str) and not text.strip()):
+            outputs[side] = None
+            continue
+        if not isinstance(text, str):
+            raise ValueError(f"{side} kuralı metin olmalı")
+        try:
+            outputs[side] = compiler.compile(text)
+        except ValueError as e:
+            raise ValueError(f"{side}: {e}") from None
+    if outputs["buy"] is None and outputs["sell"] is None:
+        raise ValueError("En az bir kural gerekli: buy veya sell")
+    return Program(tuple(compiler.nodes), outputs["buy"], outputs["sell"])
+
+
+_programs: OrderedDict[tuple[int | None, str], Program] = OrderedDict()
+
+
+def get_program(params: dict[str, Any] | str | None, strategy_id: int | None = None) -> Program:
+    """Derlenmiş program; (strateji id, parametre özeti) ile önbellekten. Geçersiz kuralda ValueError."""
+    if isinstance(params, str) or params is None:
+        params = json.loads(params) if params else {}
+    digest = hashlib.blake2b(json.dumps(params, sort_keys=True).encode(), digest_size=16).hexdigest()
+    key = (strategy_id, digest)
+    program = _programs.get(key)
+    if program is None:
+        program = _programs[key] = compile_rules(params)
+        while len(_programs) > _CACHE_SIZE:
+            _programs.popitem(last=False)
+    else:
+        _programs.move_to_end(key)
+    return program
@@ -0,0 +1,240 @@
+"""Durumlu sinyal değerlendiriciler: strateji başına parametreler bir kez okunur, mumlar tek tek işlenir.
+
+signals.get_signal ile aynı 'buy' | 'sell' | None sözleşmesi: update(candle) o mum dahil tüm
+geçmiş için get_signal'ın döneceği sinyali verir. Pencere toplamları tam tamsayı olarak kayar
+(mum başına O(1)); get_signal'ın sum() toplamı tam toplamdan en çok bilinen bir yuvarlama payı
+kadar ayrılabildiğinden karar, tam değer bir eşitlik sınırına bu paydan yakın olmadıkça tam
+toplamla verilir, yakınsa pencere sum() ile toplanır (bit düzeyinde aynı sinyal). Zamanlayıcı
+(canlı) ve backtest (geçmiş) aynı kodu sürer.
+"""
+from __future__ import annotations
+
+import json
+import math
+from collections import deque
+from typing import Any
+
+from app.services.indicators import kernels
+from app.services.strategy_engine import dsl
+
+_ULP_SHIFT = 53  # sum() ve bölme yuvarlaması: göreli en çok 2^-53
+_UNSURE = object()  # tam değer eşiğe yuvarlama payından yakın: karar sum() ile
+
+
+class _RollingSum:
+    """Son `period` değer (daha az değer varsa tümü): tam toplam ve mutlak değer toplamı O(1).
+
+    exact / magnitude kernels.to_fixed biriminde tamsayılardır. total, get_signal'daki gibi
+    yerleşik sum() ile alınır (O(period)) ve yalnızca eşitlik sınırına yakın kararlarda kullanılır.
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.window: deque[float] = deque(maxlen=period)
+        self._fixed: deque[int] = deque()
+        self.exact = 0
+        self.magnitude = 0
+        self.non_finite = 0  # NaN / sonsuz: tam toplam tanımsız, karar sum() ile
+
+    def push(self, x: float) -> None:
+        if len(self.window) == self.period:
+            old = self._fixed.popleft()
+            if old is None:
+                self.non_finite -= 1
+            else:
+                self.exact -= old
+                self.magnitude -= abs(old)
+        self.window.append(x)
+        if math.isfinite(x):
+            fixed = kernels.to_fixed(x)
+            self.exact += fixed
+            self.magnitude += abs(fixed)
+        else:
+            fixed = None
+            self.non_finite += 1
+        self._fixed.append(fixed)
+
+    @property
+    def error(self) -> int:
+        """|sum(window) - exact| için üst sınır (to_fixed biriminde): (k + 2) * 2^-53 * Σ|x|."""
+        return ((len(self.window) + 2) * self.magnitude >> _ULP_SHIFT) + 1
+
+    @property
+    def total(self) -> float:
+        return sum(self.window)
+
+
+def _ma_order(a: _RollingSum, period_a: int, b: _RollingSum, period_b: int) -> int | None:
+    """get_signal'daki a.total / period_a ile b.total / period_b karşılaştırması: -1, 0, 1 (NaN: None).
+
+    Tam farkın iki ortalamanın yuvarlama payından büyük olduğu (neredeyse her) durumda O(1).
+    """
+    if not a.non_finite and not b.non_finite:
+        diff = a.exact * period_b - b.exact * period_a
+        margin = (
+            (a.error + ((a.magnitude + a.error) >> _ULP_SHIFT) + 1) * period_b
+            + (b.error + ((b.magnitude + b.error) >> _ULP_SHIFT) + 1) * period_a
+            + period_a * period_b  # alt-normal bölme
+        )
+        if abs(diff) > margin:
+            return 1 if diff > 0 else -1
+    x, y = a.total / period_a, b.total / period_b
+    if x > y:
+        return 1
+    if x < y:
+        return -1
+    return 0 if x == y else None
+
+
+class SignalEvaluator:
+    """Bilinmeyen strateji tipleri için temel sınıf: sinyal üretmez (get_signal gibi None)."""
+
+    def __init__(self, params: dict[str, Any]) -> None:
+        self.params = params
+        self.last_ts: int | None = None
+        self.count = 0  # işlenen mum sayısı
+
+    def update(self, candle: list) -> str | None:
+        """Yeni kapanmış mumu işler; ts son işlenenden eski/eşitse yok sayılır (None)."""
+        ts = candle[0]
+        if self.last_ts is not None and ts <= self.last_ts:
+            return None
+        self.last_ts = ts
+        self.count += 1
+        return self._step(candle)
+
+    def _step(self, candle: list) -> str | None:
+        return None
+
+
+def _period(params: dict[str, Any], key: str, default: int) -> int:
+    value = int(params.get(key, default))
+    if value < 1:
+        raise ValueError(f"{key} en az 1 olmalı")
+    return value
+
+
+class MaCrossEvaluator(SignalEvaluator):
+    """signals.ma_cross_signal: kısa MA uzun MA'yı yukarı keserse buy, aşağı keserse sell."""
+
+    def __init__(self, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        self.short_period = _period(params, "short_period", 10)
+        self.long_period = _period(params, "long_period", 20)
+        self._short = _RollingSum(self.short_period)
+        self._long = _RollingSum(self.long_period)
+
+    def _step(self, candle: list) -> str | None:
+        close = float(candle[4])
+        ready = self.count >= 2 and self.count >= self.long_period
+        prev = _ma_order(self._short, self.short_period, self._long, self.long_period) if ready else None
+        self._short.push(close)
+        self._long.push(close)
+        if not ready:
+            return None
+        now = _ma_order(self._short, self.short_period, self._long, self.long_period)
+        if prev is None or now is None:
+            return None
+        if prev <= 0 and now > 0:
+            return "buy"
+        if prev >= 0 and now < 0:
+            return "sell"
+        return None
+
+
+class RsiEvaluator(SignalEvaluator):
+    """signals.rsi_signal: son `rsi_period` farkın ortalama kazanç/kaybıyla RSI eşikleri."""
+
+    def __init__(self, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        self.period = _period(params, "rsi_period", 14)
+        self.oversold = float(params.get("oversold", 30))
+        self.overbought = float(params.get("overbought", 70))
+        self._gains = _RollingSum(self.period)
+        self._losses = _RollingSum(self.period)
+        self._prev_close: float | None = None
+
+    @property
+    def rsi(self) -> float | None:
+        if self.count < self.period + 1:
+            return None
+        avg_loss = self._losses.total / self.period
+        if avg_loss == 0:
+            return 100.0
+        rs = (self._gains.total / self.period) / avg_loss
+        return 100.0 - (100.0 / (1.0 + rs))
+
+    def _zone(self) -> Any:
+        """Tam toplamlardan rsi kararı ('buy' / 'sell' / None); eşiğe yuvarlama payından yakınsa _UNSURE."""
+        gains, losses = self._gains, self._losses
+        if gains.non_finite or losses.non_finite:
+            return _UNSURE
+        g, loss = gains.exact, losses.exact
+        if loss == 0:
+            rsi = 100.0  # kayıpların sum()'ı da tam 0 (negatif olmayan değerler)
+            margin = 0.0
+        elif loss < self.period << 64:
+            return _UNSURE  # avg_loss alt taşabilir
+        else:
+            rsi = 100 * g / (g + loss)
+            margin = 100 * (4 * self.period + 40) * 2.0**-_ULP_SHIFT
+        if rsi + margin <= self.oversold:
+            return "buy"
+        if rsi - margin > self.oversold:
+            if rsi - margin >= self.overbought:
+                return "sell"
+            if rsi + margin < self.overbought:
+                return None
+        return _UNSURE
+
+    def _step(self, candle: list) -> str | None:
+        close = float(candle[4])
+        if self._prev_close is not None:
+            diff = close - self._prev_close
+            self._gains.push(max(diff, 0))
+            self._losses.push(max(-diff, 0))
+        self._prev_close = close
+        if self.count < 2 or self.count < self.period + 1:
+            return None
+        zone = self._zone()
+        if zone is not _UNSURE:
+            return zone
+        rsi = self.rsi
+        if rsi <= self.oversold:
+            return "buy"
+        if rsi >= self.overbought:
+            return "sell"
+        return None
+
+
+class CustomEvaluator(SignalEvaluator):
+    """Kural dili (dsl) stratejisi; derlenmiş program strateji id'si + parametre özetiyle önbellekte."""
+
+    def __init__(self, params: dict[str, Any], strategy_id: int | None = None) -> None:
+        super().__init__(params)
+        self.program = dsl.IncrementalProgram(dsl.get_program(params, strategy_id))
+
+    def _step(self, candle: list) -> str | None:
+        return self.program.step(candle)
+
+
+_EVALUATORS: dict[str, type[SignalEvaluator]] = {
+    "ma_cross": MaCrossEvaluator,
+    "rsi": RsiEvaluator,
+}
+
+
+def make_evaluator(
+    strategy_type: str, params: dict[str, Any] | str | None, strategy_id: int | None = None
+) -> SignalEvaluator:
+    """Strateji tipi için değerlendirici; params JSON metni veya dict. Geçersiz parametrede ValueError."""
+    if isinstance(params, str) or params is None:
+        params = json.loads(params) if params else {}
+    if strategy_type == "custom":
+        return CustomEvaluator(params, strategy_id)
+    return _EVALUATORS.get(strategy_type, SignalEvaluator)(params)
+
+
+def signal_series(evaluator: SignalEvaluator, candles: list[list]) -> list[str | None]:
+    """Mumları sırayla işler; her mum için sinyal (backtest / tohumlama)."""
+    return [evaluator.update(c) for c in candles]
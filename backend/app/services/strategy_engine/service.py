@@ -8,6 +8,19 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.strategy import Strategy
+from app.services.market_data.candle_store import valid_timeframe
+from app.services.strategy_engine import dsl
+
+
+def _rule_error(strategy_type: str, params: dict) -> str | None:
+    """custom tipinde kuralları derler; hata varsa mesajı döner."""
+    if strategy_type != "custom":
+        return None
+    try:
+        dsl.compile_rules(params)
+    except ValueError as e:
+        return f"Geçersiz kural: {e}"
+    return None
 
 
 async def list_strategies(db: AsyncSession, user_id: int) -> dict[str, Any]:
@@ -23,6 +36,7 @@ async def list_strategies(db: AsyncSession, user_id: int) -> dict[str, Any]:
                 "params": json.loads(s.params_json) if s.params_json else {},
                 "symbol": s.symbol,
                 "exchange": s.exchange,
+                "timeframe": s.timeframe,
                 "mode": s.mode,
                 "is_active": s.is_active,
                 "ml_model_id": s.ml_model_id,
@@ -44,6 +58,7 @@ async def get_strategy(db: AsyncSession, strategy_id: int, user_id: int) -> dict
         "params": json.loads(strategy.params_json) if strategy.params_json else {},
         "symbol": strategy.symbol,
         "exchange": strategy.exchange,
+        "timeframe": strategy.timeframe,
         "mode": strategy.mode,
         "is_active": strategy.is_active,
         "ml_model_id": strategy.ml_model_id,
@@ -61,7 +76,13 @@ async def create_strategy(
     exchange: str,
     mode: str,
     ml_model_id: int | None = None,
+    timeframe: str = "1h",
 ) -> dict[str, Any]:
+    if not valid_timeframe(timeframe, exchange):
+        return {"ok": False, "hata": f"Geçersiz zaman dilimi: {timeframe}"}
+    rule_error = _rule_error(strategy_type, params)
+    if rule_error:
+        return {"ok": False, "hata": rule_error}
     params_json = json.dumps(params)
     strategy = Strategy(
         user_id=user_id,
@@ -70,6 +91,7 @@ async def create_strategy(
         params_json=params_json,
         symbol=symbol,
         exchange=exchange,
+        timeframe=timeframe,
         mode=mode,
         is_active=False,
         ml_model_id=ml_model_id,
@@ -105,14 +127,25 @@ async def update_strategy(
     user_id: int,
     ml_model_id: int | None = None,
     params: dict | None = None,
+    timeframe: str | None = None,
 ) -> dict[str, Any]:
     strategy = await db.get(Strategy, strategy_id)
     if not strategy or strategy.user_id != user_id:
         return {"ok": False, "hata": "Strateji bulunamadı"}
+    if timeframe is not None and not valid_timeframe(timeframe, strategy.exchange):
+        return {"ok": False, "hata": f"Geçersiz zaman dilimi: {timeframe}"}
+    rule_error = _rule_error(strategy.type, params) if params is not None else None
+    if rule_error:
+        return {"ok": False, "hata": rule_error}
     if ml_model_id is not None:
         strategy.ml_model_id = ml_model_id
     if params is not None:
         strategy.params_json = json.dumps(params)
+    if timeframe is not None:
+        strategy.timeframe = timeframe
+    if ml_model_id is not None or params is not None or timeframe is not None:
+        # Girdiler değişti: zamanlayıcı son kapanmış mumu yeniden değerlendirsin
+        strategy.last_candle_ts = None
     return {"ok": True, "mesaj": "Strateji güncellendi."}
 
 
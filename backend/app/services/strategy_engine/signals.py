@@ -1,8 +1,10 @@
-"""Strateji sinyalleri: MA cross, RSI vb. (saf fonksiyonlar)."""
+"""Strateji sinyalleri: MA cross, RSI, özel kurallar (dsl) (saf fonksiyonlar)."""
 from typing import Any
 
 import json
 
+from app.services.strategy_engine import dsl
+
 
 def _compute_rsi(closes: list[float], period: int = 14) -> float | None:
     """RSI hesaplar. En az period+1 close gerekir."""
@@ -59,6 +61,15 @@ def ma_cross_signal(candles: list[list], params: dict[str, Any]) -> str | None:
     return None
 
 
+def custom_signal(candles: list[list], params: dict[str, Any]) -> str | None:
+    """Kural dili (dsl) stratejisi: program mumlar üzerinde baştan çalıştırılır, son mumun sinyali."""
+    program = dsl.IncrementalProgram(dsl.get_program(params))
+    signal = None
+    for c in candles:
+        signal = program.step(c)
+    return signal
+
+
 def get_signal(strategy_type: str, candles: list[list], params_json: str) -> str | None:
     """Strateji tipine göre sinyal döner."""
     params = json.loads(params_json) if params_json else {}
@@ -66,4 +77,6 @@ def get_signal(strategy_type: str, candles: list[list], params_json: str) -> str
         return ma_cross_signal(candles, params)
     if strategy_type == "rsi":
         return rsi_signal(candles, params)
+    if strategy_type == "custom":
+        return custom_signal(candles, params)
     return None
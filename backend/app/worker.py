@@ -0,0 +1,222 @@
+"""İş işçisi: jobs tablosundan iş sahiplenir, backtest / tarama / walk-forward / ML eğitimini çalıştırır.
+
+Çalıştırma: python -m app.worker (API'den ayrı süreç; birden çok kopya çalışabilir).
+"""
+import asyncio
+import json
+import os
+import socket
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import app.models  # noqa: F401 - register all ORM models
+from app.config import get_settings
+from app.core.database import async_session_factory
+from app.services.backtest import service as backtest_service
+from app.services.backtest import sweep as backtest_sweep
+from app.services.jobs import service as jobs_service
+from app.services.market_data import cache as market_cache
+from app.services.market_data import exchanges
+from app.services.market_data.providers import twelvedata
+from app.services.ml import service as ml_service
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# job_id -> (done, total): sync ilerleme callback'leri buraya yazar, heartbeat döngüsü DB'ye taşır
+_progress: dict[int, tuple[int, int | None]] = {}
+
+
+def _dt(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+async def _dispatch(db, job_id: int, user_id: int, kind: str, p: dict[str, Any]) -> dict[str, Any]:
+    if kind == "backtest":
+        return await backtest_service.run_backtest(
+            db=db,
+            user_id=user_id,
+            strategy_id=p["strategy_id"],
+            symbol=p["symbol"],
+            exchange=p["exchange"],
+            timeframe=p["timeframe"],
+            start_ts=_dt(p["start_ts"]),
+            end_ts=_dt(p["end_ts"]),
+            initial_balance=Decimal(str(p["initial_balance"])),
+            execution=p.get("execution"),
+        )
+    if kind == "sweep":
+        def _on_progress(done: int, total: int) -> None:
+            _progress[job_id] = (done, total)
+
+        return await backtest_service.run_sweep(
+            db=db,
+            user_id=user_id,
+            strategy_id=p["strategy_id"],
+            symbol=p["symbol"],
+            exchange=p["exchange"],
+            timeframe=p["timeframe"],
+            start_ts=_dt(p["start_ts"]),
+            end_ts=_dt(p["end_ts"]),
+            param_ranges=p["param_ranges"],
+            initial_balance=Decimal(str(p["initial_balance"])),
+            sort_by=p.get("sort_by", "total_return_pct"),
+            top=p.get("top", 50),
+            on_progress=_on_progress,
+            execution=p.get("execution"),
+        )
+    if kind == "walkforward":
+        def _on_window(done: int, total: int) -> None:
+            _progress[job_id] = (done, total)
+
+        return await backtest_service.run_walkforward(
+            db=db,
+            user_id=user_id,
+            strategy_id=p["strategy_id"],
+            symbol=p["symbol"],
+            exchange=p["exchange"],
+            timeframe=p["timeframe"],
+            start_ts=_dt(p["start_ts"]),
+            end_ts=_dt(p["end_ts"]),
+            train_bars=p["train_bars"],
+            test_bars=p["test_bars"],
+            anchored=p.get("anchored", False),
+            param_ranges=p.get("param_ranges"),
+            initial_balance=Decimal(str(p["initial_balance"])),
+            sort_by=p.get("sort_by", "total_return_pct"),
+            on_progress=_on_window,
+            execution=p.get("execution"),
+        )
+    if kind == "portfolio":
+        def _on_leg(done: int, total: int) -> None:
+            _progress[job_id] = (done, total)
+
+        return await backtest_service.run_portfolio_backtest(
+            db=db,
+            user_id=user_id,
+            legs=p["legs"],
+            timeframe=p["timeframe"],
+            start_ts=_dt(p["start_ts"]),
+            end_ts=_dt(p["end_ts"]),
+            initial_balance=Decimal(str(p["initial_balance"])),
+            execution=p.get("execution"),
+            risk_limits=p.get("risk_limits"),
+            on_progress=_on_leg,
+        )
+    if kind == "train":
+        return await ml_service.train_from_ohlcv(
+            db=db,
+            user_id=user_id,
+            symbol=p["symbol"],
+            exchange=p["exchange"],
+            timeframe=p["timeframe"],
+            name=p["name"],
+            version=p.get("version", "v1"),
+            start_ts=_dt(p.get("start_ts")),
+            end_ts=_dt(p.get("end_ts")),
+        )
+    return {"ok": False, "hata": f"Bilinmeyen iş türü: {kind}"}
+
+
+def _discard_artifact(result: dict[str, Any]) -> None:
+    """Kaydı yazılmayan eğitimin model dosyasını siler (dosya adı eğitim başına benzersizdir)."""
+    path = result.get("artifact_path") if isinstance(result, dict) else None
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def _execute(job_id: int, user_id: int, kind: str, payload: dict[str, Any]) -> None:
+    """İşi kendi oturumunda çalıştırır; sonuç ve iş kaydı aynı transaction'da yazılır.
+
+    İş bu arada başka işçiye geçtiyse (finish_job False) transaction geri alınır; sonuç tek kez kalır.
+    """
+    try:
+        async with async_session_factory() as db:
+            try:
+                result = await _dispatch(db, job_id, user_id, kind, payload)
+                if await jobs_service.finish_job(db, job_id, WORKER_ID, result):
+                    await db.commit()
+                else:
+                    await db.rollback()
+                    _discard_artifact(result)
+                return
+            except Exception as e:
+                await db.rollback()
+                error = f"İş hatası: {e!s}"
+        async with async_session_factory() as db:
+            await jobs_service.finish_job(db, job_id, WORKER_ID, None, error)
+            await db.commit()
+    finally:
+        _progress.pop(job_id, None)
+
+
+async def _heartbeat_loop(running: dict[int, asyncio.Task]) -> None:
+    """Çalışan işlerin heartbeat'ini ve ilerlemesini periyodik olarak yazar."""
+    interval = get_settings().jobs_heartbeat_sec
+    while True:
+        await asyncio.sleep(interval)
+        if not running:
+            continue
+        try:
+            async with async_session_factory() as db:
+                await jobs_service.heartbeat(db, list(running), WORKER_ID)
+                for job_id, (done, total) in list(_progress.items()):
+                    await jobs_service.set_progress(db, job_id, WORKER_ID, done, total)
+                await db.commit()
+        except Exception:
+            continue
+
+
+async def worker_loop() -> None:
+    """Sonsuz döngü: eşzamanlılık limiti kadar iş sahiplen ve çalıştır."""
+    settings = get_settings()
+    slots = asyncio.Semaphore(settings.jobs_worker_concurrency)
+    running: dict[int, asyncio.Task] = {}
+    heartbeat_task = asyncio.create_task(_heartbeat_loop(running))
+    try:
+        while True:
+            await slots.acquire()
+            claimed: tuple[int, int, str, dict[str, Any]] | None = None
+            try:
+                async with async_session_factory() as db:
+                    await jobs_service.requeue_stale(db)
+                    job = await jobs_service.claim_next(db, WORKER_ID)
+                    if job is not None:
+                        claimed = (job.id, job.user_id, job.kind, json.loads(job.payload_json))
+                    await db.commit()
+            except Exception:
+                claimed = None
+            if claimed is None:
+                slots.release()
+                await asyncio.sleep(settings.jobs_poll_interval_sec)
+                continue
+            job_id = claimed[0]
+            task = asyncio.create_task(_execute(*claimed))
+            running[job_id] = task
+
+            def _done(_t: asyncio.Task, job_id: int = job_id) -> None:
+                running.pop(job_id, None)
+                slots.release()
+
+            task.add_done_callback(_done)
+    finally:
+        heartbeat_task.cancel()
+        tasks = list(running.values())
+        for task in tasks:
+            task.cancel()
+        # İşler kapanmadan istemciler kapatılmasın
+        await asyncio.gather(heartbeat_task, *tasks, return_exceptions=True)
+        backtest_sweep.shutdown_pool()
+        await exchanges.close_all()
+        await twelvedata.close_client()
+        await market_cache.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(worker_loop())
+    except KeyboardInterrupt:
+        pass
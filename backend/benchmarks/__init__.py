@@ -0,0 +1 @@
+"""Performans ölçümleri: python -m benchmarks.<ad> (backend dizininden)."""
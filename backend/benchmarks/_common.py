@@ -0,0 +1,47 @@
+"""Benchmark yardımcıları: süre ölçümü, sentetik mumlar, tablo çıktısı."""
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+def best_of(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """fn'in en iyi (en kısa) çalışma süresi, saniye."""
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def random_walk(n: int, seed: int = 1) -> list[list]:
+    """Kuruşa yuvarlanmış fiyatlarla ccxt biçiminde n mum [ts, o, h, l, c, v]."""
+    rng = random.Random(seed)
+    price, out = 100.0, []
+    for i in range(n):
+        o = price
+        price = max(round(price + rng.gauss(0, 0.5), 2), 0.01)
+        hi = round(max(o, price) + abs(rng.gauss(0, 0.2)), 2)
+        lo = round(max(min(o, price) - abs(rng.gauss(0, 0.2)), 0.01), 2)
+        out.append([1_600_000_000_000 + i * 60_000, o, hi, lo, price, round(rng.uniform(1, 100), 3)])
+    return out
+
+
+def fmt_sec(sec: float) -> str:
+    if sec < 1e-3:
+        return f"{sec * 1e6:.1f} µs"
+    if sec < 1:
+        return f"{sec * 1e3:.2f} ms"
+    return f"{sec:.2f} s"
+
+
+def print_table(rows: list[dict[str, Any]], columns: list[str]) -> None:
+    cells = [[str(r.get(c, "")) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
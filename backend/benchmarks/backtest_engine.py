@@ -0,0 +1,90 @@
+"""Backtest sinyalleri: vektörel motor (engine.compute_signals) vs eski bar bar get_signal döngüsü.
+
+Eski yol (engine.scalar_signals) her bar için candles[: i + 1] dilimleyip get_signal çağırır, O(n²).
+--full-max'tan uzun serilerde döngü baştan sona koşturulmaz: eşit aralıklı `--samples` bardaki
+get_signal süresinin ortalaması × n ile tahmin edilir (çağrı maliyeti i ile doğrusal olduğundan
+ortalama integrale denk). Tam koşulan boyutlarda sinyallerin bit düzeyinde aynı olduğu doğrulanır.
+Vektörel süre sinyal + simulator.simulate (emir/dolum) toplamıdır.
+
+    python -m benchmarks.backtest_engine [--sizes 500,50000,1000000] [--full-max 50000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks._common import best_of, fmt_sec, print_table, random_walk
+
+STRATEGIES = {
+    "ma_cross": {"short_period": 10, "long_period": 30},
+    "rsi": {"rsi_period": 14, "oversold": 30, "overbought": 70},
+}
+
+
+def _loop_estimate(strategy_type: str, candles: list[list], params_json: str, samples: int) -> float:
+    from app.services.strategy_engine import signals
+    n = len(candles)
+    points = np.linspace(0, n - 1, min(samples, n)).astype(int)
+    total = 0.0
+    for i in points.tolist():
+        t0 = time.perf_counter()
+        signals.get_signal(strategy_type, candles[: i + 1], params_json)
+        total += time.perf_counter() - t0
+    return total / len(points) * n
+
+
+def run(sizes: list[int], full_max: int = 50_000, samples: int = 200) -> list[dict]:
+    from app.services.backtest import engine, simulator
+    from app.services.market_data.archive import CandleArrays
+
+    rows = []
+    for n in sizes:
+        candles = random_walk(n)
+        arrays = CandleArrays.from_ohlcv(candles)
+        for strategy_type, params in STRATEGIES.items():
+            params_json = json.dumps(params)
+            start = engine.min_bars_for(strategy_type, params)
+
+            def vectorized():
+                sig = engine.compute_signals(strategy_type, arrays.close, params)
+                simulator.simulate(arrays.open, arrays.high, arrays.low, arrays.close, sig, start, 10_000.0)
+                return sig
+
+            vec = best_of(vectorized, repeat=3 if n <= 100_000 else 1)
+            if n <= full_max:
+                t0 = time.perf_counter()
+                scalar = engine.scalar_signals(strategy_type, candles, params_json)
+                loop = time.perf_counter() - t0
+                same = "evet" if np.array_equal(scalar, vectorized()) else "HAYIR"
+                how = "tam"
+            else:
+                loop = _loop_estimate(strategy_type, candles, params_json, samples)
+                same = "-"
+                how = f"tahmin ({samples} örnek)"
+            rows.append({
+                "bar": f"{n:,}",
+                "strateji": strategy_type,
+                "döngü": fmt_sec(loop),
+                "döngü ölçümü": how,
+                "vektörel": fmt_sec(vec),
+                "hızlanma": f"{loop / vec:,.0f}x",
+                "aynı sinyal": same,
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="500,50000,1000000")
+    parser.add_argument("--full-max", type=int, default=50_000, help="döngünün tam koşulduğu en uzun seri")
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+    rows = run([int(s) for s in args.sizes.split(",")], args.full_max, args.samples)
+    print_table(rows, ["bar", "strateji", "döngü", "döngü ölçümü", "vektörel", "hızlanma", "aynı sinyal"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Mum pattern tespiti: vektörel detect_patterns vs eski mum başına is_* döngüsü.
+
+Eski yol her mumda is_hammer / is_doji / is_bullish_engulfing / is_bearish_engulfing çağırır (her biri
+_row ile float dönüşümü). Vektörel yol tüm pattern'leri (çok mumlular dahil) tek geçişte maskeler;
+ilk dört pattern'in kayıtlarının eski döngüyle aynı olduğu doğrulanır.
+
+    python -m benchmarks.candle_patterns [--sizes 100000]
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks._common import best_of, fmt_sec, print_table, random_walk
+
+LEGACY = ("hammer", "doji", "bullish_engulfing", "bearish_engulfing")
+
+
+def legacy_detect(candles: list[list]) -> list[dict]:
+    """Vektörel sürüm öncesi detect_patterns."""
+    from app.services.patterns import candle_detector as cd
+
+    out: list[dict] = []
+    if not candles or len(candles) < 2:
+        return out
+    for i in range(len(candles)):
+        if cd.is_hammer(candles, i):
+            out.append({"index": i, "name": "hammer", "type": "bullish"})
+        if cd.is_doji(candles, i):
+            out.append({"index": i, "name": "doji", "type": "neutral"})
+        if cd.is_bullish_engulfing(candles, i):
+            out.append({"index": i, "name": "bullish_engulfing", "type": "bullish"})
+        if cd.is_bearish_engulfing(candles, i):
+            out.append({"index": i, "name": "bearish_engulfing", "type": "bearish"})
+    return out
+
+
+def run(sizes: list[int]) -> list[dict]:
+    from app.services.patterns import candle_detector as cd
+
+    rows = []
+    for n in sizes:
+        candles = random_walk(n)
+        old = best_of(lambda: legacy_detect(candles))
+        new = best_of(lambda: cd.detect_patterns(candles))
+        records = cd.detect_patterns(candles)
+        same = [r for r in records if r["name"] in LEGACY] == legacy_detect(candles)
+        rows.append({
+            "mum": f"{n:,}",
+            "döngü (4 pattern)": fmt_sec(old),
+            f"vektörel ({len(cd.PATTERNS)} pattern)": fmt_sec(new),
+            "hızlanma": f"{old / new:.1f}x",
+            "kayıt": f"{len(records):,}",
+            "aynı kayıt": "evet" if same else "HAYIR",
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100000")
+    args = parser.parse_args()
+    rows = run([int(s) for s in args.sizes.split(",")])
+    print_table(rows, list(rows[0]))
+
+
+if __name__ == "__main__":
+    main()
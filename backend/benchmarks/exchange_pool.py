@@ -0,0 +1,204 @@
+"""Borsa istemci havuzu: ticker gecikmesi, çağrı başına yeni istemci (eski) ve paylaşımlı istemci (exchanges).
+
+Yerel bir sahte Binance (aiohttp, ayrı thread) exchangeInfo ve ticker/24hr uçlarını sunar; ccxt
+istemcisi gerçek HTTP ile buna bağlanır. Eski yol her çağrıda istemci oluşturur, load_markets yapar
+ve kapatır; yeni yol market_service.get_ticker (önbellek kapalı, yalnızca havuz ölçülür). Yerel
+bağlantıda TLS yoktur; gerçek borsada el sıkışma maliyeti eski yolda ayrıca eklenir.
+
+    python -m benchmarks.exchange_pool [--calls 100] [--markets 1500]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+from benchmarks._common import fmt_sec, print_table
+
+
+def _exchange_info(markets: int) -> dict:
+    symbols = []
+    for i in range(markets):
+        base = "BTC" if i == 0 else f"C{i:04d}"
+        symbols.append({
+            "symbol": f"{base}USDT",
+            "status": "TRADING",
+            "baseAsset": base,
+            "baseAssetPrecision": 8,
+            "quoteAsset": "USDT",
+            "quotePrecision": 8,
+            "quoteAssetPrecision": 8,
+            "orderTypes": ["LIMIT", "MARKET"],
+            "isSpotTradingAllowed": True,
+            "isMarginTradingAllowed": False,
+            "permissions": ["SPOT"],
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "1000000", "tickSize": "0.01"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00001", "maxQty": "9000", "stepSize": "0.00001"},
+            ],
+        })
+    return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "rateLimits": [], "symbols": symbols}
+
+
+def _ticker(symbol: str) -> dict:
+    now = int(time.time() * 1000)
+    return {
+        "symbol": symbol, "priceChange": "1.0", "priceChangePercent": "0.1", "weightedAvgPrice": "100.0",
+        "prevClosePrice": "99.0", "lastPrice": "100.0", "lastQty": "1", "bidPrice": "99.9", "bidQty": "1",
+        "askPrice": "100.1", "askQty": "1", "openPrice": "99.0", "highPrice": "101.0", "lowPrice": "98.0",
+        "volume": "1000", "quoteVolume": "100000", "openTime": now - 86_400_000, "closeTime": now,
+        "firstId": 1, "lastId": 2, "count": 2,
+    }
+
+
+class StubExchange:
+    """Ayrı thread'deki event loop'ta çalışan yerel HTTP sunucusu."""
+
+    def __init__(self, markets: int) -> None:
+        self.info = _exchange_info(markets)
+        self.requests = {"exchangeInfo": 0, "ticker": 0}
+        self.url = ""
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self) -> None:
+        from aiohttp import web
+
+        async def exchange_info(request):
+            self.requests["exchangeInfo"] += 1
+            return web.json_response(self.info)
+
+        async def ticker(request):
+            self.requests["ticker"] += 1
+            return web.json_response(_ticker(request.query.get("symbol", "BTCUSDT")))
+
+        async def start():
+            app = web.Application()
+            app.router.add_get("/api/v3/exchangeInfo", exchange_info)
+            app.router.add_get("/api/v3/ticker/24hr", ticker)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://127.0.0.1:{port}"
+            self._ready.set()
+
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(start())
+        self._loop.run_forever()
+
+    def __enter__(self) -> StubExchange:
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def client(self):
+        """Sahte sunucuya yönlendirilmiş ccxt binance istemcisi (yalnızca spot marketler)."""
+        import ccxt.async_support as ccxt
+        # Eski yolda eşzamanlı 100 load_markets tek loop'ta sıraya girer; varsayılan 10 sn zaman aşımı yetmez
+        ex = ccxt.binance({"enableRateLimit": False, "timeout": 600_000, "options": {"fetchMarkets": ["spot"]}})
+        ex.urls["api"] = {name: f"{self.url}/api/v3" for name in ex.urls["api"]}
+        return ex
+
+
+async def _old_ticker(stub: StubExchange, symbol: str) -> dict:
+    """Havuz öncesi service._get_exchange yolu: oluştur, markets yükle, çek, kapat."""
+    from app.services.market_data import service as market_service
+    ex = stub.client()
+    try:
+        await ex.load_markets()
+        return market_service.ticker_to_dict(await ex.fetch_ticker(symbol))
+    finally:
+        await ex.close()
+
+
+async def _measure(stub: StubExchange, calls: int, pooled: bool, concurrent: bool) -> dict:
+    """Toplam süre ve çağrı başına gecikmeler. Havuzda istemci ölçümden önce bir kez ısıtılır
+    (süreçte bir kez olur; ilk çağrı ayrıca raporlanır)."""
+    from app.services.market_data import exchanges
+    from app.services.market_data import service as market_service
+
+    latencies: list[float] = []
+
+    async def one():
+        t0 = time.perf_counter()
+        if pooled:
+            res = await market_service.get_ticker("binance", "BTC/USDT")
+            assert "hata" not in res, res
+        else:
+            await _old_ticker(stub, "BTC/USDT")
+        latencies.append(time.perf_counter() - t0)
+
+    warmup = None
+    if pooled:
+        await one()
+        warmup = latencies.pop()
+    t0 = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(*(one() for _ in range(calls)))
+    else:
+        for _ in range(calls):
+            await one()
+    total = time.perf_counter() - t0
+    await exchanges.close_all()
+    latencies.sort()
+    return {
+        "total": total,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "warmup": warmup,
+    }
+
+
+def run(calls: int = 100, markets: int = 1500) -> list[dict]:
+    os.environ["MARKET_CACHE_BACKEND"] = "none"  # önbellek değil istemci havuzu ölçülsün
+    from app.config import get_settings
+    from app.services.market_data import cache as market_cache
+    from app.services.market_data import exchanges
+
+    get_settings.cache_clear()
+    asyncio.run(market_cache.close())
+    rows = []
+    with StubExchange(markets) as stub:
+        original = exchanges._create_exchange
+        exchanges._create_exchange = lambda exchange_id: stub.client()
+        try:
+            for concurrent in (False, True):
+                mode = f"{calls} {'eşzamanlı' if concurrent else 'sıralı'}"
+                old = asyncio.run(_measure(stub, calls, pooled=False, concurrent=concurrent))
+                new = asyncio.run(_measure(stub, calls, pooled=True, concurrent=concurrent))
+                for path, r in (("eski", old), ("havuz", new)):
+                    rows.append({
+                        "mod": mode,
+                        "yol": path,
+                        "toplam": fmt_sec(r["total"]),
+                        "p50": fmt_sec(r["p50"]),
+                        "p95": fmt_sec(r["p95"]),
+                        "ilk çağrı": fmt_sec(r["warmup"]) if r["warmup"] is not None else "-",
+                        "hızlanma": f"{old['total'] / r['total']:.1f}x",
+                    })
+        finally:
+            exchanges._create_exchange = original
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--markets", type=int, default=1500, help="exchangeInfo'daki sembol sayısı")
+    args = parser.parse_args()
+    rows = run(args.calls, args.markets)
+    print_table(rows, ["mod", "yol", "toplam", "p50", "p95", "ilk çağrı", "hızlanma"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""İndikatör çekirdekleri: compute_all (NumPy, kernels) vs eski pandas yolu.
+
+Eski yol: mumlardan DataFrame, calculator'daki pandas Series fonksiyonları (ewm / rolling) ve
+eleman başına np.isnan ile listeye çevirme. Sonuçların 1e-9 içinde aynı olduğu doğrulanır.
+
+    python -m benchmarks.indicator_kernels [--sizes 100,1000,100000]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+from benchmarks._common import best_of, fmt_sec, print_table, random_walk
+
+
+def pandas_compute_all(candles: list[list]) -> dict[str, list]:
+    """kernels öncesi compute_all (varsayılan periyotlarla)."""
+    from app.services.indicators import calculator
+
+    arr = np.array(candles)
+    df = pd.DataFrame({
+        "open": arr[:, 1], "high": arr[:, 2], "low": arr[:, 3], "close": arr[:, 4], "volume": arr[:, 5],
+    })
+    close = df["close"].astype(float)
+    macd_line, signal_line, histogram = calculator.compute_macd(close, 12, 26, 9)
+
+    def to_list(s: pd.Series) -> list[float | None]:
+        return [None if np.isnan(v) else float(v) for v in s]
+
+    return {
+        "rsi": to_list(calculator.compute_rsi(close, 14)),
+        "macd": to_list(macd_line),
+        "macd_signal": to_list(signal_line),
+        "macd_histogram": to_list(histogram),
+        "sma": to_list(calculator.compute_sma(close, 20)),
+        "ema": to_list(calculator.compute_ema(close, 20)),
+    }
+
+
+def _same(a: dict[str, list], b: dict[str, list]) -> bool:
+    for name in a:
+        for x, y in zip(a[name], b[name], strict=True):
+            if (x is None) != (y is None):
+                return False
+            if x is not None and not math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-9):
+                return False
+    return True
+
+
+def run(sizes: list[int]) -> list[dict]:
+    from app.services.indicators import calculator
+
+    rows = []
+    for n in sizes:
+        candles = random_walk(n)
+        repeat = 20 if n <= 1000 else 3
+        old = best_of(lambda: pandas_compute_all(candles), repeat)
+        new = best_of(lambda: calculator.compute_all(candles), repeat)
+        same = "evet" if _same(pandas_compute_all(candles), calculator.compute_all(candles)) else "HAYIR"
+        rows.append({
+            "bar": f"{n:,}",
+            "pandas": fmt_sec(old),
+            "numpy": fmt_sec(new),
+            "hızlanma": f"{old / new:.1f}x",
+            "aynı sonuç": same,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,100000")
+    args = parser.parse_args()
+    rows = run([int(s) for s in args.sizes.split(",")])
+    print_table(rows, ["bar", "pandas", "numpy", "hızlanma", "aynı sonuç"])
+
+
+if __name__ == "__main__":
+    main()
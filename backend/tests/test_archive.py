@@ -0,0 +1,53 @@
+"""Mum arşivi: eşzamanlı ekleme / yeniden yazmada seri bozulmamalı."""
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from app.config import get_settings
+from app.services.market_data import archive
+
+
+def _chunk(start: int, stop: int) -> archive.CandleArrays:
+    ts = np.arange(start, stop, dtype=np.int64) * 60_000
+    values = ts.astype(np.float64)
+    return archive.CandleArrays(ts, values, values, values, values, values)
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CANDLE_ARCHIVE_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    yield tmp_path
+    get_settings.cache_clear()
+
+
+def _append_overlapping(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    for _ in range(200):
+        start = int(rng.integers(0, 2000))
+        archive.append("binance", "BTC/USDT", "1m", _chunk(start, start + 50))
+
+
+def test_concurrent_appends_keep_ts_increasing(archive_dir):
+    with mp.get_context("spawn").Pool(4) as pool:
+        pool.map(_append_overlapping, range(4))
+    ts = np.asarray(archive.open_series("binance", "BTC/USDT", "1m").ts)
+    assert len(ts) > 0
+    assert np.all(np.diff(ts) > 0)
+
+
+def test_interleaved_rewriters(archive_dir):
+    archive.append("binance", "BTC/USDT", "1m", _chunk(100, 200))
+    first = archive.Rewriter("binance", "BTC/USDT", "1m")
+    second = archive.Rewriter("binance", "BTC/USDT", "1m")
+    first.write(_chunk(0, 150))
+    second.write(_chunk(0, 100))
+    second.write(_chunk(100, 200))
+    assert second.commit() == 200
+    first.write(_chunk(150, 200))
+    assert first.commit() == 200
+    series = archive.open_series("binance", "BTC/USDT", "1m")
+    assert np.array_equal(series.ts, _chunk(0, 200).ts)
+    leftovers = [p.name for p in archive.series_dir("binance", "BTC/USDT", "1m").parent.iterdir()]
+    assert sorted(leftovers) == ["1m", "1m.lock"]
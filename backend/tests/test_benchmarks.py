@@ -0,0 +1,34 @@
+"""Benchmark betikleri küçük boyutlarda çalışır (ölçüm değil, betikler bozulmasın diye)."""
+import asyncio
+
+from app.config import get_settings
+from app.services.market_data import cache as market_cache
+from benchmarks import backtest_engine, candle_patterns, exchange_pool, indicator_kernels
+
+
+def test_exchange_pool_benchmark_runs(monkeypatch):
+    monkeypatch.setenv("MARKET_CACHE_BACKEND", "none")
+    try:
+        rows = exchange_pool.run(calls=3, markets=5)
+    finally:
+        get_settings.cache_clear()
+        asyncio.run(market_cache.close())
+    assert [(r["mod"], r["yol"]) for r in rows] == [
+        ("3 sıralı", "eski"), ("3 sıralı", "havuz"), ("3 eşzamanlı", "eski"), ("3 eşzamanlı", "havuz"),
+    ]
+
+
+def test_backtest_engine_benchmark_runs():
+    rows = backtest_engine.run([300, 400], full_max=300, samples=5)
+    assert [r["döngü ölçümü"] for r in rows] == ["tam", "tam", "tahmin (5 örnek)", "tahmin (5 örnek)"]
+    assert [r["aynı sinyal"] for r in rows[:2]] == ["evet", "evet"]
+
+
+def test_indicator_kernels_benchmark_runs():
+    rows = indicator_kernels.run([50, 120])
+    assert [r["aynı sonuç"] for r in rows] == ["evet", "evet"]
+
+
+def test_candle_patterns_benchmark_runs():
+    rows = candle_patterns.run([200])
+    assert rows[0]["aynı kayıt"] == "evet"
@@ -0,0 +1,75 @@
+"""Yerel mum deposu: sayfalı backfill ve eksik aralık seçimi (borsa ve DB sahte)."""
+import asyncio
+
+from app.services.market_data import candle_store
+
+_TF_MS = 60_000
+_T0 = 1_700_000_040_000 - 1_700_000_040_000 % _TF_MS
+
+
+class _CappedExchange:
+    """fetch_ohlcv istenen limitten bağımsız en fazla `cap` mum döner."""
+
+    def __init__(self, start: int, end: int, cap: int) -> None:
+        self.start, self.end, self.cap = start, end, cap
+
+    async def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        first = max(since, self.start)
+        first += -first % _TF_MS
+        n = min(limit, self.cap, max((self.end - first) // _TF_MS, 0))
+        return [[first + i * _TF_MS, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(n)]
+
+
+def test_fetch_range_continues_past_short_pages(monkeypatch):
+    ex = _CappedExchange(_T0, _T0 + 5000 * _TF_MS, cap=100)
+
+    async def get_exchange(exchange_id):
+        return ex
+
+    monkeypatch.setattr(candle_store.exchanges, "get_exchange", get_exchange)
+    monkeypatch.setattr(candle_store, "timeframe_ms", lambda tf: _TF_MS)
+    candles = asyncio.run(candle_store._fetch_range("binance", "BTC/USDT", "1m", _T0, _T0 + 2500 * _TF_MS))
+    assert [c[0] for c in candles] == [_T0 + i * _TF_MS for i in range(2500)]
+
+
+class _StoreBounds:
+    def __init__(self, first_ts, last_ts) -> None:
+        self.bounds = (first_ts, last_ts)
+
+    async def execute(self, query):
+        bounds = self.bounds
+
+        class _Result:
+            def one(self):
+                return bounds
+
+        return _Result()
+
+    async def flush(self):
+        pass
+
+
+def _synced_ranges(monkeypatch, first_ts, last_ts, start_ms, end_ms):
+    fetched = []
+
+    async def fetch_range(exchange_id, symbol, timeframe, since, until):
+        fetched.append((since, until))
+        return []
+
+    monkeypatch.setattr(candle_store, "_fetch_range", fetch_range)
+    monkeypatch.setattr(candle_store, "timeframe_ms", lambda tf: _TF_MS)
+    asyncio.run(candle_store.sync_candles(_StoreBounds(first_ts, last_ts), "binance", "BTC/USDT", "1m",
+                                          start_ms, end_ms))
+    return fetched
+
+
+def test_sync_fills_head_up_to_stored_data(monkeypatch):
+    first, last = _T0 + 1000 * _TF_MS, _T0 + 2000 * _TF_MS
+    # İstek depodan önce bitiyor: [end_ms, first) de çekilmeli
+    assert _synced_ranges(monkeypatch, first, last, _T0, _T0 + 100 * _TF_MS) == [(_T0, first)]
+
+
+def test_sync_head_and_tail(monkeypatch):
+    first, last = _T0 + 1000 * _TF_MS, _T0 + 2000 * _TF_MS
+    end = _T0 + 3000 * _TF_MS
+    assert _synced_ranges(monkeypatch, first, last, _T0, end) == [(_T0, first), (last + _TF_MS, end)]
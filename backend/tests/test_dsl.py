@@ -0,0 +1,110 @@
+"""Kural dili: seri (backtest) ve artımlı (canlı) değerlendirmenin mum mum eşitliği."""
+import math
+import random
+import re
+
+import numpy as np
+import pytest
+
+from app.services.indicators import kernels
+from app.services.strategy_engine import dsl
+
+
+def _tick_walk(n: int, seed: int, tick: float = 0.01) -> list[list]:
+    """Tick'e yuvarlanmış mumlar: ortalamalar fiyata sık sık tam eşit çıkar."""
+    rng = random.Random(seed)
+    price, out = 100.0, []
+    for i in range(n):
+        price = max(round(price + rng.choice((-3, -2, -1, 0, 1, 2, 3)) * tick, 2), tick)
+        out.append([i * 60_000, price, round(price + 0.05, 2), round(price - 0.05, 2), price, float(rng.randint(1, 9))])
+    return out
+
+
+def _columns(candles: list[list]) -> dict[str, np.ndarray]:
+    arr = np.array(candles, dtype=np.float64)
+    return {name: arr[:, i + 1] for i, name in enumerate(dsl.SOURCES)}
+
+
+RULES = [
+    {"buy": "crosses_above(close, sma(close, 3))", "sell": "not (close > 0)"},
+    {"buy": "crosses_above(sma(close, 5), sma(close, 20))", "sell": "crosses_below(sma(close, 5), sma(close, 20))"},
+    {"buy": "close == sma(close, 4)", "sell": "close >= highest(high, 10)"},
+    {"buy": "crosses_above(ema(close, 5), ema(close, 13))", "sell": "rsi(close, 14) >= 60"},
+    {"buy": "rsi(sma(close, 3), 7) <= 40", "sell": "sma(ema(close, 3), 4) > prev(close, 2)"},
+    {"buy": "sma(close / (close - prev(close)), 3) > 0", "sell": "lowest(low, 5) == low"},
+]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("rules", RULES)
+def test_vector_and_incremental_paths_agree(rules, seed):
+    candles = _tick_walk(600, seed)
+    program = dsl.compile_rules(rules)
+    vector = program.signals(_columns(candles))
+    live = dsl.IncrementalProgram(program)
+    for i, candle in enumerate(candles):
+        step = live.step(candle)
+        expected = "buy" if vector[i] == dsl.BUY else "sell" if vector[i] == dsl.SELL else None
+        assert step == expected, f"bar {i}"
+
+
+def test_exact_sma_matches_fsum():
+    rng = random.Random(3)
+    x = [rng.choice((0.0, 0.1, 0.2, 0.3, 1e-9, -123.456, float("nan"))) for _ in range(400)]
+    got = kernels.exact_sma(np.array(x), 7)
+    for i in range(6, len(x)):
+        window = x[i - 6 : i + 1]
+        if any(v != v for v in window):
+            assert np.isnan(got[i])
+        else:
+            assert got[i] == math.fsum(window) / 7
+
+
+@pytest.mark.parametrize("rule,message", [
+    ("close.__class__ > 0", "Desteklenmeyen ifade"),
+    ("__import__('os') > 0", "Bilinmeyen fonksiyon: __import__"),
+    ("open_price > 0", "Bilinmeyen seri: open_price"),
+    ("(lambda: 1)() > 0", "Desteklenmeyen ifade"),
+    ("[c for c in close] > 0", "Desteklenmeyen ifade"),
+    ("close['x'] > 0", "Desteklenmeyen ifade"),
+    ("'a' < 'b'", "Desteklenmeyen ifade"),
+    ("close in close", "Desteklenmeyen karşılaştırma"),
+    ("close is close", "Desteklenmeyen karşılaştırma"),
+    ("sma(close, n=3) > 0", "yalnızca konumsal argüman"),
+    ("sma(close, 2.5) > 0", "periyot tam sayı sabit olmalı"),
+    ("sma(close, 0) > 0", f"periyot 1 ile {dsl.MAX_PERIOD} arasında"),
+    (f"sma(close, {dsl.MAX_PERIOD + 1}) > 0", f"periyot 1 ile {dsl.MAX_PERIOD} arasında"),
+    ("crosses_above(close) ", "iki argüman alır"),
+    ("close + 1", "mantıksal (koşul) bir ifade bekliyor"),
+    ("(close > 1) + 1 > 0", "sayısal bir ifade bekliyor"),
+    ("close >", "Sözdizimi hatası"),
+])
+def test_compiler_rejects_outside_the_whitelist(rule, message):
+    with pytest.raises(ValueError, match=re.escape(message)) as exc:
+        dsl.compile_rules({"buy": rule})
+    assert str(exc.value).startswith("buy: ")
+
+
+def test_compiler_limits_size():
+    with pytest.raises(ValueError, match="Kural çok uzun"):
+        dsl.compile_rules({"sell": "close > " + "1" * dsl.MAX_EXPRESSION_LENGTH})
+    # Her terim ayrı sabit: sabit + karşılaştırma + or, paylaşılmayan düğümler MAX_NODES'u aşar
+    rule = " or ".join(f"close > {p}" for p in range(dsl.MAX_NODES // 2))
+    assert len(rule) <= dsl.MAX_EXPRESSION_LENGTH
+    with pytest.raises(ValueError, match=f"en fazla {dsl.MAX_NODES} düğüm"):
+        dsl.compile_rules({"buy": rule})
+
+
+@pytest.mark.parametrize("params,message", [
+    ({}, "En az bir kural gerekli"),
+    ({"buy": "  ", "sell": None}, "En az bir kural gerekli"),
+    ({"buy": 1}, "buy kuralı metin olmalı"),
+])
+def test_compile_rules_requires_text_rules(params, message):
+    with pytest.raises(ValueError, match=message):
+        dsl.compile_rules(params)
+
+
+def test_shared_subexpressions_compile_once():
+    program = dsl.compile_rules({"buy": "sma(close, 5) > 1", "sell": "sma(close, 5) < 1"})
+    assert sum(1 for node in program.nodes if node.op == "sma") == 1
@@ -0,0 +1,73 @@
+"""Durumlu değerlendiriciler ile signals.get_signal'ın bar bar eşitliği."""
+import json
+import random
+
+import pytest
+
+from app.services.strategy_engine import evaluators, signals
+
+
+def _candles(closes: list[float]) -> list[list]:
+    return [[i * 60_000, c, c, c, c, 1.0] for i, c in enumerate(closes)]
+
+
+def _tick_walk(n: int, seed: int, tick: float = 0.01) -> list[float]:
+    """Tick'e yuvarlanmış fiyatlar: pencere toplamlarında eşitlik sınırları sık görülür."""
+    rng = random.Random(seed)
+    price, out = 100.0, []
+    for _ in range(n):
+        price = max(round(price + rng.choice((-3, -2, -1, 0, 1, 2, 3)) * tick, 2), tick)
+        out.append(price)
+    return out
+
+
+def _assert_same(strategy_type: str, params: dict, closes: list[float]) -> None:
+    candles = _candles(closes)
+    params_json = json.dumps(params)
+    evaluator = evaluators.make_evaluator(strategy_type, params)
+    for i, candle in enumerate(candles):
+        expected = signals.get_signal(strategy_type, candles[: i + 1], params_json)
+        assert evaluator.update(candle) == expected, f"bar {i}"
+
+
+def test_ma_cross_decimal_steps():
+    # 0.1 + 0.2 = 0.30000000000000004: kayan toplam sum()'dan son bitte ayrılır
+    closes = [0.1, 0.2, 0.1 + 0.2, 0.1, 0.2, 0.1, 0.3, 0.2, 0.1 + 0.2, 0.1, 0.2, 0.1, 0.3, 0.2, 0.1]
+    _assert_same("ma_cross", {"short_period": 3, "long_period": 5}, closes)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("short_period,long_period", [(3, 5), (5, 20), (10, 30)])
+def test_ma_cross_tick_rounded(seed, short_period, long_period):
+    closes = _tick_walk(1500, seed)
+    _assert_same("ma_cross", {"short_period": short_period, "long_period": long_period}, closes)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("period", [2, 14])
+def test_rsi_tick_rounded(seed, period):
+    closes = _tick_walk(1500, seed)
+    _assert_same("rsi", {"rsi_period": period, "oversold": 30, "overbought": 70}, closes)
+
+
+@pytest.mark.parametrize("strategy_type,params", [
+    ("ma_cross", {"short_period": 10, "long_period": 30}),
+    ("rsi", {"rsi_period": 14, "oversold": 30, "overbought": 70}),
+])
+def test_window_sum_fallback_is_rare(monkeypatch, strategy_type, params):
+    """Pencere sum() ile yalnızca eşitlik sınırına yakın kararlarda toplanır; diğer mumlar O(1)."""
+    calls = []
+    total = evaluators._RollingSum.total.fget
+
+    def counted(self):
+        calls.append(1)
+        return total(self)
+
+    monkeypatch.setattr(evaluators._RollingSum, "total", property(counted))
+    rng = random.Random(3)
+    price, closes = 100.0, []
+    for _ in range(3000):
+        price *= 1 + rng.gauss(0, 0.002)
+        closes.append(price)
+    _assert_same(strategy_type, params, closes)
+    assert len(calls) < 30
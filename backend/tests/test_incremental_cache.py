@@ -0,0 +1,71 @@
+"""Artımlı indikatör önbelleği: sıcak önbellekten dönen sonuç soğuk hesapla birebir aynı olmalı."""
+import asyncio
+import random
+
+import pytest
+
+from app.config import get_settings
+from app.services.indicators import calculator, incremental
+from app.services.market_data import cache as market_cache
+
+_TF_MS = 60_000
+_T0 = 1_700_000_040_000 - 1_700_000_040_000 % _TF_MS
+
+
+def _walk(n: int, seed: int = 7) -> list[list]:
+    rng = random.Random(seed)
+    price, out = 100.0, []
+    for i in range(n):
+        price = round(price + rng.uniform(-0.5, 0.5), 2)
+        out.append([_T0 + i * _TF_MS, price, price, price, price, 1.0])
+    return out
+
+
+def _cold(candles: list[list]) -> dict:
+    return incremental.IndicatorSet().seed(candles)
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setenv("MARKET_CACHE_BACKEND", "memory")
+    get_settings.cache_clear()
+    asyncio.run(market_cache.close())
+    yield
+    asyncio.run(market_cache.close())
+    get_settings.cache_clear()
+
+
+def _compute(candles: list[list]) -> dict:
+    return asyncio.run(incremental.compute_cached("binance", "BTC/USDT", "1m", candles))
+
+
+def test_short_request_after_long_matches_cold():
+    history = _walk(500)
+    _compute(history)  # limit=500 önbelleği ısıtır
+    recent = history[-100:]
+    assert _compute(recent) == _cold(recent)
+    assert _compute(recent) == _cold(recent)  # bu kez kendi penceresinden sıcak
+
+
+def test_warm_updates_match_cold():
+    history = _walk(300)
+    window = history[:200]
+    _compute(window)
+    # Açık mum güncellenir, ardından kapanıp yeni mum gelir
+    revised = window[:-1] + [[window[-1][0], 0, 0, 0, window[-1][4] + 1.37, 1.0]]
+    assert _compute(revised) == _cold(revised)
+    grown = revised + history[200:230]
+    assert _compute(grown) == _cold(grown)
+    # Önbellekteki ortadaki bir kapanış borsa tarafından düzeltildi
+    fixed = [list(c) for c in grown]
+    fixed[50][4] += 0.01
+    assert _compute(fixed) == _cold(fixed)
+
+
+def test_cold_matches_compute_all():
+    candles = _walk(250)
+    got = _compute(candles)
+    expected = calculator.compute_all(candles)
+    for name in incremental.OUTPUTS:
+        assert [v is None for v in got[name]] == [v is None for v in expected[name]], name
+        assert got[name] == pytest.approx(expected[name], rel=1e-9, abs=1e-9), name
@@ -0,0 +1,90 @@
+"""İş kuyruğu: sonuç yalnızca işi hâlâ tutan işçi tarafından yazılır (DB ve dispatch sahte)."""
+import asyncio
+import os
+
+from sqlalchemy.dialects import postgresql
+
+from app import worker
+from app.services.jobs import service as jobs_service
+from app.services.ml import trainer
+
+
+class _Result:
+    def __init__(self, rowcount: int) -> None:
+        self.rowcount = rowcount
+
+
+class _Session:
+    """execute edilen ifadeleri ve commit/rollback çağrılarını kaydeder."""
+
+    def __init__(self, rowcount: int = 1) -> None:
+        self.rowcount = rowcount
+        self.statements: list = []
+        self.calls: list[str] = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(self.rowcount)
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_finish_job_is_guarded_by_owner_and_status():
+    db = _Session(rowcount=0)
+    ok = asyncio.run(jobs_service.finish_job(db, 7, "host:1", {"ok": True}))
+    assert ok is False
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "jobs.worker_id = " in sql
+    assert "jobs.status = " in sql
+
+
+def test_set_progress_is_guarded_by_owner_and_status():
+    db = _Session(rowcount=0)
+    ok = asyncio.run(jobs_service.set_progress(db, 7, "host:1", 3, 10))
+    assert ok is False
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "jobs.worker_id = " in sql
+    assert "jobs.status = " in sql
+
+
+def _candles(n: int = 120) -> list[list]:
+    price, out = 100.0, []
+    for i in range(n):
+        price = round(price + (0.7 if i % 3 else -1.1), 2)
+        out.append([i * 60_000, price, price + 0.5, price - 0.5, price, 1.0])
+    return out
+
+
+def test_two_workers_racing_keep_the_winners_artifact(monkeypatch, tmp_path):
+    """İş kuyruğa geri alınıp iki işçide koştu: kazananın modeli kalır, kaybedenin dosyası silinir."""
+    winner, loser = _Session(rowcount=1), _Session(rowcount=0)
+    sessions = iter([winner, loser])
+    paths: list[str] = []
+
+    async def dispatch(db, job_id, user_id, kind, payload):
+        # İki işçi de aynı ad ve sürümle eğitir (train_from_ohlcv ile aynı çağrı)
+        path, metrics = trainer.train_and_save(_candles(), str(tmp_path), "model", "v1")
+        paths.append(path)
+        return {"ok": True, "artifact_path": path, "metrics": metrics}
+
+    monkeypatch.setattr(worker, "async_session_factory", lambda: next(sessions))
+    monkeypatch.setattr(worker, "_dispatch", dispatch)
+    asyncio.run(worker._execute(7, 1, "train", {}))
+    asyncio.run(worker._execute(7, 1, "train", {}))
+
+    assert winner.calls == ["commit"]
+    assert loser.calls == ["rollback"]
+    winner_path, loser_path = paths
+    assert winner_path != loser_path
+    assert os.path.exists(winner_path)
+    assert not os.path.exists(loser_path)
@@ -0,0 +1,88 @@
+"""Portföy backtesti risk reddi: her emir kararı risk.service.check_risk ile aynı olmalı (DB sahte)."""
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.backtest import portfolio
+from app.services.market_data.archive import CandleArrays
+from app.services.risk import service as risk_service
+
+_DAY_MS = 86_400_000
+_T0 = 1_700_006_400_000 - 1_700_006_400_000 % _DAY_MS  # UTC gün başı
+_RULES = {"buy": "close == 101", "sell": "close == 90"}
+
+
+class _RiskDb:
+    """check_risk sorgularına sabit yanıt: limit kaydı, sembol pozisyon toplamı, günlük PnL."""
+
+    def __init__(self, limit, position: float = 0.0, daily_pnl: float = 0.0) -> None:
+        self.values = {"risk_limits": limit, "positions": position, "orders": daily_pnl}
+
+    async def execute(self, stmt):
+        table = next(name for name in self.values if f"FROM {name}" in str(stmt))
+        value = self.values[table]
+        return SimpleNamespace(scalar_one_or_none=lambda: value, scalar=lambda: value)
+
+
+def _check_risk(
+    leg: portfolio.Leg, quantity: float, position: float = 0.0, daily_pnl: float = 0.0, side: str = "buy"
+) -> bool:
+    limit = SimpleNamespace(
+        max_position_size=Decimal(str(leg.max_position_size)) if leg.max_position_size else None,
+        daily_loss_limit=Decimal(str(leg.daily_loss_limit)) if leg.daily_loss_limit else None,
+    )
+    db = _RiskDb(limit, position, daily_pnl)
+    ok, _ = asyncio.run(risk_service.check_risk(db, 1, leg.symbol, side, Decimal(str(quantity)), 1))
+    return ok
+
+
+def _leg(name: str, closes: list[float], ts: list[int] | None = None, **limits) -> portfolio.Leg:
+    n = len(closes)
+    close = np.array(closes, dtype=np.float64)
+    ts_arr = np.array(ts if ts is not None else [_T0 + i * 60_000 for i in range(n)], dtype=np.int64)
+    candles = CandleArrays(ts_arr, close, close + 0.5, close - 0.5, close, np.ones(n))
+    return portfolio.Leg(name, "BTC/USDT", "custom", _RULES, candles, **limits)
+
+
+def test_max_position_counts_every_leg_on_the_symbol():
+    closes = [100.0, 100.0, 101.0, 100.0]
+    legs = [_leg("1:BTC/USDT", closes, max_position_size=6), _leg("2:BTC/USDT", closes, max_position_size=6)]
+    result = portfolio.simulate(legs, 1000.0, portfolio.simulator.SimConfig(position_fraction=0.5))
+
+    assert [i for i, _ in result.trades] == [0]
+    first = result.trades[0][1]
+    second_qty = (1000.0 - first.qty * first.entry_price) * 0.5 / 101.0
+    assert _check_risk(legs[0], first.qty)
+    assert not _check_risk(legs[1], second_qty, position=first.qty)
+    assert result.rejected == [{"max_position": 0, "daily_loss": 0}, {"max_position": 1, "daily_loss": 0}]
+
+
+def test_daily_loss_blocks_entries_until_the_next_utc_day():
+    closes = [100.0, 100.0, 101.0, 90.0, 101.0, 100.0, 101.0]
+    ts = [_T0 + i * 60_000 for i in range(5)] + [_T0 + _DAY_MS, _T0 + _DAY_MS + 60_000]
+    leg = _leg("1:BTC/USDT", closes, ts, daily_loss_limit=5)
+    result = portfolio.simulate([leg], 1000.0)
+
+    trades = [tr for _, tr in result.trades]
+    assert [(tr.entry_bar, tr.exit_bar, tr.reason) for tr in trades] == [(2, 3, "signal"), (6, 7, "end")]
+    loss = trades[0].pnl
+    assert loss < -5
+    # Aynı gün ikinci giriş (bar 4) reddedildi; ertesi gün PnL sıfırlanır
+    assert not _check_risk(leg, 1000.0 * 0.1 / 101.0, daily_pnl=loss)
+    assert _check_risk(leg, trades[1].qty, daily_pnl=0.0)
+    assert result.rejected == [{"max_position": 0, "daily_loss": 1}]
+
+
+def test_rejected_exit_keeps_the_position_open():
+    # Bacak 0'ın zararı hesabın günlük limitini aşar; bacak 1'in aynı gün satışı da reddedilir
+    loser = _leg("1:BTC/USDT", [100.0, 100.0, 101.0, 90.0, 95.0, 95.0], daily_loss_limit=5)
+    holder = _leg("2:BTC/USDT", [100.0, 100.0, 101.0, 100.0, 90.0, 95.0], daily_loss_limit=5)
+    result = portfolio.simulate([loser, holder], 1000.0, portfolio.simulator.SimConfig(position_fraction=0.5))
+
+    by_leg = {i: tr for i, tr in result.trades}
+    assert by_leg[0].reason == "signal" and by_leg[0].pnl < -5
+    assert (by_leg[1].exit_bar, by_leg[1].reason) == (6, "end")
+    assert not _check_risk(holder, by_leg[1].qty, daily_pnl=by_leg[0].pnl, side="sell")
+    assert result.rejected[1] == {"max_position": 0, "daily_loss": 1}
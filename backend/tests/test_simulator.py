@@ -0,0 +1,108 @@
+"""Olay güdümlü simülasyon: stop-loss / take-profit ve limit emir dolumları (elle kurulmuş mumlar)."""
+import numpy as np
+import pytest
+
+from app.services.backtest import simulator
+from app.services.backtest.engine import BUY, SELL
+
+
+def _run(rows: list[tuple[float, float, float, float]], signals: dict[int, int], **config):
+    """rows: (open, high, low, close); signals: bar -> BUY / SELL."""
+    o, h, lo, c = (np.array(col, dtype=np.float64) for col in zip(*rows))
+    sig = np.zeros(len(rows), dtype=np.int8)
+    for bar, side in signals.items():
+        sig[bar] = side
+    cfg = simulator.SimConfig.from_dict({"position_fraction": 1.0, **config})
+    return simulator.simulate(o, h, lo, c, sig, 0, 1000.0, cfg)
+
+
+def _flat(n: int, price: float = 100.0) -> list[tuple[float, float, float, float]]:
+    return [(price, price + 1, price - 1, price)] * n
+
+
+def _only_trade(result) -> simulator.Trade:
+    assert len(result.trades) == 1
+    return result.trades[0]
+
+
+def test_stop_loss_fills_at_the_stop_inside_the_bar():
+    rows = _flat(5)
+    rows[2] = (99.0, 100.0, 94.0, 96.0)
+    trade = _only_trade(_run(rows, {0: BUY}, stop_loss_pct=5))
+    assert (trade.exit_bar, trade.exit_price, trade.reason) == (2, 95.0, "stop_loss")
+
+
+def test_stop_loss_gap_fills_at_the_open_with_taker_fee():
+    rows = _flat(5)
+    rows[2] = (90.0, 91.0, 89.0, 90.0)
+    trade = _only_trade(_run(rows, {0: BUY}, stop_loss_pct=5, taker_fee_pct=0.1, maker_fee_pct=0.02))
+    assert (trade.exit_price, trade.reason) == (90.0, "stop_loss")
+    assert trade.exit_fee == pytest.approx(trade.qty * 90.0 * 0.001)
+
+
+def test_take_profit_fills_at_the_target_with_maker_fee():
+    rows = _flat(5)
+    rows[3] = (104.0, 111.0, 103.0, 108.0)
+    trade = _only_trade(_run(rows, {0: BUY}, take_profit_pct=10, taker_fee_pct=0.1, maker_fee_pct=0.02))
+    assert (trade.exit_bar, trade.reason) == (3, "take_profit")
+    assert trade.exit_price == pytest.approx(110.0)
+    assert trade.exit_fee == pytest.approx(trade.qty * 110.0 * 0.0002)
+
+
+def test_stop_loss_wins_when_both_trigger_in_the_same_bar():
+    rows = _flat(5)
+    rows[2] = (100.0, 112.0, 94.0, 100.0)
+    trade = _only_trade(_run(rows, {0: BUY}, stop_loss_pct=5, take_profit_pct=10))
+    assert (trade.exit_bar, trade.reason) == (2, "stop_loss")
+
+
+def test_protective_exit_is_found_after_a_long_quiet_stretch():
+    # _SCAN'dan uzun pencere: tetik NumPy taramasıyla bulunur
+    rows = _flat(3000)
+    rows[2500] = (100.0, 100.0, 90.0, 92.0)
+    trade = _only_trade(_run(rows, {0: BUY}, stop_loss_pct=5))
+    assert (trade.exit_bar, trade.exit_price, trade.reason) == (2500, 95.0, "stop_loss")
+
+
+def test_signal_exit_before_the_stop_is_a_signal_exit():
+    rows = _flat(6)
+    rows[4] = (99.0, 100.0, 90.0, 95.0)
+    trade = _only_trade(_run(rows, {0: BUY, 2: SELL}, stop_loss_pct=5))
+    assert (trade.exit_bar, trade.exit_price, trade.reason) == (2, 100.0, "signal")
+
+
+def test_limit_buy_waits_for_the_low_and_fills_at_the_limit():
+    rows = _flat(6)
+    rows[3] = (99.0, 99.5, 97.0, 98.5)  # limit 98: bar 1-2'nin low'u 99
+    result = _run(rows, {0: BUY}, order_type="limit", limit_offset_pct=2, maker_fee_pct=0.02, taker_fee_pct=0.1)
+    trade = _only_trade(result)
+    assert (trade.entry_bar, trade.entry_price) == (3, 98.0)
+    assert trade.entry_fee == pytest.approx(trade.qty * 98.0 * 0.0002)
+    assert trade.reason == "end"
+
+
+def test_limit_buy_gapping_below_fills_at_the_open():
+    rows = _flat(4)
+    rows[2] = (96.0, 97.0, 95.0, 96.0)
+    trade = _only_trade(_run(rows, {0: BUY}, order_type="limit", limit_offset_pct=2))
+    assert (trade.entry_bar, trade.entry_price) == (2, 96.0)
+
+
+def test_limit_sell_fills_at_the_limit_above_the_close():
+    rows = _flat(6)
+    rows[4] = (101.0, 103.0, 100.5, 102.0)  # sell limit 102
+    limit = _run(rows, {0: BUY, 2: SELL}, order_type="limit", limit_offset_pct=2)
+    # Giriş limiti 98'e inilmez: emir sell sinyaliyle iptal, işlem yok
+    assert limit.trades == []
+    rows[1] = (99.0, 99.0, 97.5, 98.0)
+    trade = _only_trade(_run(rows, {0: BUY, 2: SELL}, order_type="limit", limit_offset_pct=2))
+    assert (trade.entry_bar, trade.entry_price) == (1, 98.0)
+    assert (trade.exit_bar, trade.exit_price, trade.reason) == (4, 102.0, "signal")
+
+
+def test_unfilled_limit_expires_after_ttl():
+    rows = _flat(8)
+    rows[5] = (97.0, 98.0, 96.0, 97.0)  # ttl 3: emir bar 3'te düşer, bu dolum sayılmaz
+    assert _run(rows, {0: BUY}, order_type="limit", limit_offset_pct=2, order_ttl_bars=3).trades == []
+    trade = _only_trade(_run(rows, {0: BUY}, order_type="limit", limit_offset_pct=2))
+    assert (trade.entry_bar, trade.entry_price) == (5, 97.0)
@@ -0,0 +1,98 @@
+"""Zaman dilimi doğrulaması: ccxt hataları ve sütun uzunluğu 500 yerine hata sözlüğüne dönmeli."""
+import asyncio
+
+import pytest
+
+from app.services.market_data import candle_store
+from app.services.strategy_engine import service as strategy_service
+
+
+@pytest.mark.parametrize("timeframe", ["1m", "15m", "1h", "4h", "1d", "1w", "1M"])
+def test_valid_timeframes(timeframe):
+    assert candle_store.valid_timeframe(timeframe)
+
+
+@pytest.mark.parametrize(
+    "timeframe", ["1x", "0m", "-1m", "", "m", "1.5h", "10000000000m", None, "7m", "13h", "3s", "1y"]
+)
+def test_invalid_timeframes(timeframe):
+    assert not candle_store.valid_timeframe(timeframe)
+
+
+def test_timeframes_follow_the_exchange_map():
+    # binance 1s mumu yayınlar, bybit yayınlamaz
+    assert candle_store.valid_timeframe("1s", "binance")
+    assert not candle_store.valid_timeframe("1s", "bybit")
+    assert candle_store.valid_timeframe("1M", "bybit")
+
+
+@pytest.mark.parametrize("timeframe", ["1x", "0m", "10000000000m", "7m", "1y"])
+def test_create_strategy_rejects_bad_timeframe(timeframe):
+    result = asyncio.run(
+        strategy_service.create_strategy(
+            None, 1, "s", "ma_cross", {}, "BTC/USDT", "binance", "paper", timeframe=timeframe
+        )
+    )
+    assert result == {"ok": False, "hata": f"Geçersiz zaman dilimi: {timeframe}"}
+
+
+class _OneStrategy:
+    """db.get yalnızca test stratejisini döner; zaman dilimi hatası DB'ye gitmeden dönmeli."""
+
+    async def get(self, model, pk):
+        from types import SimpleNamespace
+        return SimpleNamespace(id=pk, user_id=1, type="ma_cross", symbol="BTC/USDT", params_json="{}")
+
+
+@pytest.mark.parametrize("timeframe", ["1x", "0m", "13h"])
+def test_backtest_entrypoints_reject_bad_timeframe(timeframe):
+    from datetime import datetime, timezone
+
+    from app.services.backtest import service as backtest_service
+
+    t0, t1 = datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 2, 1, tzinfo=timezone.utc)
+    db = _OneStrategy()
+    calls = [
+        lambda: backtest_service.run_backtest(db, 1, 1, "BTC/USDT", "binance", timeframe, t0, t1),
+        lambda: backtest_service.run_sweep(
+            db, 1, 1, "BTC/USDT", "binance", timeframe, t0, t1, {"short_period": [5]}
+        ),
+        lambda: backtest_service.run_walkforward(db, 1, 1, "BTC/USDT", "binance", timeframe, t0, t1, 100, 50),
+        lambda: backtest_service.run_portfolio_backtest(db, 1, [{"strategy_id": 1}], timeframe, t0, t1),
+    ]
+    for call in calls:
+        assert asyncio.run(call()) == {"ok": False, "hata": f"Geçersiz zaman dilimi: {timeframe}"}
+
+
+def _ms(*args) -> int:
+    from datetime import datetime, timezone
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def test_weekly_and_monthly_candles_follow_the_calendar():
+    # 2024-02-15 Perşembe: haftalık mum Pazartesi 12 Şubat'ta açılır, 19 Şubat'ta kapanır
+    ts = _ms(2024, 2, 15, 13, 30)
+    assert candle_store.candle_open_ms(ts, "1w") == _ms(2024, 2, 12)
+    assert candle_store.candle_close_ms(_ms(2024, 2, 12), "1w") == _ms(2024, 2, 19)
+    # Aylık mum ayın 1'inde açılır; artık yıl Şubat'ı 29 gün
+    assert candle_store.candle_open_ms(ts, "1M") == _ms(2024, 2, 1)
+    assert candle_store.candle_close_ms(_ms(2024, 2, 1), "1M") == _ms(2024, 3, 1)
+    assert candle_store.candle_close_ms(_ms(2024, 12, 1), "1M") == _ms(2025, 1, 1)
+    assert candle_store.candle_open_ms(ts, "4h") == _ms(2024, 2, 15, 12)
+
+
+def test_scheduler_wakes_on_calendar_closes(monkeypatch):
+    from types import SimpleNamespace
+
+    from app import scheduler
+
+    monkeypatch.setattr(
+        scheduler, "get_settings", lambda: SimpleNamespace(scheduler_settle_delay_sec=0.0)
+    )
+    now = _ms(2024, 2, 15, 13, 30) / 1000
+    assert scheduler._next_close("1w", now) == _ms(2024, 2, 19) / 1000
+    assert scheduler._next_close("1M", now) == _ms(2024, 3, 1) / 1000
+    # Şubat 2023 mumu değerlendirildi: Mart mumu 1 Nisan'da kapanır (2 × 30 gün sonra değil)
+    s = SimpleNamespace(last_candle_ts=_ms(2023, 2, 1), timeframe="1M")
+    assert not scheduler._is_due(s, _ms(2023, 3, 31, 23, 59))
+    assert scheduler._is_due(s, _ms(2023, 4, 1))
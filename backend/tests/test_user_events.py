@@ -0,0 +1,29 @@
+"""Kullanıcı olayları: commit sonrası yayın görevi bitene kadar referansla tutulur."""
+import asyncio
+
+from app.services.realtime import hub, user_events
+
+
+class _Session:
+    def __init__(self, events) -> None:
+        self.info = {user_events._INFO_KEY: events}
+
+
+def test_after_commit_keeps_publish_task_until_done(monkeypatch):
+    published = []
+
+    async def publish(key, frame):
+        await asyncio.sleep(0)
+        published.append((key, frame))
+
+    monkeypatch.setattr(hub, "publish", publish)
+
+    async def main():
+        user_events._after_commit(_Session([("user:1:orders", "{}")]))
+        assert len(user_events._pending) == 1
+        await asyncio.gather(*user_events._pending)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert published == [("user:1:orders", "{}")]
+    assert not user_events._pending
@@ -0,0 +1,80 @@
+"""OHLCV delta aboneliği: akış yalnızca hata verirse istemci hata çerçevelerini almalı, asılı kalmamalı."""
+import asyncio
+import json
+
+import pytest
+
+from app.api.v1 import ws
+from app.services.market_data import streams
+
+
+def _candles(n: int, close: float = 1.0) -> list[list]:
+    return [[i * 60_000, close, close, close, close, 1.0] for i in range(n)]
+
+
+async def _collect(topic: streams.Topic, until, timeout: float = 3.0) -> tuple[list[dict], bool]:
+    """_run_ohlcv çerçevelerini until(frames) doğru olana kadar toplar; (çerçeveler, abonelik kendiliğinden bitti mi)."""
+    frames: list[dict] = []
+    got = asyncio.Event()
+
+    async def send(text: str) -> None:
+        frames.append(json.loads(text))
+        if until(frames):
+            got.set()
+
+    task = asyncio.create_task(ws._run_ohlcv(topic, 10, send))
+    waiter = asyncio.create_task(got.wait())
+    await asyncio.wait({task, waiter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finished = task.done()
+    task.cancel()
+    waiter.cancel()
+    await asyncio.gather(task, waiter, return_exceptions=True)
+    await streams.close_all()
+    return frames, finished
+
+
+def test_stream_errors_are_forwarded_before_first_snapshot(monkeypatch):
+    async def failing_source(topic):
+        raise RuntimeError("Geçersiz sembol")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(streams, "_source", failing_source)
+    topic = streams.make_topic("binance", "NOPE/USDT", "ohlcv", "1m")
+    frames, _ = asyncio.run(_collect(topic, lambda f: len(f) >= 1))
+    assert frames and frames[0]["type"] == "error"
+    assert frames[0]["hata"] == "Geçersiz sembol"
+    assert frames[0]["sembol"] == "NOPE/USDT"
+
+
+def test_subscription_ends_when_producer_dies(monkeypatch):
+    async def bad_state_source(topic):
+        yield {"unexpected": True}  # "candles" yok: üretici KeyError ile biter
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(streams, "_source", bad_state_source)
+    topic = streams.make_topic("binance", "BTC/USDT", "ohlcv", "1m")
+    frames, finished = asyncio.run(_collect(topic, lambda f: False))
+    assert finished
+    assert [f["type"] for f in frames] == ["error"]
+
+
+def test_snapshot_then_update(monkeypatch):
+    async def source(topic):
+        yield {"candles": _candles(20)}
+        await asyncio.sleep(0.05)  # üretici ilk durumu ayrı görsün
+        yield {"candles": _candles(20)[:-1] + [[19 * 60_000, 1.0, 2.0, 1.0, 2.0, 1.0]]}
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(streams, "_source", source)
+    topic = streams.make_topic("binance", "BTC/USDT", "ohlcv", "1m")
+    frames, _ = asyncio.run(_collect(topic, lambda f: len(f) >= 2))
+    assert frames[0]["type"] == "snapshot" and len(frames[0]["candles"]) == 10
+    assert frames[1]["type"] == "update" and frames[1]["candles"] == [[19 * 60_000, 1.0, 2.0, 1.0, 2.0, 1.0]]
+
+
+@pytest.fixture(autouse=True)
+def _clean_feeds():
+    yield
+    from app.services.realtime import feeds, hub
+    feeds._ohlcv_feeds.clear()
+    hub._channels.clear()
@@ -37,6 +37,13 @@ function BacktestContent() {
     end_ts: "",
     initial_balance: "10000",
   });
+  const [yurutme, setYurutme] = useState({
+    order_type: "market",
+    taker_fee_pct: "0.1",
+    slippage: "0.05",
+    stop_loss_pct: "",
+    take_profit_pct: "",
+  });
   const [calistiriliyor, setCalistiriliyor] = useState(false);
   const [sonuc, setSonuc] = useState(null as Record<string, unknown> | null);
   const RUN_LIMIT = 20;
@@ -106,6 +113,14 @@ function BacktestContent() {
           start_ts: startIso,
           end_ts: endIso,
           initial_balance: form.initial_balance,
+          execution: {
+            order_type: yurutme.order_type,
+            taker_fee_pct: Number(yurutme.taker_fee_pct) || 0,
+            maker_fee_pct: Number(yurutme.taker_fee_pct) || 0,
+            slippage: Number(yurutme.slippage) || 0,
+            stop_loss_pct: Number(yurutme.stop_loss_pct) || null,
+            take_profit_pct: Number(yurutme.take_profit_pct) || null,
+          },
         }),
       });
       const data = await res.json();
@@ -236,6 +251,67 @@ function BacktestContent() {
                 />
               </div>
             </div>
+            <div className="grid grid-cols-2 md:grid-cols-5 gap-4 mb-4">
+              <div>
+                <label className="block text-zinc-400 text-sm mb-1">Emir tipi</label>
+                <select
+                  value={yurutme.order_type}
+                  onChange={(e) => setYurutme((y) => ({ ...y, order_type: e.target.value }))}
+                  className="w-full rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
+                >
+                  <option value="market">Market</option>
+                  <option value="limit">Limit</option>
+                  <option value="stop_market">Stop market</option>
+                  <option value="stop_limit">Stop limit</option>
+                </select>
+              </div>
+              <div>
+                <label className="block text-zinc-400 text-sm mb-1">Komisyon (%)</label>
+                <input
+                  type="number"
+                  min={0}
+                  step="any"
+                  value={yurutme.taker_fee_pct}
+                  onChange={(e) => setYurutme((y) => ({ ...y, taker_fee_pct: e.target.value }))}
+                  className="w-full rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
+                />
+              </div>
+              <div>
+                <label className="block text-zinc-400 text-sm mb-1">Kayma (%)</label>
+                <input
+                  type="number"
+                  min={0}
+                  step="any"
+                  value={yurutme.slippage}
+                  onChange={(e) => setYurutme((y) => ({ ...y, slippage: e.target.value }))}
+                  className="w-full rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
+                />
+              </div>
+              <div>
+                <label className="block text-zinc-400 text-sm mb-1">Stop-loss (%)</label>
+                <input
+                  type="number"
+                  min={0}
+                  step="any"
+                  value={yurutme.stop_loss_pct}
+                  placeholder="yok"
+                  onChange={(e) => setYurutme((y) => ({ ...y, stop_loss_pct: e.target.value }))}
+                  className="w-full rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
+                />
+              </div>
+              <div>
+                <label className="block text-zinc-400 text-sm mb-1">Take-profit (%)</label>
+                <input
+                  type="number"
+                  min={0}
+                  step="any"
+                  value={yurutme.take_profit_pct}
+                  placeholder="yok"
+                  onChange={(e) => setYurutme((y) => ({ ...y, take_profit_pct: e.target.value }))}
+                  className="w-full rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
+                />
+              </div>
+            </div>
             <button
               type="submit"
               disabled={calistiriliyor || form.strategy_id === 0}
@@ -252,6 +328,10 @@ function BacktestContent() {
                     <p>Getiri: %{sonuc.total_return_pct != null ? Number(sonuc.total_return_pct).toFixed(2) : "—"}</p>
                     <p>İşlem sayısı: {String(sonuc.total_trades)}</p>
                     <p>Kazanç oranı: %{sonuc.win_rate_pct != null ? Number(sonuc.win_rate_pct).toFixed(1) : "—"}</p>
+                    <p>Maks. düşüş: %{sonuc.max_drawdown_pct != null ? Number(sonuc.max_drawdown_pct).toFixed(2) : "—"}</p>
+                    <p>Sharpe: {sonuc.sharpe != null ? Number(sonuc.sharpe).toFixed(2) : "—"}</p>
+                    <p>Pozisyonda kalma: %{sonuc.exposure_pct != null ? Number(sonuc.exposure_pct).toFixed(1) : "—"}</p>
+                    <p>Ödenen komisyon: {sonuc.fees_paid != null ? String(sonuc.fees_paid) : "—"}</p>
                   </>
                 ) : (
                   <p>{String(sonuc.hata || "Hata")}</p>
@@ -25,7 +25,7 @@ function getTickerWsUrl(sym: string, exch: string): string {
   const params = new URLSearchParams({
     symbol: sym,
     exchange: exch,
-    interval_sec: "3",
+    interval_sec: "1",
   });
   return `${base}${path}?${params.toString()}`;
 }
@@ -39,6 +39,21 @@ const TIMEFRAMES = [
   { value: "1d", label: "1 gün" },
 ];
 
+const OHLCV_LIMIT = 100;
+
+const PATTERN_LABELS: Record<string, string> = {
+  hammer: "Hammer",
+  doji: "Doji",
+  bullish_engulfing: "Bullish Engulfing",
+  bearish_engulfing: "Bearish Engulfing",
+  bullish_harami: "Bullish Harami",
+  bearish_harami: "Bearish Harami",
+  morning_star: "Morning Star",
+  evening_star: "Evening Star",
+  three_white_soldiers: "Three White Soldiers",
+  three_black_crows: "Three Black Crows",
+};
+
 function getOhlcvWsUrl(sym: string, exch: string, timeframe: string): string {
   const base = getWsBase();
   const path = base.startsWith("ws") ? "/api/v1/ws/ohlcv" : "/api/backend/api/v1/ws/ohlcv";
@@ -46,19 +61,31 @@ function getOhlcvWsUrl(sym: string, exch: string, timeframe: string): string {
     symbol: sym,
     exchange: exch,
     timeframe,
-    limit: "100",
-    interval_sec: "30",
+    limit: String(OHLCV_LIMIT),
   });
   return `${base}${path}?${params.toString()}`;
 }
 
+type Candle = [number, number, number, number, number, number];
+
+/** Delta çerçevesindeki mumları ts'ye göre birleştirir (son mum güncellenir, yeniler eklenir). */
+function mergeCandles(prev: Candle[], updates: Candle[], limit: number): Candle[] {
+  const next = prev.slice();
+  for (const c of updates) {
+    const last = next[next.length - 1];
+    if (last && c[0] === last[0]) next[next.length - 1] = c;
+    else if (!last || c[0] > last[0]) next.push(c);
+  }
+  return next.length > limit ? next.slice(next.length - limit) : next;
+}
+
 export default function SymbolPage() {
   const params = useParams();
   const searchParams = useSearchParams();
   const exchange = searchParams.get("exchange") || "binance";
   const symbol = decodeURIComponent((params.symbol as string) || "");
   const [timeframe, setTimeframe] = useState("1h");
-  const [ohlcv, setOhlcv] = useState<[number, number, number, number, number, number][]>([]);
+  const [ohlcv, setOhlcv] = useState<Candle[]>([]);
   const [indicators, setIndicators] = useState<{
     rsi: (number | null)[];
     macd: (number | null)[];
@@ -236,14 +263,33 @@ export default function SymbolPage() {
     let ws: WebSocket | null = null;
     let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
     const RECONNECT_MS = 5000;
+    let seq = -1;
+    let resyncing = false;
     const connect = () => {
       try {
         ws = new WebSocket(wsUrl);
+        seq = -1;
+        resyncing = false;
         ws.onmessage = (event) => {
           try {
             const data = JSON.parse(event.data as string);
             if (data.hata || !Array.isArray(data.candles)) return;
-            setOhlcv(data.candles);
+            if (data.type === "snapshot") {
+              seq = data.seq;
+              resyncing = false;
+              setOhlcv(data.candles);
+            } else if (data.type === "update") {
+              // Çerçeve kaçırıldıysa yeni snapshot iste
+              if (seq < 0 || data.seq !== seq + 1) {
+                if (!resyncing) {
+                  resyncing = true;
+                  ws?.send(JSON.stringify({ op: "resync" }));
+                }
+                return;
+              }
+              seq = data.seq;
+              setOhlcv((prev) => mergeCandles(prev, data.candles, OHLCV_LIMIT));
+            }
           } catch { /* ignore */ }
         };
         ws.onclose = () => { ws = null; reconnectTimer = setTimeout(connect, RECONNECT_MS); };
@@ -359,7 +405,7 @@ export default function SymbolPage() {
                   )}
                   {patterns.length > 0 && (() => {
                     const lastFew = patterns.slice(-3).reverse();
-                    const label = (n: string) => n === "hammer" ? "Hammer" : n === "doji" ? "Doji" : n === "bullish_engulfing" ? "Bullish Engulfing" : n === "bearish_engulfing" ? "Bearish Engulfing" : n;
+                    const label = (n: string) => PATTERN_LABELS[n] ?? n;
                     return (
                       <>
                         <span className="text-zinc-400 ml-1">Son pattern:</span>
@@ -6,6 +6,7 @@ import Link from "next/link";
 import AppHeader from "@/components/AppHeader";
 import { fetchAuth } from "@/lib/api";
 import { useRequireAuth } from "@/hooks/useRequireAuth";
+import { useToast } from "@/contexts/ToastContext";
 
 type Strategy = {
   id: number;
@@ -29,6 +30,7 @@ export default function StrategyDetailPage() {
   const router = useRouter();
   const id = Number(params.id);
   const { token, yuklendi } = useRequireAuth();
+  const toast = useToast();
   const [strategy, setStrategy] = useState<Strategy | null>(null);
   const [orders, setOrders] = useState<Order[]>([]);
   const [runs, setRuns] = useState<Run[]>([]);
@@ -81,6 +83,7 @@ export default function StrategyDetailPage() {
     });
     const data = await res.json();
     if (data.ok && strategy) setStrategy({ ...strategy, params: newParams });
+    else if (data.hata) toast.error(data.hata);
   };
 
   const sil = async () => {
@@ -223,6 +226,24 @@ export default function StrategyDetailPage() {
                   />
                 </div>
               )}
+              {strategy.type === "custom" && (
+                <div className="grid gap-2 mt-2">
+                  <span className="text-zinc-500">Al kuralı:</span>
+                  <input
+                    type="text"
+                    defaultValue={String(strategy.params?.["buy"] ?? "")}
+                    onBlur={(e) => paramsDegistir({ ...strategy.params, buy: e.target.value })}
+                    className="rounded border border-zinc-600 bg-zinc-800 px-2 py-1 text-white text-sm font-mono"
+                  />
+                  <span className="text-zinc-500">Sat kuralı:</span>
+                  <input
+                    type="text"
+                    defaultValue={String(strategy.params?.["sell"] ?? "")}
+                    onBlur={(e) => paramsDegistir({ ...strategy.params, sell: e.target.value })}
+                    className="rounded border border-zinc-600 bg-zinc-800 px-2 py-1 text-white text-sm font-mono"
+                  />
+                </div>
+              )}
             </div>
           </div>
           <div className="rounded-xl border border-zinc-800 bg-zinc-900/30 p-6">
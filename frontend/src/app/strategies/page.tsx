@@ -5,6 +5,7 @@ import Link from "next/link";
 import { fetchAuth } from "@/lib/api";
 import AppHeader from "@/components/AppHeader";
 import { useRequireAuth } from "@/hooks/useRequireAuth";
+import { useToast } from "@/contexts/ToastContext";
 
 type Strategy = {
   id: number;
@@ -12,6 +13,7 @@ type Strategy = {
   type: string;
   symbol: string;
   exchange: string;
+  timeframe: string;
   mode: string;
   is_active: boolean;
   ml_model_id: number | null;
@@ -21,23 +23,29 @@ type MLModel = { id: number; name: string; version: string; symbol: string | nul
 
 export default function StrategiesPage() {
   const { token, yuklendi } = useRequireAuth();
+  const toast = useToast();
   const [strategies, setStrategies] = useState<Strategy[]>([]);
   const [models, setModels] = useState<MLModel[]>([]);
   const [yukleniyor, setYukleniyor] = useState(true);
   const [hata, setHata] = useState<string | null>(null);
   const [form, setForm] = useState({
     name: "",
-    type: "ma_cross" as "ma_cross" | "rsi" | "ml_signal",
+    type: "ma_cross" as "ma_cross" | "rsi" | "ml_signal" | "custom",
     symbol: "BTC/USDT",
     exchange: "binance",
+    timeframe: "1h",
     mode: "paper",
-    params: { short_period: 10, long_period: 20 } as Record<string, number>,
+    params: { short_period: 10, long_period: 20 } as Record<string, number | string>,
   });
   const [gonderiliyor, setGonderiliyor] = useState(false);
 
-  const getDefaultParams = (t: string): Record<string, number> => {
+  const getDefaultParams = (t: string): Record<string, number | string> => {
     if (t === "rsi") return { rsi_period: 14, oversold: 30, overbought: 70 };
     if (t === "ma_cross") return { short_period: 10, long_period: 20 };
+    if (t === "custom") return {
+      buy: "crosses_above(ema(close, 12), ema(close, 26)) and rsi(close, 14) < 60",
+      sell: "crosses_below(ema(close, 12), ema(close, 26))",
+    };
     return {};
   };
 
@@ -96,7 +104,9 @@ export default function StrategiesPage() {
     const data = await res.json();
     if (data.id) {
       setStrategies((prev) => [...prev, { ...form, id: data.id, is_active: false, ml_model_id: null } as Strategy]);
-      setForm({ name: "", type: "ma_cross", symbol: "BTC/USDT", exchange: "binance", mode: "paper", params: { short_period: 10, long_period: 20 } });
+      setForm({ name: "", type: "ma_cross", symbol: "BTC/USDT", exchange: "binance", timeframe: "1h", mode: "paper", params: { short_period: 10, long_period: 20 } });
+    } else if (data.hata) {
+      toast.error(data.hata);
     }
     setGonderiliyor(false);
   };
@@ -124,7 +134,7 @@ export default function StrategiesPage() {
         {token && (
           <form onSubmit={stratejiOlustur} className="rounded-xl border border-zinc-800 bg-zinc-900/30 p-6 mb-8">
             <h2 className="text-lg font-medium text-white mb-4">Yeni strateji</h2>
-            <div className="grid grid-cols-2 md:grid-cols-5 gap-4">
+            <div className="grid grid-cols-2 md:grid-cols-6 gap-4">
               <input
                 type="text"
                 placeholder="Ad"
@@ -135,7 +145,7 @@ export default function StrategiesPage() {
               <select
                 value={form.type}
                 onChange={(e) => {
-                  const t = e.target.value as "ma_cross" | "rsi" | "ml_signal";
+                  const t = e.target.value as "ma_cross" | "rsi" | "ml_signal" | "custom";
                   setForm((f) => ({ ...f, type: t, params: getDefaultParams(t) }));
                 }}
                 className="rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
@@ -143,6 +153,7 @@ export default function StrategiesPage() {
                 <option value="ma_cross">MA Cross</option>
                 <option value="rsi">RSI</option>
                 <option value="ml_signal">ML Sinyal</option>
+                <option value="custom">Özel kural</option>
               </select>
               <input
                 type="text"
@@ -158,6 +169,18 @@ export default function StrategiesPage() {
                 <option value="binance">Binance</option>
                 <option value="twelvedata">Forex/Altın</option>
               </select>
+              <select
+                value={form.timeframe}
+                onChange={(e) => setForm((f) => ({ ...f, timeframe: e.target.value }))}
+                className="rounded-lg border border-zinc-700 bg-zinc-800 px-3 py-2 text-white"
+              >
+                <option value="1m">1 dk</option>
+                <option value="5m">5 dk</option>
+                <option value="15m">15 dk</option>
+                <option value="1h">1 saat</option>
+                <option value="4h">4 saat</option>
+                <option value="1d">1 gün</option>
+              </select>
               <button type="submit" disabled={gonderiliyor || !form.name.trim()} className="rounded-lg bg-emerald-600 px-4 py-2 text-white hover:bg-emerald-500 disabled:opacity-50">
                 {gonderiliyor ? "Ekleniyor..." : "Ekle"}
               </button>
@@ -190,6 +213,21 @@ export default function StrategiesPage() {
                   className="w-14 rounded border border-zinc-700 bg-zinc-800 px-2 py-1 text-white text-sm" />
               </div>
             )}
+            {form.type === "custom" && (
+              <div className="grid gap-2 mt-4">
+                <label className="text-zinc-400 text-sm">Al kuralı:</label>
+                <input type="text" value={String(form.params?.buy ?? "")}
+                  onChange={(e) => setForm((f) => ({ ...f, params: { ...f.params, buy: e.target.value } }))}
+                  className="rounded border border-zinc-700 bg-zinc-800 px-2 py-1 text-white text-sm font-mono" />
+                <label className="text-zinc-400 text-sm">Sat kuralı:</label>
+                <input type="text" value={String(form.params?.sell ?? "")}
+                  onChange={(e) => setForm((f) => ({ ...f, params: { ...f.params, sell: e.target.value } }))}
+                  className="rounded border border-zinc-700 bg-zinc-800 px-2 py-1 text-white text-sm font-mono" />
+                <p className="text-zinc-500 text-xs">
+                  Kaynaklar: open, high, low, close, volume · Fonksiyonlar: sma, ema, rsi, highest, lowest, prev, crosses_above, crosses_below · and / or / not
+                </p>
+              </div>
+            )}
           </form>
         )}
 
@@ -208,6 +246,7 @@ export default function StrategiesPage() {
                     <th className="p-4">Tip</th>
                     <th className="p-4">Sembol</th>
                     <th className="p-4">Borsa</th>
+                    <th className="p-4">Periyot</th>
                     <th className="p-4">ML Model</th>
                     <th className="p-4">Durum</th>
                     <th className="p-4">İşlem</th>
@@ -222,6 +261,7 @@ export default function StrategiesPage() {
                       <td className="p-4 text-zinc-300">{s.type}</td>
                       <td className="p-4 text-zinc-300">{s.symbol}</td>
                       <td className="p-4 text-zinc-300">{s.exchange}</td>
+                      <td className="p-4 text-zinc-300">{s.timeframe}</td>
                       <td className="p-4">
                         <select
                           value={s.ml_model_id ?? ""}